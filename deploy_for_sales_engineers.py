@@ -7,7 +7,7 @@ This script automatically sets up the entire demo environment in a few minutes.
 Perfect for sales engineers who need to quickly deploy the solution for customer demos.
 
 Usage:
-    python deploy_for_sales_engineers.py
+    python deploy_for_sales_engineers.py [--resume]
 
 Requirements:
     - Python 3.8+
@@ -83,24 +83,26 @@ def install_requirements():
         print_error(f"Failed to install dependencies: {e}")
         return False
 
-def setup_database():
+def setup_database(resume=False):
     """Set up the Snowflake database and load data"""
     print_step(3, "Setting up Snowflake Database and Loading Data")
     
     try:
-        # Run the quick deploy script
-        result = subprocess.run([sys.executable, "scripts/quick_deploy_phase3_simple.py"], 
-                              capture_output=True, text=True, check=True)
-        print_success("Database setup completed")
+        # Imported here: the connector is only guaranteed after install_requirements
+        sys.path.insert(0, 'scripts')
+        import deploy_orchestrator
         
-        # Verify the setup
-        result = subprocess.run([sys.executable, "scripts/verify_all_data.py"], 
-                              capture_output=True, text=True, check=True)
-        print_success("Data verification completed")
+        # Independent setup steps run concurrently; progress is saved for --resume
+        conn_params = deploy_orchestrator.load_connection_params()
+        result = deploy_orchestrator.run_deployment(conn_params, resume=resume)
+        deploy_orchestrator.print_summary(result)
+        if not result['passed']:
+            print_error("Database setup incomplete. Re-run with --resume to continue from the failed step.")
+            return False
+        print_success("Database setup and data verification completed")
         return True
-    except subprocess.CalledProcessError as e:
+    except Exception as e:
         print_error(f"Database setup failed: {e}")
-        print("Error details:", e.stderr)
         return False
 
 def test_streamlit():
@@ -119,6 +121,7 @@ def test_streamlit():
 
 def main():
     """Main deployment function"""
+    resume = '--resume' in sys.argv[1:]
     print_header("Superannuation Transcripts Demo - Sales Engineer Setup")
     print("🚀 Setting up your demo environment...")
     
@@ -135,7 +138,7 @@ def main():
         return False
     
     # Set up database
-    if not setup_database():
+    if not setup_database(resume=resume):
         print_error("Database setup failed. Please check your Snowflake connection and try again.")
         return False
     
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+CALL_ID Membership Index
+========================
+Snowflake does not enforce RAW_CALL_TRANSCRIPTS' PRIMARY KEY, so the loader
+drops already-loaded CALL_IDs itself before anything reaches the warehouse:
+
+- A Bloom filter answers "definitely new" for most IDs without a lookup
+- IDs the filter might have seen are confirmed against an exact set, so a
+  false positive never drops a genuinely new call
+- Both live in one local SQLite file and can be rebuilt from the table
+"""
+
+import hashlib
+import math
+import os
+import sqlite3
+
+DEFAULT_INDEX_PATH = os.environ.get('CALL_ID_INDEX_PATH', '.call_id_index.db')
+DEFAULT_CAPACITY = 100_000
+DEFAULT_ERROR_RATE = 0.001
+LOOKUP_CHUNK = 500
+FETCH_BATCH = 10_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS call_ids (call_id TEXT PRIMARY KEY) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value BLOB);
+"""
+
+def first_occurrence_mask(call_ids):
+    """One bool per ID, True only for its first occurrence in the batch"""
+    seen = set()
+    mask = []
+    for call_id in call_ids:
+        mask.append(call_id not in seen)
+        seen.add(call_id)
+    return mask
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing of one BLAKE2b digest)"""
+
+    def __init__(self, capacity, error_rate=DEFAULT_ERROR_RATE, bits=None):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(64, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8) if bits is None else bytearray(bits)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+class CallIdIndex:
+    """Persisted set of loaded CALL_IDs: Bloom filter in front of an exact SQLite set"""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH, error_rate=DEFAULT_ERROR_RATE):
+        self.path = path
+        self.error_rate = error_rate
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        self.stats = {'checked': 0, 'bloom_negative': 0, 'exact_lookups': 0, 'false_positives': 0, 'duplicates': 0}
+        self._load_bloom()
+
+    def _meta(self, key):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _load_bloom(self):
+        capacity = self._meta('bloom_capacity')
+        bits = self._meta('bloom_bits')
+        if capacity is not None and bits is not None:
+            self.bloom = BloomFilter(int(capacity), self.error_rate, bits)
+        else:
+            self._rebuild_bloom()
+
+    def _rebuild_bloom(self):
+        """Size the filter for twice the current population and refill it from the exact set"""
+        self.bloom = BloomFilter(max(DEFAULT_CAPACITY, 2 * len(self)), self.error_rate)
+        for (call_id,) in self.db.execute("SELECT call_id FROM call_ids"):
+            self.bloom.add(call_id)
+        self._save_bloom()
+
+    def _save_bloom(self):
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [('bloom_capacity', self.bloom.capacity), ('bloom_bits', bytes(self.bloom.bits))]
+            )
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM call_ids").fetchone()[0]
+
+    def __contains__(self, call_id):
+        return not self.new_ids_mask([call_id])[0]
+
+    def _existing(self, call_ids):
+        """Exact lookup of IDs in the set"""
+        found = set()
+        call_ids = list(call_ids)
+        for i in range(0, len(call_ids), LOOKUP_CHUNK):
+            chunk = call_ids[i:i + LOOKUP_CHUNK]
+            placeholders = ', '.join('?' for _ in chunk)
+            found.update(row[0] for row in self.db.execute(
+                f"SELECT call_id FROM call_ids WHERE call_id IN ({placeholders})", chunk
+            ))
+        return found
+
+    def new_ids_mask(self, call_ids, seen=None):
+        """
+        Return one bool per ID: True for the first occurrence of an ID not yet loaded
+        seen (a set) carries IDs already accepted earlier in the same batch, e.g.
+        across the files of one ingest run, and is updated in place.
+        """
+        seen = set() if seen is None else seen
+        candidates = set(call_ids) - seen
+        maybe = {call_id for call_id in candidates if call_id in self.bloom}
+        existing = self._existing(maybe)
+        self.stats['checked'] += len(call_ids)
+        self.stats['bloom_negative'] += len(candidates) - len(maybe)
+        self.stats['exact_lookups'] += len(maybe)
+        self.stats['false_positives'] += len(maybe) - len(existing)
+
+        mask = []
+        for call_id in call_ids:
+            keep = call_id not in existing and call_id not in seen
+            if keep:
+                seen.add(call_id)
+            mask.append(keep)
+        self.stats['duplicates'] += mask.count(False)
+        return mask
+
+    def add(self, call_ids):
+        """Record IDs as loaded (call after the load is committed)"""
+        call_ids = list(call_ids)
+        with self.db:
+            self.db.executemany("INSERT OR IGNORE INTO call_ids (call_id) VALUES (?)", ((call_id,) for call_id in call_ids))
+        if len(self) > self.bloom.capacity:
+            self._rebuild_bloom()
+            return
+        for call_id in call_ids:
+            self.bloom.add(call_id)
+        self._save_bloom()
+
+    def reset(self, call_ids=()):
+        """Replace the whole set, e.g. after a full reload of the table"""
+        with self.db:
+            self.db.execute("DELETE FROM call_ids")
+            self.db.executemany("INSERT OR IGNORE INTO call_ids (call_id) VALUES (?)", ((call_id,) for call_id in call_ids))
+        self._rebuild_bloom()
+
+    def rebuild(self, conn):
+        """Rebuild from RAW_CALL_TRANSCRIPTS (conn must be in the TRANSCRIPTS context); returns the ID count"""
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT CALL_ID FROM RAW_CALL_TRANSCRIPTS WHERE CALL_ID IS NOT NULL")
+            with self.db:
+                self.db.execute("DELETE FROM call_ids")
+                while True:
+                    rows = cursor.fetchmany(FETCH_BATCH)
+                    if not rows:
+                        break
+                    self.db.executemany("INSERT OR IGNORE INTO call_ids (call_id) VALUES (?)", rows)
+        finally:
+            cursor.close()
+        self._rebuild_bloom()
+        return len(self)
+
+    def close(self):
+        self.db.close()
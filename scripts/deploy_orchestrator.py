@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Demo Deployment Orchestrator
+============================
+Runs the demo setup in-process as a dependency graph instead of one script
+after another:
+
+- Each step (DDL, transcript load, customers, enrichment, analytics, views,
+  verification) declares the steps it depends on
+- Independent steps run concurrently, each on a connection from a small pool
+  opened from a single config read
+- Per-step timings and outcomes are written to a state file after every step,
+  so a failed deployment can be resumed without redoing finished work
+"""
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from pathlib import Path
+
+import snowflake.connector
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+PROJECT_DIR = SCRIPTS_DIR.parent
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import load_transcripts
+import populate_all_customers
+import populate_enriched_simple
+import quick_deploy_phase3_simple
+import run_sql
+import simple_customer_analytics
+import verify_all_data
+from run_sql import load_connection_params
+
+DEFAULT_STATE_PATH = PROJECT_DIR / '.deploy_state.json'
+DDL_PATH = PROJECT_DIR / 'sql' / '01_create_database_objects.sql'
+TRANSCRIPTS_PATH = PROJECT_DIR / 'call_transcripts_fixed.json'
+DEFAULT_WORKERS = 3
+
+CONTEXT_STATEMENTS = [
+    'USE DATABASE SUPERANNUATION',
+    'USE SCHEMA TRANSCRIPTS',
+    'USE WAREHOUSE MYWH'
+]
+# Created by the DDL step, so these may fail with "does not exist" until it has run
+DDL_CONTEXT_STATEMENTS = ('USE DATABASE', 'USE SCHEMA')
+DDL_STEP = 'ddl'
+
+PENDING = 'pending'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+def print_header(message):
+    """Print a formatted header"""
+    print("\n" + "=" * 60)
+    print(f" {message}")
+    print("=" * 60)
+
+def print_success(message):
+    """Print success message"""
+    print(f"✅ {message}")
+
+def print_error(message):
+    """Print error message"""
+    print(f"❌ {message}")
+
+def print_info(message):
+    """Print info message"""
+    print(f"ℹ️  {message}")
+
+class ConnectionPool:
+    """
+    Bounded pool of Snowflake connections
+    Connections are opened on first use and keep their session context, so the
+    USE statements run once per connection rather than once per step. Until
+    mark_objects_ready() (the DDL step has succeeded), a missing database or
+    schema is tolerated and context is retried on later checkouts; any other
+    context error - a missing warehouse, insufficient privileges - is raised.
+    """
+
+    def __init__(self, conn_params, size):
+        self.conn_params = conn_params
+        self.size = size
+        self._idle = queue.Queue()
+        self._opened = 0
+        self._with_context = set()
+        self._objects_ready = threading.Event()
+        self._lock = threading.Lock()
+
+    def mark_objects_ready(self):
+        """Database and schema exist from now on, so failing to use them is an error"""
+        self._objects_ready.set()
+
+    def acquire(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                conn = snowflake.connector.connect(**self.conn_params)
+            else:
+                conn = self._idle.get()
+
+        if id(conn) not in self._with_context:
+            try:
+                self._apply_context(conn)
+            except Exception:
+                self.release(conn)
+                raise
+        return conn
+
+    def release(self, conn):
+        self._idle.put(conn)
+
+    def _apply_context(self, conn):
+        cursor = conn.cursor()
+        try:
+            complete = True
+            for statement in CONTEXT_STATEMENTS:
+                try:
+                    cursor.execute(statement)
+                except snowflake.connector.errors.ProgrammingError as e:
+                    missing_before_ddl = (
+                        not self._objects_ready.is_set()
+                        and statement.startswith(DDL_CONTEXT_STATEMENTS)
+                        and 'does not exist' in str(e).lower()
+                    )
+                    if not missing_before_ddl:
+                        raise
+                    complete = False
+            if complete:
+                self._with_context.add(id(conn))
+        finally:
+            cursor.close()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+# ============================================================================
+# Steps
+# ============================================================================
+
+def run_ddl(conn):
+    """Create the database, schema, tables and stage from sql/01"""
+    report = run_sql.run_sql_file(conn, DDL_PATH, on_statement=run_sql.print_statement)
+    return report['passed']
+
+def run_transcript_load(conn):
+    """Load call_transcripts_fixed.json into RAW_CALL_TRANSCRIPTS"""
+    transcript_data = load_transcripts.load_json_data(TRANSCRIPTS_PATH)
+    if not transcript_data:
+        return False
+    return load_transcripts.insert_transcripts(conn, transcript_data)
+
+def run_views(conn):
+    """Create CUSTOMER_360_VIEW and MANAGER_DASHBOARD_SUMMARY"""
+    cursor = conn.cursor()
+    try:
+        quick_deploy_phase3_simple.create_demo_views(cursor)
+        return True
+    finally:
+        cursor.close()
+
+def run_verification(conn):
+    """Run the cross-table consistency checks"""
+    return verify_all_data.verify_data_consistency(conn)
+
+# name -> (description, dependencies, fn(conn) returning True on success)
+STEPS = {
+    'ddl': ("Create database objects", [], run_ddl),
+    'transcripts': ("Load call transcripts", ['ddl'], run_transcript_load),
+    'customers': ("Populate customers", ['ddl'], populate_all_customers.populate_customer_table),
+    'enrichment': ("Populate enriched transcripts", ['ddl'], populate_enriched_simple.populate_enriched_transcripts),
+    'analytics': ("Populate customer analytics", ['customers'], simple_customer_analytics.populate_customer_analytics_simple),
+    'views': ("Create reporting views", ['customers', 'enrichment', 'analytics'], run_views),
+    'verification': ("Verify demo data", ['transcripts', 'views'], run_verification)
+}
+
+def downstream_of(names, steps=STEPS):
+    """Return the given steps plus every step that depends on them"""
+    selected = set(names)
+    changed = True
+    while changed:
+        changed = False
+        for name, (_, deps, _) in steps.items():
+            if name not in selected and selected.intersection(deps):
+                selected.add(name)
+                changed = True
+    return selected
+
+def read_state(state_path):
+    """Return the saved per-step state, or an empty dict"""
+    try:
+        with open(state_path) as f:
+            return json.load(f).get('steps', {})
+    except (OSError, ValueError):
+        return {}
+
+def write_state(state_path, step_state):
+    """Persist step state atomically so an interrupted run can be resumed"""
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'updated_at': datetime.now().isoformat(), 'steps': step_state}, f, indent=2)
+    os.replace(tmp_path, state_path)
+
+def run_deployment(conn_params, steps=STEPS, workers=DEFAULT_WORKERS, state_path=DEFAULT_STATE_PATH, resume=False, force=()):
+    """
+    Run the setup steps in dependency order, concurrently where possible
+    With resume=True, steps that succeeded in a previous run are skipped unless
+    named in force (which also re-runs everything downstream of them).
+    Returns dict with passed, total_seconds and the per-step state.
+    """
+    unknown = set(force) - set(steps)
+    if unknown:
+        raise ValueError(f"Unknown steps: {', '.join(sorted(unknown))}")
+
+    previous = read_state(state_path) if resume else {}
+    rerun = downstream_of(force, steps)
+    step_state = {}
+    for name in steps:
+        if previous.get(name, {}).get('status') in (SUCCEEDED, SKIPPED) and name not in rerun:
+            step_state[name] = dict(previous[name], status=SKIPPED)
+        else:
+            step_state[name] = {'status': PENDING}
+    write_state(state_path, step_state)
+
+    def done(name):
+        return step_state[name]['status'] in (SUCCEEDED, SKIPPED)
+
+    def execute(name):
+        conn = pool.acquire()
+        try:
+            return steps[name][2](conn)
+        finally:
+            pool.release(conn)
+
+    pool = ConnectionPool(conn_params, workers)
+    if DDL_STEP not in steps or done(DDL_STEP):
+        pool.mark_objects_ready()
+    started = time.time()
+    running = {}
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="deploy-step") as executor:
+            while True:
+                for name, (description, deps, _) in steps.items():
+                    if step_state[name]['status'] == PENDING and all(done(dep) for dep in deps):
+                        print_info(f"Starting {name}: {description}")
+                        step_state[name] = {'status': RUNNING, 'started_at': time.time()}
+                        running[executor.submit(execute, name)] = name
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    entry = step_state[name]
+                    entry['seconds'] = round(time.time() - entry['started_at'], 2)
+                    try:
+                        ok = future.result()
+                        error = None if ok else "step reported failure"
+                    except Exception as e:
+                        error = str(e)
+                    if error is None:
+                        entry['status'] = SUCCEEDED
+                        if name == DDL_STEP:
+                            pool.mark_objects_ready()
+                        print_success(f"{name} finished in {entry['seconds']:.1f}s")
+                    else:
+                        entry['status'] = FAILED
+                        entry['error'] = error
+                        print_error(f"{name} failed after {entry['seconds']:.1f}s: {error}")
+                    write_state(state_path, step_state)
+    finally:
+        pool.close()
+
+    return {
+        'passed': all(done(name) for name in steps),
+        'total_seconds': round(time.time() - started, 2),
+        'steps': step_state
+    }
+
+def print_summary(result):
+    """Print per-step status and timing"""
+    print_header("DEPLOYMENT STEPS")
+    for name, entry in result['steps'].items():
+        seconds = f"{entry['seconds']:.1f}s" if 'seconds' in entry else "-"
+        print(f"  {name:<14} {entry['status']:<10} {seconds:>8}")
+    print(f"\n  Total: {result['total_seconds']:.1f}s")
+    blocked = [name for name, entry in result['steps'].items() if entry['status'] == PENDING]
+    if blocked:
+        print_info(f"Not started (blocked by a failed dependency): {', '.join(blocked)}")
+
+def main(argv=None):
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Deploy the demo database as a dependency graph of steps")
+    parser.add_argument('--config', default=str(run_sql.DEFAULT_CONFIG_PATH), help="Snowflake config.toml path")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Steps (and connections) run concurrently")
+    parser.add_argument('--state', default=str(DEFAULT_STATE_PATH), help="Step state file used for --resume")
+    parser.add_argument('--resume', action='store_true', help="Skip steps that succeeded in the previous run")
+    parser.add_argument('--force', action='append', default=[], choices=list(STEPS),
+                        help="Re-run this step and its dependents even when resuming (repeatable)")
+    args = parser.parse_args(argv)
+
+    print_header("DEMO DEPLOYMENT")
+    try:
+        conn_params = load_connection_params(args.config)
+    except Exception as e:
+        print_error(f"Failed to read Snowflake config: {str(e)}")
+        return 1
+
+    result = run_deployment(
+        conn_params, workers=args.workers, state_path=args.state,
+        resume=args.resume, force=args.force
+    )
+    print_summary(result)
+    if not result['passed']:
+        print_error("Deployment incomplete - fix the error above and re-run with --resume")
+        return 1
+    print_success("Deployment completed")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
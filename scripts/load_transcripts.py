@@ -5,12 +5,22 @@ Load Call Transcripts from JSON to Snowflake
 This script loads the call transcript data from the JSON file into Snowflake.
 """
 
-import json
+import argparse
 import snowflake.connector
 import tomli
 from pathlib import Path
 import sys
 
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+from transcript_normalizer import normalize_transcripts, read_transcript_file, to_insert_rows, write_rejects
+from transcript_ingest import DEFAULT_MANIFEST_PATH, DEFAULT_WORKERS, ingest_files
+from call_id_index import DEFAULT_INDEX_PATH, CallIdIndex, first_occurrence_mask
+from near_duplicates import DEFAULT_DB_PATH as DEFAULT_NEAR_DUP_PATH, NearDuplicateIndex
+from transcript_corpus import DEFAULT_CORPUS_DIR, read_meta as read_corpus_meta, remove_corpus
+
+DEFAULT_REJECT_PATH = 'transcript_rejects.jsonl'
+
 def print_header(message):
     """Print a formatted header"""
     print("\n" + "=" * 60)
@@ -39,27 +49,45 @@ def get_snowflake_connection():
         default_conn = config['default_connection_name']
         conn_params = config['connections'][default_conn]
         
-        return snowflake.connector.connect(**conn_params)
+        # qmark binds are sent to the server rather than interpolated client-side
+        return snowflake.connector.connect(**dict(conn_params, paramstyle='qmark'))
     except Exception as e:
         print_error(f"Failed to connect to Snowflake: {str(e)}")
         return None
 
 def load_json_data(file_path):
-    """Load and parse JSON data"""
+    """Load and parse JSON (array or newline-delimited) data into an Arrow table"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = read_transcript_file(file_path)
         print_success(f"Loaded {len(data)} records from JSON file")
         return data
     except Exception as e:
         print_error(f"Failed to load JSON data: {str(e)}")
         return None
 
-def insert_transcripts(conn, transcript_data):
-    """Insert transcript data into Snowflake"""
+def insert_transcripts(conn, transcript_data, reject_path=DEFAULT_REJECT_PATH, index_path=DEFAULT_INDEX_PATH,
+                       near_dup_path=DEFAULT_NEAR_DUP_PATH, corpus_dir=DEFAULT_CORPUS_DIR):
+    """Replace RAW_CALL_TRANSCRIPTS with transcript_data; invalid records are written to reject_path"""
     cursor = conn.cursor()
     
     try:
+        # Validate and normalize the whole batch before touching the table
+        normalized = normalize_transcripts(transcript_data)
+        stats = normalized['stats']
+        print_info(f"Normalized {stats['rows']} records in {stats['seconds']:.3f}s ({stats['rows_per_second']:,.0f} rows/s)")
+        if stats['rejected']:
+            write_rejects(normalized['rejects'], reject_path)
+            print_error(f"Rejected {stats['rejected']} invalid records - see {reject_path}")
+        
+        # The table is cleared below, so only repeats within this batch are duplicates
+        table = normalized['table']
+        call_ids = table.column('CALL_ID').to_pylist()
+        mask = first_occurrence_mask(call_ids)
+        if not all(mask):
+            print_info(f"Dropped {mask.count(False)} duplicate CALL_IDs")
+            table = table.filter(mask)
+        rows = to_insert_rows(table)
+        
         # Set context
         cursor.execute('USE DATABASE SUPERANNUATION')
         cursor.execute('USE SCHEMA TRANSCRIPTS')
@@ -78,37 +106,42 @@ def insert_transcripts(conn, transcript_data):
             CALL_TIMESTAMP,
             CALL_DURATION_SECONDS,
             TRANSCRIPT_TEXT
-        ) VALUES (%s, %s, %s, %s, %s, %s)
+        ) VALUES (?, ?, ?, ?, ?, ?)
         """
         
         # Insert data in batches
         batch_size = 50
-        total_records = len(transcript_data)
+        total_records = len(rows)
         
         for i in range(0, total_records, batch_size):
-            batch = transcript_data[i:i+batch_size]
-            batch_data = []
-            
-            for record in batch:
-                # Convert timestamp format if needed
-                timestamp = record.get('CALL_TIMESTAMP', '').replace('T', ' ').replace('Z', '')
-                
-                batch_data.append((
-                    record.get('CALL_ID'),
-                    record.get('CUSTOMER_ID'),
-                    record.get('AGENT_ID'),
-                    timestamp,
-                    record.get('CALL_DURATION_SECONDS'),
-                    record.get('TRANSCRIPT_TEXT')
-                ))
-            
-            cursor.executemany(insert_sql, batch_data)
+            batch = rows[i:i+batch_size]
+            cursor.executemany(insert_sql, batch)
             print_info(f"Inserted batch {i//batch_size + 1} ({len(batch)} records)")
         
         # Commit the transaction
         conn.commit()
         print_success(f"Successfully inserted {total_records} call transcripts")
         
+        # The loaded IDs are now exactly the table's contents
+        index = CallIdIndex(index_path)
+        try:
+            index.reset(row[0] for row in rows)
+        finally:
+            index.close()
+        
+        # Signatures are keyed by content, so results recorded before a reload stay reusable
+        near_duplicates = NearDuplicateIndex(near_dup_path)
+        try:
+            added = near_duplicates.add((row[0], row[5]) for row in rows)
+            print_info(f"Added {added} transcripts to the near-duplicate index")
+        finally:
+            near_duplicates.close()
+        
+        # A reload can reuse CALL_IDs with new text, so the local corpus must not serve the old text
+        if read_corpus_meta(corpus_dir) is not None:
+            remove_corpus(corpus_dir)
+            print_info(f"Removed the local transcript corpus in {corpus_dir} - run sync_transcript_corpus.py to rebuild it")
+        
         # Verify the data
         cursor.execute('SELECT COUNT(*) FROM RAW_CALL_TRANSCRIPTS')
         count = cursor.fetchone()[0]
@@ -139,10 +172,64 @@ def insert_transcripts(conn, transcript_data):
     finally:
         cursor.close()
 
+def ingest_exports(patterns, manifest_path, workers, rebuild_index=False):
+    """Append every not-yet-loaded export file matching patterns in one batch"""
+    print_info("Connecting to Snowflake...")
+    conn = get_snowflake_connection()
+    if not conn:
+        return 1
+    
+    print_success("Connected to Snowflake")
+    
+    cursor = conn.cursor()
+    try:
+        # Set context
+        cursor.execute('USE DATABASE SUPERANNUATION')
+        cursor.execute('USE SCHEMA TRANSCRIPTS')
+        cursor.execute('USE WAREHOUSE MYWH')
+        
+        report = ingest_files(conn, patterns, manifest_path=manifest_path, workers=workers, rebuild_index=rebuild_index)
+        if report['skipped']:
+            print_info(f"Skipped {len(report['skipped'])} files already in {manifest_path}")
+        if not report['files']:
+            print_success("No new export files to load")
+            return 0
+        
+        print_success(f"Batch {report['batch_id']}: {report['rows_loaded']} records loaded from {report['files']} files")
+        for name, seconds in report['timings'].items():
+            print_info(f"{name.replace('_seconds', '')}: {seconds:.2f}s")
+        if report['near_duplicates_indexed']:
+            print_info(f"Added {report['near_duplicates_indexed']} transcripts to the near-duplicate index")
+        if report['rows_duplicate']:
+            print_info(f"Dropped {report['rows_duplicate']} CALL_IDs that were already loaded or repeated in the batch")
+        if report['rows_rejected']:
+            print_error(f"Rejected {report['rows_rejected']} invalid records - see:")
+            for reject_path in report['reject_files']:
+                print(f"  {reject_path}")
+        return 0
+    except Exception as e:
+        print_error(f"Failed to ingest export files: {str(e)}")
+        return 1
+    finally:
+        cursor.close()
+        conn.close()
+
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Load call transcripts into Snowflake")
+    parser.add_argument('paths', nargs='*',
+                        help="Export files, directories or glob patterns to append (default: reload call_transcripts_fixed.json)")
+    parser.add_argument('--manifest', default=DEFAULT_MANIFEST_PATH, help="Manifest of files already loaded")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Processes used to parse and normalize files")
+    parser.add_argument('--rebuild-index', action='store_true',
+                        help="Rebuild the loaded CALL_ID index from RAW_CALL_TRANSCRIPTS before ingesting")
+    args = parser.parse_args()
+    
     print_header("LOAD CALL TRANSCRIPTS TO SNOWFLAKE")
     
+    if args.paths:
+        return ingest_exports(args.paths, args.manifest, args.workers, args.rebuild_index)
+    
     # Check if JSON file exists
     json_file = Path('call_transcripts_fixed.json')
     if not json_file.exists():
@@ -5,11 +5,15 @@ Populate All Customers Table
 This script ensures the CUSTOMER table has all 15 customers with realistic data.
 """
 
+import json
 import snowflake.connector
+from snowflake.connector.pandas_tools import write_pandas
 import tomli
 from pathlib import Path
 import sys
-import random
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
 
 def print_header(message):
     """Print a formatted header"""
@@ -39,7 +43,8 @@ def get_snowflake_connection():
         default_conn = config['default_connection_name']
         conn_params = config['connections'][default_conn]
         
-        return snowflake.connector.connect(**conn_params)
+        # qmark binds are sent to the server rather than interpolated client-side
+        return snowflake.connector.connect(**dict(conn_params, paramstyle='qmark'))
     except Exception as e:
         print_error(f"Failed to connect to Snowflake: {str(e)}")
         return None
@@ -142,6 +147,75 @@ def generate_customer_data():
     
     return customers
 
+# Churn probability range per risk score
+CHURN_PROBABILITY_RANGES = {
+    'High': (0.65, 0.85),
+    'Medium': (0.35, 0.55),
+    'Low': (0.10, 0.30)
+}
+
+# Staging table for the bulk load; PRODUCT_HOLDINGS arrives as JSON text
+STAGING_TABLE = 'CUSTOMER_LOAD_STAGE'
+
+def build_customer_frame(customers):
+    """
+    Build the CUSTOMER rows as one DataFrame
+    Random fields are drawn per column rather than per row
+    """
+    frame = pd.DataFrame(customers)
+    count = len(frame)
+    
+    # Calculate churn probability based on risk score
+    low = frame['risk_score'].map(lambda risk: CHURN_PROBABILITY_RANGES[risk][0]).to_numpy()
+    high = frame['risk_score'].map(lambda risk: CHURN_PROBABILITY_RANGES[risk][1]).to_numpy()
+    churn_prob = np.round(np.random.uniform(low, high), 2)
+    
+    # Last interaction date within the last 30 days
+    today = date.today()
+    days_ago = np.random.randint(1, 31, count)
+    
+    return pd.DataFrame({
+        'CUSTOMER_ID': frame['id'],
+        'CUSTOMER_NAME': frame['name'],
+        'AGE': frame['age'],
+        'TENURE_YEARS': frame['tenure'],
+        'ACCOUNT_BALANCE': frame['balance'],
+        'INVESTMENT_OPTION': frame['investment'],
+        'RECENT_TRANSACTIONS': np.random.randint(1, 6, count),
+        'LAST_INTERACTION_DATE': [today - timedelta(days=int(days)) for days in days_ago],
+        'PRODUCT_HOLDINGS': [json.dumps([f"{investment} Fund", "Default Insurance"]) for investment in frame['investment']],
+        'CONTACT_PREFERENCE': frame['contact'],
+        'CALL_FREQUENCY_LAST_MONTH': frame['call_freq'],
+        'AVG_SENTIMENT_LAST_3_CALLS': frame['avg_sentiment'],
+        'NUM_NEGATIVE_CALLS_LAST_6_MONTHS': frame['negative_calls'],
+        'HAS_CHURN_INTENT_LAST_MONTH': frame['churn_intent'].astype(bool),
+        'CHURN_RISK_SCORE': frame['risk_score'],
+        'CHURN_PROBABILITY': churn_prob,
+        'NEXT_BEST_ACTION': 'Generated by system'
+    })
+
+def bulk_load_customers(conn, cursor, frame):
+    """
+    Load a customer DataFrame into CUSTOMER in one pass
+    write_pandas stages the frame as Parquet and COPYs it into a temporary table;
+    a single INSERT ... SELECT then converts PRODUCT_HOLDINGS to VARIANT
+    """
+    success, _, rows, _ = write_pandas(
+        conn, frame, STAGING_TABLE,
+        auto_create_table=True, table_type='temporary', overwrite=True
+    )
+    if not success:
+        raise RuntimeError(f"Bulk load into {STAGING_TABLE} failed")
+    print_info(f"Staged {rows} customer rows")
+    
+    columns = [column for column in frame.columns if column != 'PRODUCT_HOLDINGS']
+    cursor.execute(f"""
+        INSERT INTO CUSTOMER ({', '.join(columns)}, PRODUCT_HOLDINGS)
+        SELECT {', '.join(f'"{column}"' for column in columns)}, PARSE_JSON("PRODUCT_HOLDINGS")
+        FROM {STAGING_TABLE}
+    """)
+    return rows
+
 def populate_customer_table(conn):
     """Populate customer table with all 15 customers"""
     cursor = conn.cursor()
@@ -162,53 +236,7 @@ def populate_customer_table(conn):
         
         # Insert data
         print_info("Inserting customer data...")
-        
-        for customer in customers:
-            # Generate product holdings as JSON
-            product_holdings = f'[\\"{customer["investment"]} Fund\\", \\"Default Insurance\\"]'
-            
-            # Calculate churn probability based on risk score
-            churn_prob = {
-                'High': round(random.uniform(0.65, 0.85), 2),
-                'Medium': round(random.uniform(0.35, 0.55), 2),
-                'Low': round(random.uniform(0.10, 0.30), 2)
-            }[customer['risk_score']]
-            
-            # Generate recent transactions
-            recent_transactions = random.randint(1, 5)
-            
-            # Generate last interaction date (within last 30 days)
-            days_ago = random.randint(1, 30)
-            
-            insert_sql = f"""
-            INSERT INTO CUSTOMER (
-                CUSTOMER_ID, CUSTOMER_NAME, AGE, TENURE_YEARS, ACCOUNT_BALANCE,
-                INVESTMENT_OPTION, RECENT_TRANSACTIONS, LAST_INTERACTION_DATE,
-                PRODUCT_HOLDINGS, CONTACT_PREFERENCE, CALL_FREQUENCY_LAST_MONTH,
-                AVG_SENTIMENT_LAST_3_CALLS, NUM_NEGATIVE_CALLS_LAST_6_MONTHS,
-                HAS_CHURN_INTENT_LAST_MONTH, CHURN_RISK_SCORE, CHURN_PROBABILITY,
-                NEXT_BEST_ACTION
-            ) 
-            SELECT 
-                '{customer['id']}',
-                '{customer['name']}',
-                {customer['age']},
-                {customer['tenure']},
-                {customer['balance']},
-                '{customer['investment']}',
-                {recent_transactions},
-                CURRENT_DATE - {days_ago},
-                PARSE_JSON('{product_holdings}'),
-                '{customer['contact']}',
-                {customer['call_freq']},
-                {customer['avg_sentiment']},
-                {customer['negative_calls']},
-                {str(customer['churn_intent']).lower()},
-                '{customer['risk_score']}',
-                {churn_prob},
-                'Generated by system'
-            """
-            cursor.execute(insert_sql)
+        bulk_load_customers(conn, cursor, build_customer_frame(customers))
         
         # Commit the transaction
         conn.commit()
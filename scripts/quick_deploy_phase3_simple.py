@@ -8,6 +8,72 @@ Creates minimal demo data to showcase hybrid churn prediction and AI-powered NBA
 import snowflake.connector
 import tomli
 
+# Reporting views, created after CUSTOMER, CUSTOMER_ANALYTICS and
+# ENRICHED_TRANSCRIPTS_ALL are populated
+DEMO_VIEWS = {
+    'CUSTOMER_360_VIEW': """
+    CREATE VIEW CUSTOMER_360_VIEW AS
+    SELECT 
+        ca.CUSTOMER_ID,
+        ca.CUSTOMER_NAME,
+        c.AGE,
+        c.TENURE_YEARS,
+        c.ACCOUNT_BALANCE,
+        c.INVESTMENT_OPTION,
+        c.CONTACT_PREFERENCE,
+        ca.CHURN_PROBABILITY,
+        ca.CHURN_RISK_SCORE,
+        ca.MODEL_CONFIDENCE,
+        ca.NEXT_BEST_ACTION,
+        ca.NBA_REASONING,
+        ca.LAST_UPDATED,
+        c.CALL_FREQUENCY_LAST_MONTH,
+        c.AVG_SENTIMENT_LAST_3_CALLS,
+        c.NUM_NEGATIVE_CALLS_LAST_6_MONTHS,
+        latest_call.CALL_TIMESTAMP AS LAST_CALL_DATE,
+        latest_call.SENTIMENT_LABEL AS LAST_CALL_SENTIMENT,
+        latest_call.PRIMARY_INTENT AS LAST_CALL_INTENT,
+        latest_call.CALL_SUMMARY AS LAST_CALL_SUMMARY
+    FROM CUSTOMER_ANALYTICS ca
+    JOIN CUSTOMER c ON ca.CUSTOMER_ID = c.CUSTOMER_ID
+    LEFT JOIN (
+        SELECT DISTINCT
+            CUSTOMER_ID,
+            FIRST_VALUE(CALL_TIMESTAMP) OVER (PARTITION BY CUSTOMER_ID ORDER BY CALL_TIMESTAMP DESC) AS CALL_TIMESTAMP,
+            FIRST_VALUE(SENTIMENT_LABEL) OVER (PARTITION BY CUSTOMER_ID ORDER BY CALL_TIMESTAMP DESC) AS SENTIMENT_LABEL,
+            FIRST_VALUE(PRIMARY_INTENT) OVER (PARTITION BY CUSTOMER_ID ORDER BY CALL_TIMESTAMP DESC) AS PRIMARY_INTENT,
+            FIRST_VALUE(CALL_SUMMARY) OVER (PARTITION BY CUSTOMER_ID ORDER BY CALL_TIMESTAMP DESC) AS CALL_SUMMARY
+        FROM ENRICHED_TRANSCRIPTS_ALL
+    ) latest_call ON ca.CUSTOMER_ID = latest_call.CUSTOMER_ID
+    """,
+    'MANAGER_DASHBOARD_SUMMARY': """
+    CREATE VIEW MANAGER_DASHBOARD_SUMMARY AS
+    SELECT 
+        COUNT(*) AS total_customers,
+        COUNT(CASE WHEN CHURN_RISK_SCORE = 'High' THEN 1 END) AS high_risk_customers,
+        COUNT(CASE WHEN CHURN_RISK_SCORE = 'Low' THEN 1 END) AS low_risk_customers,
+        AVG(MODEL_CONFIDENCE) AS avg_model_confidence,
+        AVG(CHURN_PROBABILITY) AS avg_churn_probability,
+        MAX(ca.LAST_UPDATED) AS last_model_run
+    FROM CUSTOMER_ANALYTICS ca
+    """
+}
+
+def create_demo_views(cursor):
+    """(Re)create the reporting views; a placeholder table of the same name is dropped first"""
+    cursor.execute(
+        "SELECT TABLE_NAME FROM INFORMATION_SCHEMA.TABLES "
+        "WHERE TABLE_SCHEMA = CURRENT_SCHEMA() AND TABLE_TYPE = 'BASE TABLE' "
+        f"AND TABLE_NAME IN ({', '.join('?' for _ in DEMO_VIEWS)})",
+        list(DEMO_VIEWS)
+    )
+    for (table_name,) in cursor.fetchall():
+        cursor.execute(f'DROP TABLE {table_name}')
+
+    for view_name, definition in DEMO_VIEWS.items():
+        cursor.execute(f'DROP VIEW IF EXISTS {view_name}')
+        cursor.execute(definition)
+
 def main():
     print("🚀 Simplified Phase 3 Hybrid AI+ML Deployment")
     print("=" * 50)
@@ -17,7 +83,7 @@ def main():
         config = tomli.load(f)
     default_conn = config['default_connection_name']
     conn_params = config['connections'][default_conn]
-    conn = snowflake.connector.connect(**conn_params)
+    conn = snowflake.connector.connect(**dict(conn_params, paramstyle='qmark'))
 
     cursor = conn.cursor()
 
@@ -184,58 +250,9 @@ def main():
         """)
         print("✅ AI-powered customer analytics created")
 
-        # Create Customer 360 View
-        cursor.execute('DROP VIEW IF EXISTS CUSTOMER_360_VIEW')
-        cursor.execute("""
-            CREATE VIEW CUSTOMER_360_VIEW AS
-            SELECT 
-                ca.CUSTOMER_ID,
-                ca.CUSTOMER_NAME,
-                c.AGE,
-                c.TENURE_YEARS,
-                c.ACCOUNT_BALANCE,
-                c.INVESTMENT_OPTION,
-                c.CONTACT_PREFERENCE,
-                ca.CHURN_PROBABILITY,
-                ca.CHURN_RISK_SCORE,
-                ca.MODEL_CONFIDENCE,
-                ca.NEXT_BEST_ACTION,
-                ca.NBA_REASONING,
-                ca.LAST_UPDATED,
-                c.CALL_FREQUENCY_LAST_MONTH,
-                c.AVG_SENTIMENT_LAST_3_CALLS,
-                c.NUM_NEGATIVE_CALLS_LAST_6_MONTHS,
-                latest_call.CALL_TIMESTAMP AS LAST_CALL_DATE,
-                latest_call.SENTIMENT_LABEL AS LAST_CALL_SENTIMENT,
-                latest_call.PRIMARY_INTENT AS LAST_CALL_INTENT,
-                latest_call.CALL_SUMMARY AS LAST_CALL_SUMMARY
-            FROM CUSTOMER_ANALYTICS ca
-            JOIN CUSTOMER c ON ca.CUSTOMER_ID = c.CUSTOMER_ID
-            LEFT JOIN (
-                SELECT DISTINCT
-                    CUSTOMER_ID,
-                    FIRST_VALUE(CALL_TIMESTAMP) OVER (PARTITION BY CUSTOMER_ID ORDER BY CALL_TIMESTAMP DESC) AS CALL_TIMESTAMP,
-                    FIRST_VALUE(SENTIMENT_LABEL) OVER (PARTITION BY CUSTOMER_ID ORDER BY CALL_TIMESTAMP DESC) AS SENTIMENT_LABEL,
-                    FIRST_VALUE(PRIMARY_INTENT) OVER (PARTITION BY CUSTOMER_ID ORDER BY CALL_TIMESTAMP DESC) AS PRIMARY_INTENT,
-                    FIRST_VALUE(CALL_SUMMARY) OVER (PARTITION BY CUSTOMER_ID ORDER BY CALL_TIMESTAMP DESC) AS CALL_SUMMARY
-                FROM ENRICHED_TRANSCRIPTS_ALL
-            ) latest_call ON ca.CUSTOMER_ID = latest_call.CUSTOMER_ID
-        """)
+        # Create the Customer 360 and Manager Dashboard views
+        create_demo_views(cursor)
         print("✅ Customer 360 View created")
-
-        # Create Manager Dashboard Summary
-        cursor.execute('DROP VIEW IF EXISTS MANAGER_DASHBOARD_SUMMARY')
-        cursor.execute("""
-            CREATE VIEW MANAGER_DASHBOARD_SUMMARY AS
-            SELECT 
-                COUNT(*) AS total_customers,
-                COUNT(CASE WHEN CHURN_RISK_SCORE = 'High' THEN 1 END) AS high_risk_customers,
-                COUNT(CASE WHEN CHURN_RISK_SCORE = 'Low' THEN 1 END) AS low_risk_customers,
-                AVG(MODEL_CONFIDENCE) AS avg_model_confidence,
-                AVG(CHURN_PROBABILITY) AS avg_churn_probability,
-                MAX(ca.LAST_UPDATED) AS last_model_run
-            FROM CUSTOMER_ANALYTICS ca
-        """)
         print("✅ Manager dashboard view created")
 
         # Validation and demo results
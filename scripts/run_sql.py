@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+SQL Script Runner
+=================
+Runs the scripts in sql/ against Snowflake statement by statement:
+
+- Statements are split locally (comments, quoted strings and $$ blocks are
+  handled) so each one can be numbered, timed and resumed with --from-statement
+- Statements stream through the connector's execute_stream, which executes
+  each statement only as its cursor is consumed
+- Consecutive DDL on unrelated objects forms independent chains that can run
+  concurrently on extra connections (--workers); USE, DML and queries are
+  barriers and always run in file order
+"""
+
+import argparse
+import io
+import json
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import snowflake.connector
+import tomli
+
+DEFAULT_CONFIG_PATH = Path.home() / '.snowflake' / 'config.toml'
+
+CONTEXT = 'context'
+DDL = 'ddl'
+STATEMENT = 'statement'
+
+USE_PATTERN = re.compile(r'^USE\s', re.IGNORECASE)
+CONTAINER_PATTERN = re.compile(r'^CREATE\s+(OR\s+REPLACE\s+)?(DATABASE|SCHEMA)\b', re.IGNORECASE)
+DDL_PATTERN = re.compile(
+    r'^(?:CREATE(?:\s+OR\s+REPLACE)?(?:\s+(?:TEMPORARY|TRANSIENT|SECURE))*|ALTER|DROP)\s+'
+    r'(TABLE|VIEW|MATERIALIZED\s+VIEW|STAGE|FILE\s+FORMAT|SEQUENCE|STREAM|TASK|FUNCTION|PROCEDURE)\s+'
+    r'(?:IF\s+(?:NOT\s+)?EXISTS\s+)?([\w.$"]+)',
+    re.IGNORECASE
+)
+
+def print_header(message):
+    """Print a formatted header"""
+    print("\n" + "=" * 60)
+    print(f" {message}")
+    print("=" * 60)
+
+def print_success(message):
+    """Print success message"""
+    print(f"✅ {message}")
+
+def print_error(message):
+    """Print error message"""
+    print(f"❌ {message}")
+
+def print_info(message):
+    """Print info message"""
+    print(f"ℹ️  {message}")
+
+def load_connection_params(config_path=DEFAULT_CONFIG_PATH):
+    """Read the default connection from config.toml"""
+    with open(config_path, 'rb') as f:
+        config = tomli.load(f)
+    default_conn = config['default_connection_name']
+    # qmark binds are sent to the server rather than interpolated client-side
+    return dict(config['connections'][default_conn], paramstyle='qmark')
+
+# ============================================================================
+# Parsing
+# ============================================================================
+
+def _read_until(sql_text, i, terminator):
+    """Index just past the next terminator (or the end of the text)"""
+    end = sql_text.find(terminator, i)
+    return len(sql_text) if end == -1 else end + len(terminator)
+
+def _read_quoted(sql_text, i):
+    """Index just past the quoted string or identifier starting at i"""
+    quote = sql_text[i]
+    i += 1
+    while i < len(sql_text):
+        ch = sql_text[i]
+        if ch == '\\' and quote == "'":
+            i += 2
+            continue
+        if ch == quote:
+            if sql_text[i + 1:i + 2] == quote:
+                i += 2
+                continue
+            return i + 1
+        i += 1
+    return i
+
+def split_statements(sql_text):
+    """
+    Split a SQL script into statements with comments removed
+    Returns a list of dicts with index (1-based), line (where the statement
+    starts in the file) and text (without the trailing semicolon).
+    """
+    statements = []
+    parts = []
+    start_line = None
+    line = 1
+    i = 0
+
+    def flush():
+        text = ''.join(parts).strip()
+        if text:
+            statements.append({'index': len(statements) + 1, 'line': start_line, 'text': text})
+
+    while i < len(sql_text):
+        ch = sql_text[i]
+        pair = sql_text[i:i + 2]
+        if pair == '--' or pair == '//':
+            end = sql_text.find('\n', i)
+            i = len(sql_text) if end == -1 else end
+            continue
+        if pair == '/*':
+            end = _read_until(sql_text, i + 2, '*/')
+            line += sql_text.count('\n', i, end)
+            parts.append(' ')
+            i = end
+            continue
+        if ch == ';':
+            flush()
+            parts = []
+            start_line = None
+            i += 1
+            continue
+
+        if pair == '$$':
+            end = _read_until(sql_text, i + 2, '$$')
+        elif ch in ("'", '"'):
+            end = _read_quoted(sql_text, i)
+        else:
+            end = i + 1
+        chunk = sql_text[i:end]
+        if start_line is None and not chunk.isspace():
+            start_line = line
+        parts.append(chunk)
+        line += chunk.count('\n')
+        i = end
+
+    flush()
+    return statements
+
+def _object_name(name):
+    """Unqualified, upper-cased object name"""
+    return name.split('.')[-1].strip('"').upper()
+
+def classify_statement(text):
+    """Return (kind, target object or None) for a statement"""
+    if USE_PATTERN.match(text) or CONTAINER_PATTERN.match(text):
+        return CONTEXT, None
+    match = DDL_PATTERN.match(text)
+    if match:
+        return DDL, _object_name(match.group(2))
+    return STATEMENT, None
+
+def plan_statements(statements):
+    """
+    Group statements into segments that run one after another
+    Each segment is a list of chains; a chain runs in order on one connection.
+    Runs of DDL are split into chains of statements touching related objects
+    (an ALTER follows its CREATE, a view follows the tables it selects from),
+    and separate chains may run concurrently. Everything else streams in file order.
+    """
+    for statement in statements:
+        statement['kind'], statement['target'] = classify_statement(statement['text'])
+    targets = {statement['target'] for statement in statements if statement['target']}
+    word_pattern = re.compile(r'[\w$]+')
+
+    segments = []
+    run = []
+
+    def close_run():
+        if not run:
+            return
+        # Union statements that share an object
+        chains = []
+        for statement in run:
+            words = {word.upper() for word in word_pattern.findall(statement['text'])}
+            objects = {statement['target']} | (words & targets)
+            joined = [chain for chain in chains if chain['objects'] & objects]
+            merged = {'objects': set(objects), 'statements': []}
+            for chain in joined:
+                merged['objects'] |= chain['objects']
+                merged['statements'].extend(chain['statements'])
+                chains.remove(chain)
+            merged['statements'].append(statement)
+            merged['statements'].sort(key=lambda s: s['index'])
+            chains.append(merged)
+        chains.sort(key=lambda chain: chain['statements'][0]['index'])
+        segments.append([chain['statements'] for chain in chains])
+        run.clear()
+
+    for statement in statements:
+        if statement['kind'] == DDL:
+            run.append(statement)
+        else:
+            close_run()
+            segments.append([[statement]])
+    close_run()
+
+    # Neighbouring sequential segments stream together as one chain
+    merged = []
+    for segment in segments:
+        if len(segment) == 1 and merged and len(merged[-1]) == 1:
+            merged[-1][0].extend(segment[0])
+        else:
+            merged.append(segment)
+    return merged
+
+# ============================================================================
+# Execution
+# ============================================================================
+
+def _preview(text, width=60):
+    single_line = ' '.join(text.split())
+    return single_line if len(single_line) <= width else single_line[:width - 3] + '...'
+
+def _stream_chain(conn, chain, results, on_statement=None, ok_status='ok'):
+    """
+    Execute a chain through execute_stream, timing each statement
+    Returns the failing statement's index, or None
+    """
+    script = io.StringIO(''.join(f"{statement['text']};\n" for statement in chain))
+    cursors = conn.execute_stream(script)
+    started = time.time()
+    for statement in chain:
+        entry = {
+            'index': statement['index'], 'line': statement['line'], 'kind': statement['kind'],
+            'statement': _preview(statement['text'])
+        }
+        try:
+            cursor = next(cursors)
+            entry.update(status=ok_status, rowcount=cursor.rowcount, query_id=cursor.sfqid)
+        except StopIteration:
+            entry.update(status='failed', error="statement was not executed by the connector")
+        except Exception as e:
+            entry.update(status='failed', error=str(e))
+        finished = time.time()
+        entry['seconds'] = round(finished - started, 3)
+        started = finished
+        results[statement['index']] = entry
+        if on_statement is not None:
+            on_statement(entry)
+        if entry['status'] == 'failed':
+            return statement['index']
+    return None
+
+class _WorkerConnections:
+    """Extra connections for concurrent chains, kept in the main session's context"""
+
+    def __init__(self, connect):
+        self.connect = connect
+        self._workers = []
+
+    def get(self, count, context):
+        while len(self._workers) < count:
+            self._workers.append({'conn': self.connect(), 'context': []})
+        for worker in self._workers[:count]:
+            if worker['context'] != context:
+                cursor = worker['conn'].cursor()
+                try:
+                    for statement in context:
+                        cursor.execute(statement)
+                finally:
+                    cursor.close()
+                worker['context'] = list(context)
+        return [worker['conn'] for worker in self._workers[:count]]
+
+    def close(self):
+        for worker in self._workers:
+            worker['conn'].close()
+        self._workers = []
+
+def run_statements(conn, statements, from_statement=1, workers=1, connect=None, on_statement=None):
+    """
+    Run parsed statements, resuming at from_statement
+    USE statements before from_statement are replayed so the session context
+    matches a full run. With workers > 1 and a connect() factory, independent
+    DDL chains run concurrently on extra connections.
+    Returns dict with passed, failed_statement, total_seconds and per-statement results.
+    """
+    results = {}
+    context = []
+    failed = None
+    started = time.time()
+    pool = _WorkerConnections(connect) if connect is not None and workers > 1 else None
+
+    try:
+        for statement in statements:
+            if statement['index'] >= from_statement:
+                break
+            if USE_PATTERN.match(statement['text']):
+                failed = _stream_chain(conn, [statement], results, on_statement, ok_status='replayed')
+                if failed is not None:
+                    break
+                context.append(statement['text'])
+
+        for segment in plan_statements(statements) if failed is None else []:
+            segment = [
+                [statement for statement in chain if statement['index'] >= from_statement]
+                for chain in segment
+            ]
+            segment = [chain for chain in segment if chain]
+            if not segment:
+                continue
+
+            if pool is None or len(segment) == 1:
+                for chain in segment:
+                    failed = _stream_chain(conn, chain, results, on_statement)
+                    if failed is not None:
+                        break
+            else:
+                # The main connection takes the first chain of each batch
+                failures = []
+                for batch_start in range(0, len(segment), workers):
+                    batch = segment[batch_start:batch_start + workers]
+                    conns = [conn] + pool.get(len(batch) - 1, context)
+                    with ThreadPoolExecutor(max_workers=len(batch), thread_name_prefix="sql-chain") as executor:
+                        outcomes = list(executor.map(
+                            lambda args: _stream_chain(args[0], args[1], results, on_statement),
+                            zip(conns, batch)
+                        ))
+                    failures.extend(index for index in outcomes if index is not None)
+                    if failures:
+                        break
+                failed = min(failures) if failures else None
+
+            if failed is not None:
+                break
+            context.extend(
+                statement['text'] for chain in segment for statement in chain
+                if USE_PATTERN.match(statement['text'])
+            )
+    finally:
+        if pool is not None:
+            pool.close()
+
+    return {
+        'passed': failed is None,
+        'failed_statement': failed,
+        'total_seconds': round(time.time() - started, 3),
+        'statements': [results[index] for index in sorted(results)]
+    }
+
+def run_sql_file(conn, path, from_statement=1, workers=1, connect=None, on_statement=None):
+    """Parse and run one SQL file; see run_statements"""
+    statements = split_statements(Path(path).read_text(encoding='utf-8'))
+    report = run_statements(conn, statements, from_statement, workers, connect, on_statement)
+    report['file'] = str(path)
+    report['statement_count'] = len(statements)
+    return report
+
+def print_statement(entry):
+    """Print one statement result as it completes"""
+    status = {'ok': '✅', 'replayed': '↩️ ', 'failed': '❌'}[entry['status']]
+    rows = f"rows={entry['rowcount']}" if entry.get('rowcount') is not None else ""
+    print(f"{status} [{entry['index']:>3}] line {entry['line']:<4} {entry['seconds']:>7.2f}s {rows:<10} {entry['statement']}")
+    if entry['status'] == 'failed':
+        print(f"      {entry['error']}")
+
+def print_plan(path):
+    """Print how a file would be executed, without connecting"""
+    statements = split_statements(Path(path).read_text(encoding='utf-8'))
+    print_header(f"PLAN: {path} ({len(statements)} statements)")
+    for number, segment in enumerate(plan_statements(statements), 1):
+        label = f"{len(segment)} concurrent chains" if len(segment) > 1 else "sequential"
+        print(f"  Segment {number} ({label})")
+        for chain in segment:
+            print("    " + " -> ".join(str(statement['index']) for statement in chain) +
+                  f"  {_preview(chain[0]['text'], 50)}")
+
+def main(argv=None):
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Run SQL scripts statement by statement")
+    parser.add_argument('files', nargs='+', help="SQL files, run in the given order")
+    parser.add_argument('--from-statement', type=int, default=1,
+                        help="Resume the first file at this statement number (earlier USE statements are replayed)")
+    parser.add_argument('--workers', type=int, default=1, help="Connections for independent DDL chains")
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG_PATH), help="Snowflake config.toml path")
+    parser.add_argument('--report', help="Write per-statement timings as JSON to this path")
+    parser.add_argument('--plan', action='store_true', help="Print the execution plan and exit without connecting")
+    args = parser.parse_args(argv)
+
+    if args.plan:
+        for path in args.files:
+            print_plan(path)
+        return 0
+
+    try:
+        conn_params = load_connection_params(args.config)
+        conn = snowflake.connector.connect(**conn_params)
+    except Exception as e:
+        print_error(f"Failed to connect to Snowflake: {str(e)}")
+        return 1
+
+    reports = []
+    try:
+        for number, path in enumerate(args.files):
+            print_header(f"RUNNING {path}")
+            report = run_sql_file(
+                conn, path,
+                from_statement=args.from_statement if number == 0 else 1,
+                workers=args.workers,
+                connect=lambda: snowflake.connector.connect(**conn_params),
+                on_statement=print_statement
+            )
+            reports.append(report)
+            if not report['passed']:
+                print_error(
+                    f"{path} failed at statement {report['failed_statement']}; resume with "
+                    f"--from-statement {report['failed_statement']}"
+                )
+                break
+            print_success(f"{path}: {report['statement_count']} statements in {report['total_seconds']:.1f}s")
+    finally:
+        conn.close()
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(reports, f, indent=2, default=str)
+        print_info(f"Report written to {args.report}")
+
+    return 0 if all(report['passed'] for report in reports) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,10 +7,12 @@ for all 15 customers to support the Manager Dashboard.
 """
 
 import snowflake.connector
+from snowflake.connector.pandas_tools import write_pandas
 import tomli
 from pathlib import Path
 import sys
 import random
+import pandas as pd
 
 def print_header(message):
     """Print a formatted header"""
@@ -40,7 +42,8 @@ def get_snowflake_connection():
         default_conn = config['default_connection_name']
         conn_params = config['connections'][default_conn]
         
-        return snowflake.connector.connect(**conn_params)
+        # qmark binds are sent to the server rather than interpolated client-side
+        return snowflake.connector.connect(**dict(conn_params, paramstyle='qmark'))
     except Exception as e:
         print_error(f"Failed to connect to Snowflake: {str(e)}")
         return None
@@ -124,6 +127,94 @@ def generate_customer_analytics_data():
     
     return customers
 
+# Columns the scoring output writes, with the types used when they are missing
+ANALYTICS_COLUMNS = {
+    'CUSTOMER_ID': 'VARCHAR(20)',
+    'CUSTOMER_NAME': 'VARCHAR(100)',
+    'CHURN_RISK_SCORE': 'VARCHAR(10)',
+    'CHURN_PROBABILITY': 'DECIMAL(5,2)',
+    'CHURN_PREDICTION': 'INTEGER',
+    'NEXT_BEST_ACTION': 'TEXT',
+    'NBA_REASONING': 'TEXT',
+    'MODEL_CONFIDENCE': 'DECIMAL(5,2)',
+    'LAST_UPDATED': 'TIMESTAMP_NTZ'
+}
+
+# Temporary table the prediction batch is bulk-loaded into before the MERGE
+STAGING_TABLE = 'CUSTOMER_ANALYTICS_STAGE'
+
+def reconcile_analytics_schema(cursor):
+    """
+    Make CUSTOMER_ANALYTICS carry every column the writer needs
+    Creates the table if it is missing and adds any missing columns in one ALTER
+    Returns the list of columns that were added
+    """
+    column_list = ",\n            ".join(f"{name} {column_type}" for name, column_type in ANALYTICS_COLUMNS.items())
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS CUSTOMER_ANALYTICS (
+            {column_list}
+        )
+    """)
+    
+    cursor.execute("""
+        SELECT COLUMN_NAME
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = CURRENT_SCHEMA() AND TABLE_NAME = 'CUSTOMER_ANALYTICS'
+    """)
+    existing = {row[0] for row in cursor.fetchall()}
+    missing = [name for name in ANALYTICS_COLUMNS if name not in existing]
+    if missing:
+        additions = ", ".join(f"{name} {ANALYTICS_COLUMNS[name]}" for name in missing)
+        cursor.execute(f"ALTER TABLE CUSTOMER_ANALYTICS ADD COLUMN {additions}")
+    return missing
+
+def build_predictions_frame(customers):
+    """Shape generated (or scored) customers into CUSTOMER_ANALYTICS columns"""
+    frame = pd.DataFrame({
+        'CUSTOMER_ID': [customer['id'] for customer in customers],
+        'CUSTOMER_NAME': [customer['name'] for customer in customers],
+        'CHURN_RISK_SCORE': [customer['risk'] for customer in customers],
+        'CHURN_PROBABILITY': [customer['prob'] for customer in customers],
+        'CHURN_PREDICTION': [customer['prediction'] for customer in customers],
+        'NEXT_BEST_ACTION': [customer['nba'] for customer in customers],
+        'NBA_REASONING': [customer['reasoning'] for customer in customers],
+        'MODEL_CONFIDENCE': [customer['confidence'] for customer in customers]
+    })
+    # MERGE needs at most one source row per key; the latest score wins
+    return frame.drop_duplicates('CUSTOMER_ID', keep='last')
+
+def merge_customer_analytics(conn, cursor, predictions):
+    """
+    Upsert a batch of predictions into CUSTOMER_ANALYTICS keyed on CUSTOMER_ID
+    The batch is bulk-loaded into a temporary table with write_pandas and applied
+    with a single MERGE, so the statement count does not grow with the batch.
+    Returns (rows_inserted, rows_updated)
+    """
+    reconcile_analytics_schema(cursor)
+    
+    success, _, rows, _ = write_pandas(
+        conn, predictions, STAGING_TABLE,
+        auto_create_table=True, table_type='temporary', overwrite=True
+    )
+    if not success:
+        raise RuntimeError(f"Bulk load into {STAGING_TABLE} failed")
+    print_info(f"Staged {rows} predictions")
+    
+    columns = list(predictions.columns)
+    updates = ",\n                ".join(f"{name} = s.{name}" for name in columns if name != 'CUSTOMER_ID')
+    cursor.execute(f"""
+        MERGE INTO CUSTOMER_ANALYTICS t
+        USING {STAGING_TABLE} s
+        ON t.CUSTOMER_ID = s.CUSTOMER_ID
+        WHEN MATCHED THEN UPDATE SET
+                {updates},
+                LAST_UPDATED = CURRENT_TIMESTAMP()
+        WHEN NOT MATCHED THEN INSERT ({', '.join(columns)}, LAST_UPDATED)
+            VALUES ({', '.join(f's.{name}' for name in columns)}, CURRENT_TIMESTAMP())
+    """)
+    inserted, updated = cursor.fetchone()
+    return inserted, updated
+
 def populate_customer_analytics_simple(conn):
     """Populate customer analytics table with simple realistic data"""
     cursor = conn.cursor()
@@ -134,44 +225,17 @@ def populate_customer_analytics_simple(conn):
         cursor.execute('USE SCHEMA TRANSCRIPTS')
         cursor.execute('USE WAREHOUSE MYWH')
         
-        # Clear existing data
-        print_info("Clearing existing customer analytics data...")
-        cursor.execute('DELETE FROM CUSTOMER_ANALYTICS')
-        
         # Generate customer data
         print_info("Generating customer analytics data...")
         customers = generate_customer_analytics_data()
         
-        # Insert data
-        print_info("Inserting customer analytics data...")
-        
-        for customer in customers:
-            insert_sql = f"""
-            INSERT INTO CUSTOMER_ANALYTICS (
-                CUSTOMER_ID,
-                CUSTOMER_NAME,
-                CHURN_RISK_SCORE,
-                CHURN_PROBABILITY,
-                CHURN_PREDICTION,
-                NEXT_BEST_ACTION,
-                NBA_REASONING,
-                MODEL_CONFIDENCE
-            ) VALUES (
-                '{customer['id']}',
-                '{customer['name']}',
-                '{customer['risk']}',
-                {customer['prob']},
-                {customer['prediction']},
-                '{customer['nba']}',
-                '{customer['reasoning']}',
-                {customer['confidence']}
-            )
-            """
-            cursor.execute(insert_sql)
+        # Upsert the whole batch
+        print_info("Merging customer analytics data...")
+        inserted, updated = merge_customer_analytics(conn, cursor, build_predictions_frame(customers))
         
         # Commit the transaction
         conn.commit()
-        print_success(f"Successfully populated CUSTOMER_ANALYTICS table with {len(customers)} records")
+        print_success(f"Successfully merged {len(customers)} records into CUSTOMER_ANALYTICS ({inserted} inserted, {updated} updated)")
         
         # Verify the data
         cursor.execute('SELECT COUNT(*) FROM CUSTOMER_ANALYTICS')
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Sync the Local Analytics Mirror
+===============================
+Pulls changed rows of CUSTOMER, CUSTOMER_ANALYTICS and ENRICHED_TRANSCRIPTS_ALL
+(non-text columns only) into the local Parquet mirror that the dashboards
+query when the app runs with ANALYTICS_MIRROR=true. Use --every to keep it
+fresh on a schedule.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import snowflake.connector
+
+from run_sql import DEFAULT_CONFIG_PATH, load_connection_params
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+from analytics_mirror import DEFAULT_MIRROR_DIR, MIRROR_TABLES, sync_mirror
+
+def print_header(message):
+    """Print a formatted header"""
+    print("\n" + "=" * 60)
+    print(f" {message}")
+    print("=" * 60)
+
+def print_success(message):
+    """Print success message"""
+    print(f"✅ {message}")
+
+def print_error(message):
+    """Print error message"""
+    print(f"❌ {message}")
+
+def print_info(message):
+    """Print info message"""
+    print(f"ℹ️  {message}")
+
+def run_sync(conn, mirror_dir, full):
+    """Sync once and print per-table results; returns whether every table synced"""
+    started = time.perf_counter()
+    results = sync_mirror(conn, mirror_dir, full=full)
+    for table, result in results.items():
+        if result['status'] == 'failed':
+            print_error(f"{table:<26} failed: {result['error']}")
+            continue
+        print_info(f"{table:<26} {result['status']:<12} {result['rows_fetched']:>8} fetched {result['rows']:>9} rows  {result['seconds']:.2f}s")
+    failed = [table for table, result in results.items() if result['status'] == 'failed']
+    if failed:
+        print_error(f"Mirror synced in {time.perf_counter() - started:.1f}s with {len(failed)} failed table(s)")
+    else:
+        print_success(f"Mirror synced in {time.perf_counter() - started:.1f}s")
+    return not failed
+
+def main(argv=None):
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Sync the local analytics mirror used by the dashboards")
+    parser.add_argument('--mirror-dir', default=DEFAULT_MIRROR_DIR, help="Mirror directory")
+    parser.add_argument('--full', action='store_true', help="Re-pull every table instead of only changed rows")
+    parser.add_argument('--every', type=float, help="Keep running and sync every this many seconds")
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG_PATH), help="Snowflake config.toml path")
+    args = parser.parse_args(argv)
+
+    print_header("SYNC LOCAL ANALYTICS MIRROR")
+    print_info(f"Tables: {', '.join(MIRROR_TABLES)} -> {args.mirror_dir}")
+    try:
+        conn = snowflake.connector.connect(**load_connection_params(args.config))
+    except Exception as e:
+        print_error(f"Failed to connect to Snowflake: {str(e)}")
+        return 1
+
+    cursor = conn.cursor()
+    try:
+        # Set context
+        cursor.execute('USE DATABASE SUPERANNUATION')
+        cursor.execute('USE SCHEMA TRANSCRIPTS')
+        cursor.execute('USE WAREHOUSE MYWH')
+
+        synced = run_sync(conn, args.mirror_dir, args.full)
+        while args.every:
+            time.sleep(args.every)
+            run_sync(conn, args.mirror_dir, full=False)
+        return 0 if synced else 1
+    except KeyboardInterrupt:
+        return 0
+    except Exception as e:
+        print_error(f"Failed to sync analytics mirror: {str(e)}")
+        return 1
+    finally:
+        cursor.close()
+        conn.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
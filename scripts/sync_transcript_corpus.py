@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Sync the Local Transcript Corpus
+================================
+Pulls call transcripts created since the last sync from RAW_CALL_TRANSCRIPTS
+into the local memory-mapped corpus (see src/transcript_corpus.py), which the
+app and local analysis read instead of the warehouse.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import snowflake.connector
+
+from run_sql import DEFAULT_CONFIG_PATH, load_connection_params
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+from transcript_corpus import DEFAULT_CORPUS_DIR, TranscriptCorpus, sync_corpus
+
+def print_header(message):
+    """Print a formatted header"""
+    print("\n" + "=" * 60)
+    print(f" {message}")
+    print("=" * 60)
+
+def print_success(message):
+    """Print success message"""
+    print(f"✅ {message}")
+
+def print_error(message):
+    """Print error message"""
+    print(f"❌ {message}")
+
+def print_info(message):
+    """Print info message"""
+    print(f"ℹ️  {message}")
+
+def main(argv=None):
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Sync new call transcripts into the local corpus")
+    parser.add_argument('--corpus-dir', default=DEFAULT_CORPUS_DIR, help="Corpus directory")
+    parser.add_argument('--compress', action='store_true', help="zlib-compress each transcript (only when the corpus is created)")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="Discard the local corpus and pull everything, e.g. after transcripts were reloaded")
+    parser.add_argument('--config', default=str(DEFAULT_CONFIG_PATH), help="Snowflake config.toml path")
+    args = parser.parse_args(argv)
+
+    print_header("SYNC LOCAL TRANSCRIPT CORPUS")
+    try:
+        conn = snowflake.connector.connect(**load_connection_params(args.config))
+    except Exception as e:
+        print_error(f"Failed to connect to Snowflake: {str(e)}")
+        return 1
+
+    cursor = conn.cursor()
+    try:
+        # Set context
+        cursor.execute('USE DATABASE SUPERANNUATION')
+        cursor.execute('USE SCHEMA TRANSCRIPTS')
+        cursor.execute('USE WAREHOUSE MYWH')
+
+        result = sync_corpus(conn, args.corpus_dir, compress=args.compress, rebuild=args.rebuild)
+        print_success(f"Added {result['added']} new transcripts in {result['seconds']:.1f}s ({result['transcripts']} in corpus)")
+        if result['updated']:
+            print_info(f"Replaced {result['updated']} transcripts whose text changed upstream")
+        if result['skipped']:
+            print_info(f"Skipped {result['skipped']} calls already in the corpus")
+        print_info(f"Synced up to CREATED_AT {result['watermark']}")
+
+        with TranscriptCorpus(args.corpus_dir) as corpus:
+            stats = corpus.stats()
+        ratio = f" ({stats['compression_ratio']:.1f}x compressed)" if stats['compression'] != 'none' and stats['compression_ratio'] else ""
+        print_info(f"{args.corpus_dir}: {stats['blob_bytes'] / 1e6:.1f} MB blob for {stats['text_bytes'] / 1e6:.1f} MB of text{ratio}")
+        return 0
+    except Exception as e:
+        print_error(f"Failed to sync transcript corpus: {str(e)}")
+        return 1
+    finally:
+        cursor.close()
+        conn.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
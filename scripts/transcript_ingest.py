@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Multi-file Transcript Ingestion
+===============================
+Loads a directory (or glob) of telephony transcript exports as one batch:
+
+- Files already recorded in the manifest (by content hash) are skipped, so a
+  file is never ingested twice even if it is renamed or dropped again
+- Parsing and normalization fan out across a process pool; each file becomes
+  a Parquet file of accepted rows plus its own reject file
+- CALL_IDs already in the table (per the CALL_ID index) or repeated within
+  the batch are dropped before upload
+- MinHash signatures are computed alongside, and loaded transcripts are added
+  to the near-duplicate index so the AI pipeline can reuse results for them
+- The Parquet files are PUT to the stage concurrently and loaded with a single
+  COPY, and the manifest is only updated once that COPY succeeds
+"""
+
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+from call_id_index import DEFAULT_INDEX_PATH, CallIdIndex
+from transcript_normalizer import TIMESTAMP_FORMAT, TRANSCRIPT_SCHEMA, normalize_transcripts, read_transcript_file, write_rejects
+from near_duplicates import DEFAULT_DB_PATH as DEFAULT_NEAR_DUP_PATH, NearDuplicateIndex, document_key, minhash_signature
+
+DEFAULT_MANIFEST_PATH = '.ingest_manifest.json'
+DEFAULT_WORK_DIR = '.ingest_work'
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+DEFAULT_PUT_WORKERS = 8
+STAGE = '@TRANSCRIPTS'
+STAGE_PREFIX = 'ingest'
+EXPORT_SUFFIXES = ('.json', '.jsonl', '.ndjson')
+
+COPY_SQL = """
+COPY INTO RAW_CALL_TRANSCRIPTS (
+    CALL_ID,
+    CUSTOMER_ID,
+    AGENT_ID,
+    CALL_TIMESTAMP,
+    CALL_DURATION_SECONDS,
+    TRANSCRIPT_TEXT
+)
+FROM (
+    SELECT
+        $1:CALL_ID::VARCHAR(20),
+        $1:CUSTOMER_ID::VARCHAR(20),
+        $1:AGENT_ID::VARCHAR(20),
+        $1:CALL_TIMESTAMP::TIMESTAMP_NTZ,
+        $1:CALL_DURATION_SECONDS::INTEGER,
+        $1:TRANSCRIPT_TEXT::TEXT
+    FROM {location}
+)
+FILE_FORMAT = (TYPE = PARQUET)
+ON_ERROR = 'ABORT_STATEMENT'
+PURGE = TRUE
+"""
+
+def discover_files(patterns):
+    """Expand directories and glob patterns into a sorted list of export files"""
+    found = set()
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            candidates = path.iterdir()
+        elif path.is_file():
+            candidates = [path]
+        else:
+            candidates = (Path(match) for match in glob.glob(pattern, recursive=True))
+        found.update(
+            candidate.resolve() for candidate in candidates
+            if candidate.is_file() and candidate.suffix.lower() in EXPORT_SUFFIXES
+        )
+    return sorted(found)
+
+def file_digest(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def read_manifest(manifest_path):
+    """Return the manifest ({'files': {digest: entry}}), empty if missing"""
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'files': {}}
+
+def write_manifest(manifest_path, manifest):
+    """Write the manifest atomically"""
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+def signature_table(table):
+    """CALL_ID, DOC_KEY and MinHash SIGNATURE per row of table (nulls for transcripts with no words)"""
+    doc_keys = []
+    signatures = []
+    for text in table.column('TRANSCRIPT_TEXT').to_pylist():
+        signature = minhash_signature(text)
+        doc_keys.append(None if signature is None else document_key(text))
+        signatures.append(None if signature is None else signature.tobytes())
+    return pa.table({
+        'CALL_ID': table.column('CALL_ID'),
+        'DOC_KEY': pa.array(doc_keys, pa.string()),
+        'SIGNATURE': pa.array(signatures, pa.binary())
+    })
+
+def prepare_file(path, digest, work_dir):
+    """
+    Parse and normalize one export in a worker process
+    Accepted rows are written to Parquet (timestamps as text, so COPY casts them
+    exactly like the single-file loader) with their MinHash signatures in a
+    row-aligned sidecar, and rejects to a JSONL file next to it.
+    Returns a small, picklable summary.
+    """
+    started = time.perf_counter()
+    stem = f"{Path(path).stem}-{digest[:12]}"
+    normalized = normalize_transcripts(read_transcript_file(path))
+    table = normalized['table']
+    summary = {
+        'path': str(path),
+        'digest': digest,
+        'size': os.path.getsize(path),
+        'rows': normalized['stats']['rows'],
+        'accepted': table.num_rows,
+        'rejected': normalized['stats']['rejected'],
+        'parquet_path': None,
+        'signature_path': None,
+        'reject_path': None
+    }
+
+    if table.num_rows:
+        timestamps = pc.strftime(table.column('CALL_TIMESTAMP'), format=TIMESTAMP_FORMAT)
+        table = table.set_column(table.column_names.index('CALL_TIMESTAMP'), 'CALL_TIMESTAMP', timestamps)
+        summary['parquet_path'] = os.path.join(work_dir, f"{stem}.parquet")
+        pq.write_table(table.select(list(TRANSCRIPT_SCHEMA)), summary['parquet_path'])
+        summary['signature_path'] = os.path.join(work_dir, f"{stem}.minhash.parquet")
+        pq.write_table(signature_table(table), summary['signature_path'])
+    if summary['rejected']:
+        summary['reject_path'] = os.path.join(work_dir, f"{stem}.rejects.jsonl")
+        write_rejects(normalized['rejects'], summary['reject_path'])
+
+    summary['seconds'] = round(time.perf_counter() - started, 3)
+    return summary
+
+def prepare_files(pending, work_dir, workers=DEFAULT_WORKERS):
+    """Run prepare_file over (path, digest) pairs across a process pool"""
+    os.makedirs(work_dir, exist_ok=True)
+    if workers <= 1 or len(pending) <= 1:
+        return [prepare_file(path, digest, work_dir) for path, digest in pending]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(prepare_file, str(path), digest, work_dir) for path, digest in pending]
+        return [future.result() for future in futures]
+
+def _put_file(conn, local_path, location):
+    cursor = conn.cursor()
+    try:
+        absolute = Path(local_path).resolve().as_posix()
+        cursor.execute(f"PUT 'file://{absolute}' {location} AUTO_COMPRESS = FALSE OVERWRITE = TRUE")
+    finally:
+        cursor.close()
+
+def put_files(conn, local_paths, location, workers=DEFAULT_PUT_WORKERS):
+    """Upload files to a stage location concurrently (one cursor per upload)"""
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(local_paths))), thread_name_prefix="stage-put") as executor:
+        list(executor.map(lambda local_path: _put_file(conn, local_path, location), local_paths))
+
+def copy_batch(conn, location):
+    """Load every staged file under location with one COPY; returns per-file results"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(COPY_SQL.format(location=location))
+        columns = [column[0].lower() for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+def drop_loaded_call_ids(summaries, index):
+    """
+    Remove rows whose CALL_ID is already loaded or appears earlier in the batch
+    Parquet files (and their signature sidecars) are rewritten only when they
+    contain duplicates. Returns the CALL_IDs that remain, to be added to the
+    index once the load commits.
+    """
+    seen = set()
+    kept_ids = []
+    for summary in summaries:
+        summary['duplicates'] = 0
+        if not summary['parquet_path']:
+            continue
+        call_ids = pq.read_table(summary['parquet_path'], columns=['CALL_ID']).column(0).to_pylist()
+        mask = index.new_ids_mask(call_ids, seen)
+        kept_ids.extend(call_id for call_id, keep in zip(call_ids, mask) if keep)
+        if all(mask):
+            continue
+
+        summary['duplicates'] = mask.count(False)
+        summary['accepted'] -= summary['duplicates']
+        table = pq.read_table(summary['parquet_path']).filter(pa.array(mask))
+        signatures = pq.read_table(summary['signature_path']).filter(pa.array(mask))
+        if table.num_rows:
+            pq.write_table(table, summary['parquet_path'])
+            pq.write_table(signatures, summary['signature_path'])
+        else:
+            os.remove(summary['parquet_path'])
+            os.remove(summary['signature_path'])
+            summary['parquet_path'] = None
+            summary['signature_path'] = None
+    return kept_ids
+
+def index_near_duplicates(summaries, near_dup_path=DEFAULT_NEAR_DUP_PATH):
+    """Add the loaded transcripts' signatures to the near-duplicate index; returns how many were new"""
+    index = NearDuplicateIndex(near_dup_path)
+    added = 0
+    try:
+        for summary in summaries:
+            if not summary.get('signature_path'):
+                continue
+            signatures = pq.read_table(summary['signature_path'])
+            signatures = signatures.filter(pc.is_valid(signatures.column('SIGNATURE')))
+            added += index.add_signatures(zip(
+                signatures.column('DOC_KEY').to_pylist(),
+                signatures.column('CALL_ID').to_pylist(),
+                signatures.column('SIGNATURE').to_pylist()
+            ))
+            os.remove(summary['signature_path'])
+    finally:
+        index.close()
+    return added
+
+def ingest_files(conn, patterns, manifest_path=DEFAULT_MANIFEST_PATH, work_dir=DEFAULT_WORK_DIR,
+                 workers=DEFAULT_WORKERS, put_workers=DEFAULT_PUT_WORKERS,
+                 index_path=DEFAULT_INDEX_PATH, rebuild_index=False, near_dup_path=DEFAULT_NEAR_DUP_PATH):
+    """
+    Ingest every not-yet-loaded export matching patterns
+    conn must already be in the SUPERANNUATION.TRANSCRIPTS context. The CALL_ID
+    index is rebuilt from the table when asked to or when it does not exist yet.
+    Returns dict with files, skipped, loaded, duplicate and rejected row counts,
+    transcripts newly added to the near-duplicate index, the batch ID and
+    per-phase timings.
+    """
+    timings = {}
+    started = time.perf_counter()
+    manifest = read_manifest(manifest_path)
+    loaded = manifest.setdefault('files', {})
+
+    pending = []
+    skipped = []
+    seen = set()
+    for path in discover_files(patterns):
+        digest = file_digest(path)
+        if digest in loaded or digest in seen:
+            skipped.append(str(path))
+        else:
+            seen.add(digest)
+            pending.append((path, digest))
+    timings['discover_seconds'] = round(time.perf_counter() - started, 3)
+
+    batch_id = datetime.now().strftime('%Y%m%d%H%M%S') + '-' + uuid.uuid4().hex[:8]
+    report = {
+        'batch_id': batch_id,
+        'files': len(pending),
+        'skipped': skipped,
+        'rows_loaded': 0,
+        'rows_duplicate': 0,
+        'rows_rejected': 0,
+        'near_duplicates_indexed': 0,
+        'reject_files': [],
+        'timings': timings
+    }
+    if not pending:
+        return report
+
+    phase = time.perf_counter()
+    summaries = prepare_files(pending, work_dir, workers)
+    timings['normalize_seconds'] = round(time.perf_counter() - phase, 3)
+    report['rows_rejected'] = sum(summary['rejected'] for summary in summaries)
+    report['reject_files'] = [summary['reject_path'] for summary in summaries if summary['reject_path']]
+
+    phase = time.perf_counter()
+    index_exists = os.path.exists(index_path)
+    index = CallIdIndex(index_path)
+    try:
+        if rebuild_index or not index_exists:
+            index.rebuild(conn)
+        kept_ids = drop_loaded_call_ids(summaries, index)
+        report['rows_duplicate'] = sum(summary['duplicates'] for summary in summaries)
+        report['index_stats'] = dict(index.stats)
+        timings['dedup_seconds'] = round(time.perf_counter() - phase, 3)
+        _load_batch(conn, summaries, batch_id, put_workers, report)
+        # Only IDs that actually reached the table are recorded
+        index.add(kept_ids)
+    finally:
+        index.close()
+
+    phase = time.perf_counter()
+    report['near_duplicates_indexed'] = index_near_duplicates(summaries, near_dup_path)
+    timings['near_duplicate_index_seconds'] = round(time.perf_counter() - phase, 3)
+
+    # Only now is the batch durable in the warehouse
+    loaded_at = datetime.now().isoformat()
+    for summary in summaries:
+        loaded[summary['digest']] = {
+            'path': summary['path'],
+            'size': summary['size'],
+            'rows': summary['rows'],
+            'accepted': summary['accepted'],
+            'duplicates': summary['duplicates'],
+            'rejected': summary['rejected'],
+            'batch_id': batch_id,
+            'loaded_at': loaded_at
+        }
+    write_manifest(manifest_path, manifest)
+
+    timings['total_seconds'] = round(time.perf_counter() - started, 3)
+    return report
+
+def _load_batch(conn, summaries, batch_id, put_workers, report):
+    """PUT the batch's Parquet files concurrently and load them with one COPY"""
+    timings = report['timings']
+    staged = [summary for summary in summaries if summary['parquet_path']]
+    location = f"{STAGE}/{STAGE_PREFIX}/{batch_id}/"
+    if staged:
+        phase = time.perf_counter()
+        put_files(conn, [summary['parquet_path'] for summary in staged], location, put_workers)
+        timings['put_seconds'] = round(time.perf_counter() - phase, 3)
+
+        phase = time.perf_counter()
+        results = copy_batch(conn, location)
+        timings['copy_seconds'] = round(time.perf_counter() - phase, 3)
+        report['rows_loaded'] = sum(result.get('rows_loaded') or 0 for result in results)
+
+        for summary in staged:
+            os.remove(summary['parquet_path'])
@@ -9,6 +9,12 @@ import snowflake.connector
 import tomli
 from pathlib import Path
 import sys
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
 
 def print_header(message):
     """Print a formatted header"""
@@ -43,7 +49,179 @@ def get_snowflake_connection():
         print_error(f"Failed to connect to Snowflake: {str(e)}")
         return None
 
-def verify_data_consistency(conn):
+# Metrics per source: every metric of a source is computed in one aggregate
+# query, so each table is scanned once however many checks use it
+RECENT_CALLS = "CALL_TIMESTAMP >= CURRENT_DATE - 30"
+
+SOURCES = {
+    'CUSTOMER': {
+        'from': 'CUSTOMER',
+        'metrics': {
+            'row_count': 'COUNT(*)',
+            'unique_customers': 'COUNT(DISTINCT CUSTOMER_ID)',
+            'high_risk_for_advisor': "COUNT_IF(CHURN_RISK_SCORE = 'High')"
+        }
+    },
+    'CUSTOMER_ANALYTICS': {
+        'from': 'CUSTOMER_ANALYTICS',
+        'metrics': {
+            'row_count': 'COUNT(*)',
+            'unique_customers': 'COUNT(DISTINCT CUSTOMER_ID)'
+        }
+    },
+    'EXECUTIVE_SUMMARY': {
+        'from': 'CUSTOMER_ANALYTICS ca JOIN CUSTOMER c ON ca.CUSTOMER_ID = c.CUSTOMER_ID',
+        'metrics': {
+            'total_customers': 'COUNT(*)',
+            'high_risk_customers': "COUNT_IF(ca.CHURN_RISK_SCORE = 'High')",
+            'medium_risk_customers': "COUNT_IF(ca.CHURN_RISK_SCORE = 'Medium')",
+            'low_risk_customers': "COUNT_IF(ca.CHURN_RISK_SCORE = 'Low')",
+            'avg_churn_probability': 'AVG(ca.CHURN_PROBABILITY)',
+            'avg_model_confidence': 'AVG(ca.MODEL_CONFIDENCE)',
+            'total_aum': 'SUM(c.ACCOUNT_BALANCE)'
+        }
+    },
+    'ENRICHED_TRANSCRIPTS_ALL': {
+        'from': 'ENRICHED_TRANSCRIPTS_ALL',
+        'metrics': {
+            'row_count': 'COUNT(*)',
+            'unique_customers': 'COUNT(DISTINCT CUSTOMER_ID)',
+            'unique_intents': 'COUNT(DISTINCT PRIMARY_INTENT)',
+            'recent_days': f"COUNT(DISTINCT IFF({RECENT_CALLS}, DATE_TRUNC('day', CALL_TIMESTAMP), NULL))",
+            'recent_calls': f'COUNT_IF({RECENT_CALLS})',
+            'recent_avg_sentiment': f'AVG(IFF({RECENT_CALLS}, SENTIMENT_SCORE, NULL))',
+            'recent_negative_calls': f'COUNT_IF({RECENT_CALLS} AND SENTIMENT_SCORE < -0.3)',
+            'recent_positive_calls': f'COUNT_IF({RECENT_CALLS} AND SENTIMENT_SCORE > 0.3)'
+        }
+    },
+    'RAW_CALL_TRANSCRIPTS': {
+        'from': 'RAW_CALL_TRANSCRIPTS',
+        'metrics': {
+            'row_count': 'COUNT(*)'
+        }
+    }
+}
+
+# Checks reference metrics as 'SOURCE.metric'; 'same' passes when all values match
+CHECKS = [
+    {'name': 'customer_count', 'metric': 'CUSTOMER.row_count', 'op': '==', 'expected': 15},
+    {'name': 'customer_analytics_count', 'metric': 'CUSTOMER_ANALYTICS.row_count', 'op': '==', 'expected': 15},
+    {'name': 'enriched_transcript_count', 'metric': 'ENRICHED_TRANSCRIPTS_ALL.row_count', 'op': '>=', 'expected': 200},
+    {'name': 'customer_consistency', 'op': 'same', 'metrics': [
+        'CUSTOMER.unique_customers', 'CUSTOMER_ANALYTICS.unique_customers', 'ENRICHED_TRANSCRIPTS_ALL.unique_customers'
+    ]},
+    {'name': 'high_risk_customers', 'metric': 'EXECUTIVE_SUMMARY.high_risk_customers', 'op': '==', 'expected': 3},
+    {'name': 'medium_risk_customers', 'metric': 'EXECUTIVE_SUMMARY.medium_risk_customers', 'op': '==', 'expected': 4},
+    {'name': 'low_risk_customers', 'metric': 'EXECUTIVE_SUMMARY.low_risk_customers', 'op': '==', 'expected': 8},
+    {'name': 'date_coverage', 'metric': 'ENRICHED_TRANSCRIPTS_ALL.recent_days', 'op': '>=', 'expected': 20}
+]
+
+OPERATORS = {
+    '==': lambda actual, expected: actual == expected,
+    '>=': lambda actual, expected: actual >= expected,
+    '<=': lambda actual, expected: actual <= expected
+}
+
+def compile_source_query(source):
+    """Compile a source's metrics into a single aggregate SELECT"""
+    columns = ",\n    ".join(f"{expression} AS {name}" for name, expression in source['metrics'].items())
+    return f"SELECT\n    {columns}\nFROM {source['from']}"
+
+def _json_value(value):
+    return float(value) if isinstance(value, Decimal) else value
+
+def collect_metrics(conn, sources=SOURCES, max_workers=4):
+    """
+    Run one query per source, independent sources concurrently
+    Returns (metrics, timings, errors) keyed by source name
+    """
+    def run(name):
+        cursor = conn.cursor()
+        started = time.time()
+        try:
+            cursor.execute(compile_source_query(sources[name]))
+            row = cursor.fetchone()
+            names = [column[0].lower() for column in cursor.description]
+            return name, dict(zip(names, (_json_value(value) for value in row))), time.time() - started, None
+        except Exception as e:
+            return name, {}, time.time() - started, str(e)
+        finally:
+            cursor.close()
+    
+    metrics, timings, errors = {}, {}, {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for name, values, seconds, error in pool.map(run, sources):
+            metrics[name] = values
+            timings[name] = round(seconds, 3)
+            if error is not None:
+                errors[name] = error
+    return metrics, timings, errors
+
+def evaluate_checks(metrics, checks=CHECKS):
+    """Evaluate declarative checks against collected metrics"""
+    def lookup(reference):
+        source, metric = reference.split('.')
+        return metrics.get(source, {}).get(metric)
+    
+    results = []
+    for check in checks:
+        if check['op'] == 'same':
+            actual = {reference: lookup(reference) for reference in check['metrics']}
+            passed = None not in actual.values() and len(set(actual.values())) == 1
+            results.append({'name': check['name'], 'op': 'same', 'actual': actual, 'passed': passed})
+        else:
+            actual = lookup(check['metric'])
+            passed = actual is not None and OPERATORS[check['op']](actual, check['expected'])
+            results.append({
+                'name': check['name'], 'metric': check['metric'], 'op': check['op'],
+                'expected': check['expected'], 'actual': actual, 'passed': passed
+            })
+    return results
+
+def build_verification_report(conn, max_workers=4):
+    """Collect metrics, evaluate checks and return a machine-readable report"""
+    started = time.time()
+    metrics, timings, errors = collect_metrics(conn, max_workers=max_workers)
+    checks = evaluate_checks(metrics)
+    return {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'passed': not errors and all(check['passed'] for check in checks),
+        'elapsed_seconds': round(time.time() - started, 3),
+        'queries': len(SOURCES),
+        'timings': timings,
+        'errors': errors,
+        'metrics': metrics,
+        'checks': checks
+    }
+
+def print_report(report):
+    """Print a verification report for humans"""
+    print_header("TABLE METRICS")
+    for source, values in report['metrics'].items():
+        print_info(f"{source} ({report['timings'][source]:.2f}s)")
+        for name, value in values.items():
+            print(f"  {name}: {value}")
+    for source, error in report['errors'].items():
+        print_error(f"{source}: {error}")
+    
+    print_header("VERIFICATION SUMMARY")
+    for check in report['checks']:
+        if check['op'] == 'same':
+            detail = ", ".join(f"{reference}={value}" for reference, value in check['actual'].items())
+        else:
+            detail = f"{check['metric']} = {check['actual']} (expected {check['op']} {check['expected']})"
+        if check['passed']:
+            print_success(f"{check['name']}: {detail}")
+        else:
+            print_error(f"{check['name']}: {detail}")
+    
+    print_info(f"{report['queries']} queries in {report['elapsed_seconds']:.2f}s")
+    if report['passed']:
+        print_success("🎉 ALL VERIFICATION CHECKS PASSED!")
+    else:
+        print_error("Some verification checks failed - please review above")
+
+def verify_data_consistency(conn, report_path=None, max_workers=4):
     """Verify data consistency across all tables"""
     cursor = conn.cursor()
     
@@ -52,182 +230,29 @@ def verify_data_consistency(conn):
         cursor.execute('USE DATABASE SUPERANNUATION')
         cursor.execute('USE SCHEMA TRANSCRIPTS')
         cursor.execute('USE WAREHOUSE MYWH')
-        
-        print_header("DATA CONSISTENCY VERIFICATION")
-        
-        # Check table record counts
-        tables = ['CUSTOMER', 'CUSTOMER_ANALYTICS', 'ENRICHED_TRANSCRIPTS_ALL', 'RAW_CALL_TRANSCRIPTS']
-        table_counts = {}
-        
-        for table in tables:
-            cursor.execute(f'SELECT COUNT(*) FROM {table}')
-            count = cursor.fetchone()[0]
-            table_counts[table] = count
-            print_info(f"{table}: {count} records")
-        
-        # Verify customer consistency
-        print_header("CUSTOMER CONSISTENCY CHECK")
-        
-        customer_tables = ['CUSTOMER', 'CUSTOMER_ANALYTICS', 'ENRICHED_TRANSCRIPTS_ALL']
-        customer_counts = {}
-        
-        for table in customer_tables:
-            cursor.execute(f'SELECT COUNT(DISTINCT CUSTOMER_ID) FROM {table}')
-            count = cursor.fetchone()[0]
-            customer_counts[table] = count
-            print_info(f"{table}: {count} unique customers")
-        
-        # Check if all tables have same customers
-        if len(set(customer_counts.values())) == 1:
-            print_success("All tables have consistent customer counts")
-        else:
-            print_error("Customer counts are inconsistent across tables")
-        
-        # Test Manager Dashboard queries
-        print_header("MANAGER DASHBOARD QUERY VERIFICATION")
-        
-        # Executive summary query
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as total_customers,
-                SUM(CASE WHEN ca.CHURN_RISK_SCORE = 'High' THEN 1 ELSE 0 END) as high_risk_customers,
-                SUM(CASE WHEN ca.CHURN_RISK_SCORE = 'Medium' THEN 1 ELSE 0 END) as medium_risk_customers,
-                SUM(CASE WHEN ca.CHURN_RISK_SCORE = 'Low' THEN 1 ELSE 0 END) as low_risk_customers,
-                AVG(ca.CHURN_PROBABILITY) as avg_churn_probability,
-                AVG(ca.MODEL_CONFIDENCE) as avg_model_confidence,
-                SUM(c.ACCOUNT_BALANCE) as total_aum
-            FROM CUSTOMER_ANALYTICS ca
-            JOIN CUSTOMER c ON ca.CUSTOMER_ID = c.CUSTOMER_ID
-        """)
-        
-        summary = cursor.fetchone()
-        print_info("Executive Summary:")
-        print(f"  Total customers: {summary[0]}")
-        print(f"  High risk: {summary[1]}")
-        print(f"  Medium risk: {summary[2]}")
-        print(f"  Low risk: {summary[3]}")
-        print(f"  Avg churn probability: {summary[4]:.1%}")
-        print(f"  Avg model confidence: {summary[5]:.1f}%")
-        print(f"  Total AUM: ${summary[6]:,.0f}")
-        
-        # Sentiment trends query
-        cursor.execute("""
-            SELECT 
-                COUNT(DISTINCT DATE_TRUNC('day', CALL_TIMESTAMP)) as unique_days,
-                COUNT(*) as total_calls,
-                AVG(SENTIMENT_SCORE) as avg_sentiment,
-                COUNT(CASE WHEN SENTIMENT_SCORE < -0.3 THEN 1 END) as negative_calls,
-                COUNT(CASE WHEN SENTIMENT_SCORE > 0.3 THEN 1 END) as positive_calls
-            FROM ENRICHED_TRANSCRIPTS_ALL
-            WHERE CALL_TIMESTAMP >= CURRENT_DATE - 30
-        """)
-        
-        sentiment = cursor.fetchone()
-        print_info("Sentiment Trends:")
-        print(f"  Days with calls: {sentiment[0]}")
-        print(f"  Total calls: {sentiment[1]}")
-        print(f"  Average sentiment: {sentiment[2]:.2f}")
-        print(f"  Negative calls: {sentiment[3]}")
-        print(f"  Positive calls: {sentiment[4]}")
-        
-        # Intent analysis query
-        cursor.execute("""
-            SELECT 
-                COUNT(DISTINCT PRIMARY_INTENT) as unique_intents,
-                COUNT(*) as total_calls
-            FROM ENRICHED_TRANSCRIPTS_ALL
-        """)
-        
-        intent = cursor.fetchone()
-        print_info("Intent Analysis:")
-        print(f"  Unique intent types: {intent[0]}")
-        print(f"  Total calls with intent: {intent[1]}")
-        
-        # Test Advisor View query
-        print_header("ADVISOR VIEW QUERY VERIFICATION")
-        
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as total_customers,
-                COUNT(CASE WHEN CHURN_RISK_SCORE = 'High' THEN 1 END) as high_risk_for_advisor
-            FROM CUSTOMER
-        """)
-        
-        advisor = cursor.fetchone()
-        print_info("Advisor View:")
-        print(f"  Customers available in dropdown: {advisor[0]}")
-        print(f"  High risk customers for advisor attention: {advisor[1]}")
-        
-        # Verification summary
-        print_header("VERIFICATION SUMMARY")
-        
-        all_good = True
-        
-        # Check expected counts
-        if table_counts['CUSTOMER'] != 15:
-            print_error(f"Expected 15 customers, got {table_counts['CUSTOMER']}")
-            all_good = False
-        else:
-            print_success("Customer table has correct count (15)")
-        
-        if table_counts['CUSTOMER_ANALYTICS'] != 15:
-            print_error(f"Expected 15 customer analytics records, got {table_counts['CUSTOMER_ANALYTICS']}")
-            all_good = False
-        else:
-            print_success("Customer analytics table has correct count (15)")
-        
-        if table_counts['ENRICHED_TRANSCRIPTS_ALL'] < 200:
-            print_error(f"Expected 200+ enriched transcripts, got {table_counts['ENRICHED_TRANSCRIPTS_ALL']}")
-            all_good = False
-        else:
-            print_success(f"Enriched transcripts table has good count ({table_counts['ENRICHED_TRANSCRIPTS_ALL']})")
-        
-        if summary[1] != 3:  # High risk customers
-            print_error(f"Expected 3 high risk customers, got {summary[1]}")
-            all_good = False
-        else:
-            print_success("Correct number of high risk customers (3)")
-        
-        if summary[2] != 4:  # Medium risk customers
-            print_error(f"Expected 4 medium risk customers, got {summary[2]}")
-            all_good = False
-        else:
-            print_success("Correct number of medium risk customers (4)")
-        
-        if summary[3] != 8:  # Low risk customers
-            print_error(f"Expected 8 low risk customers, got {summary[3]}")
-            all_good = False
-        else:
-            print_success("Correct number of low risk customers (8)")
-        
-        if sentiment[0] < 20:  # Days with calls
-            print_error(f"Expected 20+ days with calls, got {sentiment[0]}")
-            all_good = False
-        else:
-            print_success(f"Good date range coverage ({sentiment[0]} days)")
-        
-        if all_good:
-            print_success("🎉 ALL VERIFICATION CHECKS PASSED!")
-            print_info("The demo is ready with:")
-            print_info("- 15 customers in all tables")
-            print_info("- 3 High, 4 Medium, 8 Low risk customers")
-            print_info("- 200+ call records across 20+ days")
-            print_info("- Consistent data across all tables")
-            print_info("- Manager Dashboard charts will have rich data")
-            print_info("- Advisor View dropdown will show all 15 customers")
-        else:
-            print_error("Some verification checks failed - please review above")
-        
-        return all_good
-        
     except Exception as e:
         print_error(f"Verification failed: {str(e)}")
         return False
     finally:
         cursor.close()
+    
+    report = build_verification_report(conn, max_workers=max_workers)
+    print_report(report)
+    
+    if report_path:
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        print_info(f"Report written to {report_path}")
+    
+    return report['passed']
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Verify demo data consistency")
+    parser.add_argument('--report', help="Write the verification report as JSON to this path")
+    parser.add_argument('--workers', type=int, default=4, help="Tables verified concurrently")
+    args = parser.parse_args()
+    
     print_header("COMPREHENSIVE DATA VERIFICATION")
     
     # Connect to Snowflake
@@ -240,7 +265,7 @@ def main():
     
     try:
         # Verify data consistency
-        if verify_data_consistency(conn):
+        if verify_data_consistency(conn, report_path=args.report, max_workers=args.workers):
             print_header("VERIFICATION COMPLETED SUCCESSFULLY")
             print_success("All data is consistent and ready for demo")
             return 0
@@ -103,6 +103,11 @@ CREATE TABLE IF NOT EXISTS CUSTOMER_ANALYTICS (
     UPSELL_OPPORTUNITIES INTEGER,
     CHURN_RISK_SCORE VARCHAR(10),
     CHURN_PROBABILITY DECIMAL(5,2),
+    CUSTOMER_NAME VARCHAR(100),
+    CHURN_PREDICTION INTEGER,
+    NEXT_BEST_ACTION TEXT,
+    NBA_REASONING TEXT,
+    MODEL_CONFIDENCE DECIMAL(5,2),
     LAST_UPDATED TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
 );
 
@@ -0,0 +1,416 @@
+"""
+AI Executor Module for Superannuation Transcripts Demo
+======================================================
+
+Shared executor for Cortex AI calls. Every AI call in the process goes through
+one adaptive concurrency limiter so batch enrichment and interactive pages
+share a single budget:
+
+- The concurrency cap adapts with AIMD: it grows by one slot after a run of
+  healthy calls and halves on throttling errors or latency above target
+- Interactive calls are admitted ahead of queued batch calls
+- Retryable errors are retried with jittered exponential backoff, bounded by
+  a per-call deadline
+
+The interactive path can additionally hedge slow calls (a duplicate is issued
+after the observed p95 latency and the first response wins) and sits behind a
+circuit breaker that fails fast to cached or fallback results.
+"""
+
+import heapq
+import itertools
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Call priorities: lower value is admitted first
+INTERACTIVE = 0
+BATCH = 1
+
+DEFAULT_INITIAL_LIMIT = int(os.environ.get("CORTEX_INITIAL_CONCURRENCY", "4"))
+DEFAULT_MIN_LIMIT = 1
+DEFAULT_MAX_LIMIT = int(os.environ.get("CORTEX_MAX_CONCURRENCY", "16"))
+DEFAULT_TARGET_LATENCY_SECONDS = 20.0
+DEFAULT_DEADLINE_SECONDS = 90.0
+DEFAULT_MAX_RETRIES = 4
+BASE_BACKOFF_SECONDS = 0.5
+MAX_BACKOFF_SECONDS = 10.0
+
+THROTTLE_MARKERS = ['429', 'throttl', 'too many requests', 'rate limit', 'concurrency limit', 'capacity']
+TIMEOUT_MARKERS = ['timeout', 'timed out']
+TRANSIENT_MARKERS = TIMEOUT_MARKERS + ['temporarily unavailable', '503', '502', 'connection reset']
+
+
+class DeadlineExceeded(Exception):
+    """Raised when an AI call cannot complete within its deadline"""
+
+
+def is_throttle_error(error):
+    """Check whether an exception looks like service throttling"""
+    message = str(error).lower()
+    return any(marker in message for marker in THROTTLE_MARKERS)
+
+
+def is_timeout_error(error):
+    """Check whether an exception looks like a call or statement timeout"""
+    message = str(error).lower()
+    return any(marker in message for marker in TIMEOUT_MARKERS)
+
+
+def is_retryable_error(error):
+    """Check whether an exception is worth retrying"""
+    message = str(error).lower()
+    return is_throttle_error(error) or any(marker in message for marker in TRANSIENT_MARKERS)
+
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff for the given retry attempt"""
+    return random.uniform(0, min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * (2 ** attempt)))
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limiter with priority admission
+    The current limit rises additively after limit-many healthy completions and
+    is halved on throttling, slow responses or timeouts. Other errors only break
+    the healthy streak.
+    """
+
+    def __init__(self, initial_limit=DEFAULT_INITIAL_LIMIT, min_limit=DEFAULT_MIN_LIMIT,
+                 max_limit=DEFAULT_MAX_LIMIT, target_latency=DEFAULT_TARGET_LATENCY_SECONDS):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.in_flight = 0
+        self._condition = threading.Condition()
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._healthy_streak = 0
+        self.stats = {"completed": 0, "throttled": 0, "slow": 0, "errors": 0, "retries": 0, "deadline_exceeded": 0}
+
+    def acquire(self, priority=INTERACTIVE, timeout=None):
+        """Wait for a slot; returns False if the timeout expires first"""
+        entry = (priority, next(self._sequence))
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while self._waiters[0] != entry or self.in_flight >= int(self.limit):
+                    remaining = None if deadline is None else deadline - time.time()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+                self.in_flight += 1
+                return True
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+
+    def release(self, latency=None, throttled=False, error=None):
+        """Return a slot and feed the outcome (latency, or the error raised) back into the limit"""
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.stats["throttled"] += 1
+                self._decrease()
+            elif error is not None:
+                self.stats["errors"] += 1
+                if is_timeout_error(error) or (latency is not None and latency > self.target_latency):
+                    self._decrease()
+                else:
+                    self._healthy_streak = 0
+            elif latency is not None and latency > self.target_latency:
+                self.stats["slow"] += 1
+                self._decrease()
+            elif latency is not None:
+                self.stats["completed"] += 1
+                self._healthy_streak += 1
+                if self._healthy_streak >= int(self.limit):
+                    self.limit = min(self.max_limit, self.limit + 1)
+                    self._healthy_streak = 0
+            self._condition.notify_all()
+
+    def count(self, stat):
+        """Increment a diagnostics counter (under the limiter lock, like release)"""
+        with self._condition:
+            self.stats[stat] += 1
+
+    def _decrease(self):
+        self.limit = max(self.min_limit, self.limit / 2)
+        self._healthy_streak = 0
+
+    def snapshot(self):
+        """Return current limiter state for diagnostics"""
+        with self._condition:
+            return dict(self.stats, limit=int(self.limit), in_flight=self.in_flight, queued=len(self._waiters))
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    """Get the process-wide limiter shared by pages and batch jobs"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = AdaptiveLimiter()
+        return _limiter
+
+
+def run_ai_call(fn, *args, priority=INTERACTIVE, deadline_seconds=DEFAULT_DEADLINE_SECONDS,
+                max_retries=DEFAULT_MAX_RETRIES, timeout_param=None, **kwargs):
+    """
+    Run fn(*args, **kwargs) under the shared limiter with retries
+    With timeout_param, each attempt also gets the whole seconds left before the
+    deadline as that keyword argument (e.g. a statement timeout), so a single
+    hung call is bounded too. Raises DeadlineExceeded if no attempt succeeds
+    before the deadline, or the last error if it is not retryable.
+    """
+    limiter = get_limiter()
+    deadline = time.time() + deadline_seconds
+    attempt = 0
+
+    while True:
+        remaining = deadline - time.time()
+        if remaining <= 0 or not limiter.acquire(priority, timeout=remaining):
+            limiter.count("deadline_exceeded")
+            raise DeadlineExceeded(f"AI call did not complete within {deadline_seconds:.0f}s")
+
+        started = time.time()
+        if timeout_param is not None:
+            kwargs[timeout_param] = max(1, math.floor(deadline - started))
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            limiter.release(time.time() - started, throttled=is_throttle_error(e), error=e)
+            if not is_retryable_error(e) or attempt >= max_retries:
+                raise
+            delay = backoff_delay(attempt)
+            if time.time() + delay >= deadline:
+                limiter.count("deadline_exceeded")
+                raise DeadlineExceeded(f"AI call did not complete within {deadline_seconds:.0f}s") from e
+            limiter.count("retries")
+            attempt += 1
+            time.sleep(delay)
+            continue
+
+        limiter.release(time.time() - started)
+        return result
+
+
+# Hedging and circuit breaking for the interactive path
+HEDGE_MIN_SAMPLES = 20
+HEDGE_DEFAULT_DELAY_SECONDS = 8.0
+HEDGE_MIN_DELAY_SECONDS = 1.0
+BREAKER_WINDOW = 50
+BREAKER_MIN_CALLS = 10
+BREAKER_ERROR_RATE = 0.5
+BREAKER_LATENCY_SECONDS = 45.0
+BREAKER_COOLDOWN_SECONDS = 30.0
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpen(Exception):
+    """Raised when the circuit breaker is rejecting AI calls"""
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker over a rolling window of interactive AI calls
+    Opens when the error rate or p95 latency crosses its threshold, rejects calls
+    for a cooldown, then lets a single trial call through (half-open) to decide
+    whether to close again. allow() hands out a ticket per admitted call; only
+    the trial's ticket can close or reopen a half-open breaker.
+    """
+
+    def __init__(self, window=BREAKER_WINDOW, min_calls=BREAKER_MIN_CALLS, error_rate=BREAKER_ERROR_RATE,
+                 latency_threshold=BREAKER_LATENCY_SECONDS, cooldown=BREAKER_COOLDOWN_SECONDS):
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate
+        self.latency_threshold = latency_threshold
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.open_count = 0
+        self.rejected = 0
+        self._outcomes = []
+        self._tickets = itertools.count(1)
+        self._trial_ticket = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        Check whether a call may proceed, moving open -> half-open after the cooldown
+        Returns a ticket (truthy) to pass to record(), or False when rejected
+        """
+        with self._lock:
+            if self.state == OPEN and time.time() - self.opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self.trial_in_flight = False
+            if self.state == CLOSED:
+                return next(self._tickets)
+            if self.state == HALF_OPEN and not self.trial_in_flight:
+                self.trial_in_flight = True
+                self._trial_ticket = next(self._tickets)
+                return self._trial_ticket
+            self.rejected += 1
+            return False
+
+    def record(self, latency, success, ticket=None):
+        """
+        Record a call outcome and re-evaluate the breaker state
+        While half-open only the trial call's outcome decides the state; late
+        results from calls admitted before the breaker opened are just recorded.
+        """
+        with self._lock:
+            self._outcomes.append((latency, success))
+            self._outcomes = self._outcomes[-self.window:]
+
+            if self.state == HALF_OPEN:
+                if ticket is None or ticket != self._trial_ticket:
+                    return
+                self._trial_ticket = None
+                if success and latency <= self.latency_threshold:
+                    self.state = CLOSED
+                    self._outcomes = []
+                else:
+                    self._open()
+                return
+
+            if self.state == CLOSED and len(self._outcomes) >= self.min_calls:
+                error_rate = sum(1 for _, ok in self._outcomes if not ok) / len(self._outcomes)
+                p95 = percentile([lat for lat, _ in self._outcomes], 95)
+                if error_rate >= self.error_rate_threshold or p95 > self.latency_threshold:
+                    self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.time()
+        self.trial_in_flight = False
+        self.open_count += 1
+
+    def latency_p95(self):
+        """p95 latency of successful calls in the window, or None if too few samples"""
+        with self._lock:
+            latencies = [lat for lat, ok in self._outcomes if ok]
+        if len(latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        return percentile(latencies, 95)
+
+    def snapshot(self):
+        """Return breaker state for the diagnostics panel"""
+        with self._lock:
+            total = len(self._outcomes)
+            errors = sum(1 for _, ok in self._outcomes if not ok)
+            latencies = [lat for lat, _ in self._outcomes]
+            return {
+                "state": self.state,
+                "window_calls": total,
+                "error_rate": errors / total if total else 0.0,
+                "p95_latency": percentile(latencies, 95),
+                "open_count": self.open_count,
+                "rejected": self.rejected
+            }
+
+
+_breaker = None
+_hedge_pool = None
+_hedge_stats = {"hedged": 0, "hedge_wins": 0}
+
+
+def get_breaker():
+    """Get the process-wide circuit breaker for interactive AI calls"""
+    global _breaker
+    with _limiter_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker()
+        return _breaker
+
+
+def _get_hedge_pool():
+    global _hedge_pool
+    with _limiter_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ai-hedge")
+        return _hedge_pool
+
+
+def hedge_delay():
+    """Delay before a hedge request is issued: observed p95 latency, or a default until warmed up"""
+    p95 = get_breaker().latency_p95()
+    if p95 is None:
+        return HEDGE_DEFAULT_DELAY_SECONDS
+    return max(HEDGE_MIN_DELAY_SECONDS, p95)
+
+
+def run_hedged(fn, *args, **kwargs):
+    """
+    Run an interactive AI call, issuing one duplicate if the first is slower than p95
+    The first successful response wins; the loser is left to finish in the background.
+    """
+    pool = _get_hedge_pool()
+    pending = {pool.submit(run_ai_call, fn, *args, priority=INTERACTIVE, **kwargs)}
+    done, pending = wait(pending, timeout=hedge_delay())
+    hedge = None
+    if not done:
+        hedge = pool.submit(run_ai_call, fn, *args, priority=INTERACTIVE, **kwargs)
+        pending.add(hedge)
+        _hedge_stats["hedged"] += 1
+
+    last_error = None
+    while True:
+        for future in done:
+            if future.exception() is None:
+                if future is hedge:
+                    _hedge_stats["hedge_wins"] += 1
+                return future.result()
+            last_error = future.exception()
+        if not pending:
+            raise last_error
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+
+def run_interactive_ai_call(fn, *args, hedge=False, **kwargs):
+    """
+    Run an interactive AI call behind the circuit breaker
+    Raises CircuitOpen while the breaker is open so callers can switch to
+    cached or fallback results immediately.
+    """
+    breaker = get_breaker()
+    ticket = breaker.allow()
+    if not ticket:
+        raise CircuitOpen("AI calls paused by circuit breaker")
+
+    started = time.time()
+    try:
+        result = run_hedged(fn, *args, **kwargs) if hedge else run_ai_call(fn, *args, priority=INTERACTIVE, **kwargs)
+    except Exception:
+        breaker.record(time.time() - started, success=False, ticket=ticket)
+        raise
+    breaker.record(time.time() - started, success=True, ticket=ticket)
+    return result
+
+
+def get_hedge_stats():
+    """Return hedging counters for the diagnostics panel"""
+    return dict(_hedge_stats)
@@ -0,0 +1,343 @@
+"""
+AI Pipeline Module for Superannuation Transcripts Demo
+======================================================
+
+Headless version of the transcript AI/ML pipeline used by the AI Processing
+Demo page. It makes no Streamlit UI calls so the same pipeline can run in the
+page and in background jobs. Callers observe progress
+through an on_progress callback and can take over COMPLETE-backed stages
+(e.g. to stream them) with complete_stage_fn. Results recorded for a
+near-duplicate transcript are reused instead of running the stages again.
+"""
+
+import hashlib
+import json
+
+from connection_helper import run_query, is_ai_function_available
+from prompt_builder import build_context, build_insights_prompt, build_nba_prompt, build_reasoning_prompt, summarize_prompt_stats
+from transcript_chunker import needs_chunking, map_reduce_transcript, DEFAULT_CHUNK_TOKENS, DEFAULT_OVERLAP_TURNS
+from structured_completion import run_consolidated_completion
+from ai_executor import run_ai_call, run_interactive_ai_call, BATCH
+from intent_classifier import classify_intent, DEFAULT_CONFIDENCE_THRESHOLD
+from near_duplicates import get_near_duplicate_index, reuse_results, DEFAULT_SIMILARITY_THRESHOLD
+
+COMPLETE_MODEL = 'claude-3-5-sonnet'
+# Bump when prompts or stage logic change, so results recorded earlier are not reused
+PIPELINE_VERSION = 1
+
+# (icon, label) per stage, as shown in the pipeline progress display
+STANDARD_STAGES = [
+    ("🤖", "AI Sentiment Analysis"),
+    ("🎯", "AI Intent Detection"),
+    ("📝", "AI Call Summarization"),
+    ("📈", "ML Churn Prediction"),
+    ("🔍", "AI Cross-transcript Insights"),
+    ("💡", "AI NBA Generation")
+]
+
+CONSOLIDATED_STAGES = [
+    ("🤖", "AI Sentiment + Summarization"),
+    ("🎯", "AI Intent, Insights & NBA (single call)"),
+    ("📈", "ML Churn Prediction")
+]
+
+DEFAULT_OPTIONS = {
+    "consolidated": False,
+    "hedge": False,
+    "interactive": True,
+    "intent_threshold": DEFAULT_CONFIDENCE_THRESHOLD,
+    "chunk_tokens": DEFAULT_CHUNK_TOKENS,
+    "chunk_overlap_turns": DEFAULT_OVERLAP_TURNS,
+    "reuse_near_duplicates": True,
+    "similarity_threshold": DEFAULT_SIMILARITY_THRESHOLD
+}
+
+# Options that change what the pipeline produces; only results recorded under the
+# same values are reused for near-duplicates
+RESULT_OPTIONS = ["consolidated", "intent_threshold", "chunk_tokens", "chunk_overlap_turns"]
+
+CHURN_LANGUAGE = ['frustrated', 'unacceptable', 'considering leaving', 'switching', 'elsewhere']
+
+# Cortex functions every run needs; CLASSIFY_TEXT is an optional intent tier
+REQUIRED_FUNCTIONS = ["sentiment", "summarize", "complete"]
+
+
+class CortexUnavailable(Exception):
+    """A Cortex function the pipeline needs is not available in this account"""
+
+
+class CortexFunctions:
+    """
+    Cortex AI function wrappers bound to a connection
+    Interactive calls go through the circuit breaker (optionally hedged);
+    background calls share the executor budget at batch priority.
+    """
+
+    def __init__(self, conn, options):
+        self.conn = conn
+        self.options = options
+
+    def query(self, query, params):
+        if self.options["interactive"]:
+            # A hedged duplicate must really be sent, not coalesced onto the slow original
+            return run_interactive_ai_call(
+                run_query, query, self.conn, params=params, timeout_param="timeout",
+                hedge=self.options["hedge"], coalesce=not self.options["hedge"]
+            )
+        return run_ai_call(run_query, query, self.conn, params=params, priority=BATCH, timeout_param="timeout")
+
+    def sentiment(self, text):
+        """Run SNOWFLAKE.CORTEX.SENTIMENT on a piece of text"""
+        result = self.query("SELECT SNOWFLAKE.CORTEX.SENTIMENT(?) as sentiment_score", [text])
+        return float(result.iloc[0]['SENTIMENT_SCORE']) if not result.empty else 0.0
+
+    def summarize(self, text):
+        """Run SNOWFLAKE.CORTEX.SUMMARIZE on a piece of text"""
+        result = self.query("SELECT SNOWFLAKE.CORTEX.SUMMARIZE(?) as call_summary", [text])
+        return result.iloc[0]['CALL_SUMMARY'].strip() if not result.empty else ""
+
+    def complete(self, prompt):
+        """Run a blocking SNOWFLAKE.CORTEX.COMPLETE call with the demo model"""
+        query = """
+        SELECT
+            SNOWFLAKE.CORTEX.COMPLETE(?, ?) as completion
+        """
+        result = self.query(query, [COMPLETE_MODEL, prompt])
+        return result.iloc[0]['COMPLETION'].strip() if not result.empty else ""
+
+    def classify(self, text, labels):
+        """Run SNOWFLAKE.CORTEX.CLASSIFY_TEXT against the given labels"""
+        placeholders = ", ".join("?" for _ in labels)
+        query = f"""
+        SELECT
+            SNOWFLAKE.CORTEX.CLASSIFY_TEXT(?, ARRAY_CONSTRUCT({placeholders})):label::STRING as intent_label
+        """
+        result = self.query(query, [text] + list(labels))
+        return result.iloc[0]['INTENT_LABEL'] if not result.empty else None
+
+    def intent(self, text):
+        """Classify intent with a full claude COMPLETE call (top tier of the cascade)"""
+        return self.complete(
+            'Analyze this customer service call transcript and classify the primary intent. '
+            'Choose from: Technical Support, Investment Inquiry, Complaint, Churn Risk, Fee Question, Retirement Planning. '
+            f'Return only the classification: {text}'
+        )
+
+
+def sentiment_label(score):
+    """Map a Cortex sentiment score to the demo's three labels"""
+    if score >= 0.3:
+        return 'Positive'
+    if score <= -0.3:
+        return 'Negative'
+    return 'Neutral'
+
+
+def has_churn_language(transcript_text):
+    """Check a transcript for explicit churn language"""
+    return any(word in transcript_text.lower() for word in CHURN_LANGUAGE)
+
+
+def predict_churn(results, transcript_text):
+    """Demo churn prediction from the AI signals in results"""
+    churn_features = {
+        'sentiment_score': results.get('sentiment_score', 0),
+        'has_complaint': 1 if 'complaint' in results.get('primary_intent', '').lower() or 'churn' in results.get('primary_intent', '').lower() else 0,
+        'negative_language': 1 if has_churn_language(transcript_text) else 0
+    }
+
+    # Demo churn prediction logic
+    churn_probability = 0.15  # Base probability
+    if churn_features['sentiment_score'] < -0.3:
+        churn_probability += 0.3
+    if churn_features['has_complaint']:
+        churn_probability += 0.2
+    if churn_features['negative_language']:
+        churn_probability += 0.25
+
+    churn_probability = min(churn_probability, 0.95)  # Cap at 95%
+
+    return {
+        'churn_probability': churn_probability,
+        'churn_risk_score': 'High' if churn_probability >= 0.6 else ('Medium' if churn_probability >= 0.3 else 'Low'),
+        'model_confidence': 85.0 + (churn_probability * 10)  # Simulated confidence
+    }
+
+
+def fallback_results(transcript_text):
+    """Keyword-based results used when Cortex is unavailable, for demo continuity"""
+    return {
+        'sentiment_score': -0.6 if 'frustrated' in transcript_text.lower() else 0.2,
+        'sentiment_label': 'Negative' if 'frustrated' in transcript_text.lower() else 'Positive',
+        'primary_intent': 'Churn Risk' if any(word in transcript_text.lower() for word in ['leaving', 'switching', 'elsewhere']) else 'Technical Support',
+        'call_summary': 'Customer expressed frustration with technical issues and requested immediate assistance.' if 'frustrated' in transcript_text.lower() else 'Customer inquired about account services and investment options.',
+        'customer_insights': 'High churn risk customer showing escalating frustration with technical issues. Immediate intervention required.' if 'frustrated' in transcript_text.lower() else 'Positive customer engagement with interest in additional services.',
+        'churn_probability': 0.75 if 'frustrated' in transcript_text.lower() else 0.20,
+        'churn_risk_score': 'High' if 'frustrated' in transcript_text.lower() else 'Low',
+        'model_confidence': 87.5,
+        'next_best_action': 'URGENT: Schedule immediate senior advisor call to address concerns and prevent churn.',
+        'nba_reasoning': 'High churn risk requires immediate intervention to retain customer.'
+    }
+
+
+def _sentiment_and_summary(cortex, transcript_text, options, results, with_summary):
+    """
+    Fill sentiment (and the summary, for chunked or consolidated runs)
+    Long calls are chunked on turn boundaries and processed in parallel
+    """
+    chunked = needs_chunking(transcript_text, options["chunk_tokens"])
+    if chunked:
+        reduced = map_reduce_transcript(
+            transcript_text, cortex.sentiment, cortex.summarize,
+            chunk_tokens=options["chunk_tokens"], overlap_turns=options["chunk_overlap_turns"]
+        )
+        results['sentiment_score'] = reduced['sentiment_score']
+        results['call_summary'] = reduced['call_summary']
+        results['chunk_count'] = reduced['chunk_count']
+    else:
+        results['sentiment_score'] = cortex.sentiment(transcript_text)
+        if with_summary:
+            results['call_summary'] = cortex.summarize(transcript_text)
+    results['sentiment_label'] = sentiment_label(results['sentiment_score'])
+    return chunked
+
+
+def check_cortex_functions(conn):
+    """
+    Check the functions a run needs before any stage starts
+    Each is probed on first use and the answer cached per account (see
+    connection_helper.is_ai_function_available). Raises CortexUnavailable for
+    required functions known to be missing; unknown ones are simply tried.
+    Returns whether CLASSIFY_TEXT may be used.
+    """
+    missing = [name for name in REQUIRED_FUNCTIONS if is_ai_function_available(name, conn) is False]
+    if missing:
+        raise CortexUnavailable(f"Cortex {', '.join(name.upper() for name in missing)} not available in this account")
+    return is_ai_function_available("classify", conn) is not False
+
+
+def results_fingerprint(options):
+    """Fingerprint of the model, pipeline version and result-affecting options"""
+    settings = {name: options[name] for name in RESULT_OPTIONS}
+    settings.update(model=COMPLETE_MODEL, version=PIPELINE_VERSION)
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def pipeline_stages(options=None):
+    """Return the stage list for the given options"""
+    options = dict(DEFAULT_OPTIONS, **(options or {}))
+    return CONSOLIDATED_STAGES if options["consolidated"] else STANDARD_STAGES
+
+
+def run_pipeline(conn, transcript_text, options=None, on_progress=None, complete_stage_fn=None):
+    """
+    Run the AI/ML pipeline over one transcript and return the results dict
+    on_progress(active_index, stages, results) is called as each stage starts and
+    once more with active_index == len(stages) at the end. complete_stage_fn(prompt,
+    title, complete_fn) may take over COMPLETE-backed stages. Errors propagate so
+    the caller can choose between cached and fallback results; CortexUnavailable
+    is raised before any stage when a required function is known to be missing.
+    With reuse_near_duplicates, a near-duplicate's recorded results (similarity at
+    or above similarity_threshold, produced with the same results_fingerprint) are
+    returned without any Cortex calls, marked with reused_from and reuse_similarity;
+    fresh results are recorded for reuse.
+    """
+    options = dict(DEFAULT_OPTIONS, **(options or {}))
+    if not options["reuse_near_duplicates"]:
+        return _run_stages(conn, transcript_text, options, on_progress, complete_stage_fn)
+
+    index = get_near_duplicate_index()
+    fingerprint = results_fingerprint(options)
+    reused = reuse_results(index, transcript_text, options["similarity_threshold"], fingerprint)
+    if reused is not None:
+        if on_progress is not None:
+            stages = pipeline_stages(options)
+            on_progress(len(stages), stages, reused)
+        return reused
+
+    results = _run_stages(conn, transcript_text, options, on_progress, complete_stage_fn)
+    index.record_results(transcript_text, results, fingerprint=fingerprint)
+    return results
+
+
+def _run_stages(conn, transcript_text, options, on_progress, complete_stage_fn):
+    """Run every pipeline stage against Cortex (see run_pipeline)"""
+    classify_available = check_cortex_functions(conn)
+    cortex = CortexFunctions(conn, options)
+    stages = pipeline_stages(options)
+    results = {}
+
+    def progress(index):
+        if on_progress is not None:
+            on_progress(index, stages, results)
+
+    def complete_stage(prompt, title):
+        if complete_stage_fn is not None:
+            return complete_stage_fn(prompt, title, cortex.complete)
+        return cortex.complete(prompt)
+
+    if options["consolidated"]:
+        progress(0)
+        _sentiment_and_summary(cortex, transcript_text, options, results, with_summary=True)
+
+        progress(1)
+        # One COMPLETE round trip; only fields that fail validation are re-requested
+        context, stats = build_context(transcript_text, results['call_summary'], "consolidated")
+        signals = dict(results, negative_language=has_churn_language(transcript_text))
+        fields, call_stats = run_consolidated_completion(cortex.complete, context, signals)
+        fallback = fallback_results(transcript_text)
+        for name in call_stats['missing_fields']:
+            fields[name] = fallback[name]
+        results.update(fields)
+        results['prompt_stats'] = summarize_prompt_stats([stats])
+        results['consolidated_stats'] = call_stats
+
+        progress(2)
+        results.update(predict_churn(results, transcript_text))
+        progress(3)
+        return results
+
+    # Step 1: Sentiment Analysis
+    progress(0)
+    chunked = _sentiment_and_summary(cortex, transcript_text, options, results, with_summary=False)
+
+    # Step 2: Intent Detection - cheap tiers first, claude only when they are not confident
+    progress(1)
+    intent_text = build_context(transcript_text, results['call_summary'], "intent")[0] if chunked else transcript_text
+    intent = classify_intent(
+        intent_text, classify_fn=cortex.classify if classify_available else None, llm_fn=cortex.intent,
+        threshold=options["intent_threshold"]
+    )
+    results['primary_intent'] = intent['label']
+    results['intent_tier'] = intent['tier']
+
+    # Step 3: Call Summarization using SNOWFLAKE.CORTEX.SUMMARIZE()
+    progress(2)
+    if not chunked:
+        results['call_summary'] = cortex.summarize(transcript_text)
+
+    # Step 4: ML Churn Prediction (simplified demo version)
+    progress(3)
+    results.update(predict_churn(results, transcript_text))
+
+    # Step 5: Cross-transcript Customer Insights
+    # Downstream prompts reuse the summary and key turns instead of the full transcript
+    progress(4)
+    prompt_stats = []
+    insights_prompt, stats = build_insights_prompt(transcript_text, results.get('call_summary'), results)
+    prompt_stats.append(stats)
+    results['customer_insights'] = complete_stage(insights_prompt, "🔍 Customer Insights")
+
+    # Step 6: AI-powered Next Best Action and its reasoning
+    progress(5)
+    nba_prompt, stats = build_nba_prompt(transcript_text, results.get('call_summary'), results)
+    prompt_stats.append(stats)
+    results['next_best_action'] = complete_stage(nba_prompt, "💡 Next Best Action")
+
+    reasoning_prompt, stats = build_reasoning_prompt(results.get('next_best_action'), results)
+    prompt_stats.append(stats)
+    results['nba_reasoning'] = complete_stage(reasoning_prompt, "🧠 AI Reasoning")
+
+    results['prompt_stats'] = summarize_prompt_stats(prompt_stats)
+    progress(len(stages))
+    return results
@@ -0,0 +1,332 @@
+"""
+Analytics Mirror Module for Superannuation Transcripts Demo
+===========================================================
+
+Opt-in local mirror of the tables behind the Manager Dashboard and Data
+Foundation aggregates, so interactive filtering does not wake the warehouse:
+
+- The non-text columns of CUSTOMER, CUSTOMER_ANALYTICS and
+  ENRICHED_TRANSCRIPTS_ALL are kept as one Parquet file per table
+- sync_mirror() pulls only rows changed since the last sync (by each table's
+  CREATED_AT / UPDATED_AT / LAST_UPDATED column), skips tables whose
+  LAST_ALTERED has not moved and re-pulls a table in full when rows were
+  deleted upstream
+- Dashboard queries run unchanged on an embedded DuckDB database whose
+  SUPERANNUATION.TRANSCRIPTS views read those files
+
+Enabled with ANALYTICS_MIRROR=true (see connection_helper.execute_analytics_query).
+Queries touching anything that is not mirrored (other tables, text columns)
+go to Snowflake as before.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# duckdb is only needed when the mirror is enabled and is imported on first query
+
+DEFAULT_MIRROR_DIR = os.environ.get(
+    "ANALYTICS_MIRROR_DIR",
+    os.path.join(os.path.expanduser("~"), ".superannuation_demo", "mirror")
+)
+META_FILE = "mirror.json"
+
+# table -> key column, change-tracking column and the mirrored (non-text) columns,
+# per sql/01_create_database_objects.sql. Columns a deployment does not have are
+# dropped at sync time (CUSTOMER_ANALYTICS differs between the deploy scripts).
+MIRROR_TABLES = {
+    "CUSTOMER": {
+        "key": "CUSTOMER_ID",
+        "watermark": "UPDATED_AT",
+        "columns": [
+            "CUSTOMER_ID", "CUSTOMER_NAME", "AGE", "TENURE_YEARS", "ACCOUNT_BALANCE",
+            "INVESTMENT_OPTION", "RECENT_TRANSACTIONS", "LAST_INTERACTION_DATE",
+            "CONTACT_PREFERENCE", "CALL_FREQUENCY_LAST_MONTH", "AVG_SENTIMENT_LAST_3_CALLS",
+            "NUM_NEGATIVE_CALLS_LAST_6_MONTHS", "HAS_CHURN_INTENT_LAST_MONTH",
+            "CHURN_RISK_SCORE", "CHURN_PROBABILITY", "CREATED_AT", "UPDATED_AT"
+        ]
+    },
+    "CUSTOMER_ANALYTICS": {
+        "key": "CUSTOMER_ID",
+        "watermark": "LAST_UPDATED",
+        "columns": [
+            "CUSTOMER_ID", "TOTAL_CALLS", "AVG_CALL_DURATION", "AVG_SENTIMENT_SCORE",
+            "COMPLAINT_COUNT", "UPSELL_OPPORTUNITIES", "CHURN_RISK_SCORE", "CHURN_PROBABILITY",
+            "CUSTOMER_NAME", "CHURN_PREDICTION", "MODEL_CONFIDENCE", "LAST_UPDATED"
+        ]
+    },
+    "ENRICHED_TRANSCRIPTS_ALL": {
+        "key": "CALL_ID",
+        "watermark": "CREATED_AT",
+        "columns": [
+            "CALL_ID", "CUSTOMER_ID", "CALL_TIMESTAMP", "SENTIMENT_SCORE", "SENTIMENT_LABEL",
+            "PRIMARY_INTENT", "CHURN_RISK_SCORE", "CHURN_PROBABILITY", "CREATED_AT"
+        ]
+    }
+}
+
+_TABLE_PATTERN = re.compile(r"\bSUPERANNUATION\.TRANSCRIPTS\.(\w+)", re.IGNORECASE)
+
+_metrics_lock = threading.Lock()
+MIRROR_METRICS = {"local": 0, "warehouse": 0, "fallbacks": 0}
+
+
+def mirror_path(table, mirror_dir=DEFAULT_MIRROR_DIR):
+    return os.path.join(mirror_dir, f"{table}.parquet")
+
+
+def read_mirror_meta(mirror_dir=DEFAULT_MIRROR_DIR):
+    """Return {'tables': {table: {...}}} for the mirror, empty if never synced"""
+    try:
+        with open(os.path.join(mirror_dir, META_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"tables": {}}
+
+
+def _write_mirror_meta(mirror_dir, meta):
+    tmp_path = os.path.join(mirror_dir, f"{META_FILE}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, os.path.join(mirror_dir, META_FILE))
+
+
+def _write_table(table, path):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _fetch_arrow(conn, query, params=None):
+    """Run a query on a DB-API connection and return an Arrow table (None if no rows)"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params)
+        return cursor.fetch_arrow_all()
+    finally:
+        cursor.close()
+
+
+def _fetch_scalar_rows(conn, query, params=None):
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+def _table_state(conn, tables):
+    """{table: (LAST_ALTERED as text, ROW_COUNT)} from INFORMATION_SCHEMA in one metadata query"""
+    rows = _fetch_scalar_rows(conn, f"""
+    SELECT TABLE_NAME, LAST_ALTERED, ROW_COUNT
+    FROM SUPERANNUATION.INFORMATION_SCHEMA.TABLES
+    WHERE TABLE_SCHEMA = 'TRANSCRIPTS'
+      AND TABLE_NAME IN ({', '.join('?' for _ in tables)})
+    """, list(tables))
+    return {name: (str(last_altered), row_count) for name, last_altered, row_count in rows}
+
+
+def _table_columns(conn, tables):
+    """{table: set of column names} from INFORMATION_SCHEMA in one metadata query"""
+    rows = _fetch_scalar_rows(conn, f"""
+    SELECT TABLE_NAME, COLUMN_NAME
+    FROM SUPERANNUATION.INFORMATION_SCHEMA.COLUMNS
+    WHERE TABLE_SCHEMA = 'TRANSCRIPTS'
+      AND TABLE_NAME IN ({', '.join('?' for _ in tables)})
+    """, list(tables))
+    columns = {}
+    for name, column in rows:
+        columns.setdefault(name, set()).add(column)
+    return columns
+
+
+def _available_spec(table, available):
+    """The table's mirror spec limited to the columns the warehouse has"""
+    spec = MIRROR_TABLES[table]
+    if not available:
+        raise ValueError(f"{table} not found in SUPERANNUATION.TRANSCRIPTS")
+    missing = [column for column in (spec["key"], spec["watermark"]) if column not in available]
+    if missing:
+        raise ValueError(f"{table} has no {', '.join(missing)} column")
+    return dict(spec, columns=[column for column in spec["columns"] if column in available])
+
+
+def _sync_table(conn, table, spec, entry, mirror_dir, full):
+    """Pull changed rows for one table and merge them into its Parquet file by key"""
+    path = mirror_path(table, mirror_dir)
+    columns = ", ".join(spec["columns"])
+    watermark_column = spec["watermark"]
+    watermark = None if full or not os.path.exists(path) else entry.get("watermark")
+
+    query = f"SELECT {columns} FROM SUPERANNUATION.TRANSCRIPTS.{table}"
+    params = None
+    if watermark is not None:
+        # Rows at the watermark are fetched again and replaced by key
+        query += f" WHERE {watermark_column} >= ? OR {watermark_column} IS NULL"
+        params = [watermark]
+    fetched = _fetch_arrow(conn, query, params)
+    fetched_rows = fetched.num_rows if fetched is not None else 0
+
+    if watermark is None:
+        merged = fetched if fetched is not None else None
+    else:
+        merged = pq.read_table(path)
+        if fetched is not None:
+            # Arrow types from the connector follow the values fetched, so align to the file
+            fetched = fetched.cast(merged.schema)
+            unchanged = pc.invert(pc.is_in(merged.column(spec["key"]), value_set=fetched.column(spec["key"])))
+            merged = pa.concat_tables([merged.filter(unchanged), fetched])
+
+    if merged is None:
+        if os.path.exists(path):
+            os.remove(path)
+        return {"rows_fetched": 0, "rows": 0, "watermark": None}
+
+    _write_table(merged, path)
+    latest = pc.max(merged.column(watermark_column)).as_py() if merged.num_rows else None
+    return {
+        "rows_fetched": fetched_rows,
+        "rows": merged.num_rows,
+        "watermark": str(latest) if latest is not None else None
+    }
+
+
+def _failed_result(entry, error, started):
+    """Result for a table whose sync failed; its previous mirror is left as it was"""
+    return {
+        "status": "failed",
+        "error": str(error),
+        "rows_fetched": 0,
+        "rows": entry.get("rows", 0),
+        "seconds": round(time.perf_counter() - started, 3)
+    }
+
+
+def sync_mirror(conn, mirror_dir=DEFAULT_MIRROR_DIR, full=False, tables=None):
+    """
+    Bring the local mirror up to date from Snowflake
+    conn is a DB-API connection (fetch_arrow_all is used). A table is skipped
+    when its LAST_ALTERED is unchanged; it is re-pulled in full when the merged
+    mirror holds more rows than the warehouse (rows were deleted upstream) or its
+    fetched types no longer match the file. Only the configured columns the
+    warehouse has are mirrored. A table that fails is reported with status
+    'failed' and an error, and keeps its previous mirror. Returns {table: result dict}.
+    """
+    os.makedirs(mirror_dir, exist_ok=True)
+    meta = read_mirror_meta(mirror_dir)
+    tables = list(tables or MIRROR_TABLES)
+    state = _table_state(conn, tables)
+    table_columns = _table_columns(conn, tables)
+    results = {}
+
+    for table in tables:
+        started = time.perf_counter()
+        entry = meta["tables"].get(table, {})
+        last_altered, row_count = state.get(table, (None, None))
+        try:
+            spec = _available_spec(table, table_columns.get(table))
+        except ValueError as e:
+            results[table] = _failed_result(entry, e, started)
+            continue
+        # A changed column list cannot be merged into the existing file
+        table_full = full or entry.get("columns") != spec["columns"]
+        if not table_full and last_altered is not None and entry.get("last_altered") == last_altered \
+                and os.path.exists(mirror_path(table, mirror_dir)):
+            results[table] = {"status": "unchanged", "rows_fetched": 0, "rows": entry.get("rows", 0), "seconds": 0.0}
+            continue
+
+        # One table failing leaves its previous mirror in place and the others syncing
+        try:
+            try:
+                result = _sync_table(conn, table, spec, entry, mirror_dir, table_full)
+                status = "full" if table_full or entry.get("watermark") is None else "incremental"
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                result = _sync_table(conn, table, spec, entry, mirror_dir, True)
+                status = "full"
+            if row_count is not None and result["rows"] > row_count and status == "incremental":
+                result = _sync_table(conn, table, spec, entry, mirror_dir, True)
+                status = "full"
+        except Exception as e:
+            results[table] = _failed_result(entry, e, started)
+            continue
+
+        meta["tables"][table] = {
+            "last_altered": last_altered,
+            "watermark": result["watermark"],
+            "rows": result["rows"],
+            "columns": spec["columns"],
+            "synced_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+        }
+        _write_mirror_meta(mirror_dir, meta)
+        results[table] = dict(result, status=status, seconds=round(time.perf_counter() - started, 3))
+    return results
+
+
+def referenced_tables(query):
+    """Upper-cased SUPERANNUATION.TRANSCRIPTS tables a query reads"""
+    return {name.upper() for name in _TABLE_PATTERN.findall(query)}
+
+
+def can_serve(query, mirror_dir=DEFAULT_MIRROR_DIR):
+    """Whether every table the query reads is mirrored and has been synced"""
+    tables = referenced_tables(query)
+    if not tables or not tables.issubset(MIRROR_TABLES):
+        return False
+    return all(os.path.exists(mirror_path(table, mirror_dir)) for table in tables)
+
+
+_local = threading.local()
+
+
+def _duckdb_connection(mirror_dir):
+    """Per-thread DuckDB connection with a view per synced table, rebuilt after a sync"""
+    import duckdb
+
+    version = (mirror_dir, json.dumps(read_mirror_meta(mirror_dir), sort_keys=True))
+    cached = getattr(_local, "duckdb", None)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    db = duckdb.connect(":memory:")
+    # The same three-part names as in Snowflake, so dashboard SQL runs unchanged
+    db.execute("ATTACH ':memory:' AS SUPERANNUATION")
+    db.execute("CREATE SCHEMA SUPERANNUATION.TRANSCRIPTS")
+    for table in MIRROR_TABLES:
+        path = mirror_path(table, mirror_dir)
+        if os.path.exists(path):
+            quoted = path.replace("'", "''")
+            db.execute(f"CREATE VIEW SUPERANNUATION.TRANSCRIPTS.{table} AS SELECT * FROM read_parquet('{quoted}')")
+    if cached is not None:
+        cached[1].close()
+    _local.duckdb = (version, db)
+    return db
+
+
+def query_mirror(query, params=None, mirror_dir=DEFAULT_MIRROR_DIR):
+    """Run a query on the local mirror; column names are upper-cased like Snowflake's"""
+    result = _duckdb_connection(mirror_dir).execute(query, params or []).df()
+    result.columns = [column.upper() for column in result.columns]
+    return result
+
+
+def record_query(source):
+    """Count a query served locally, by the warehouse, or by the warehouse after a local failure"""
+    with _metrics_lock:
+        MIRROR_METRICS[source] += 1
+
+
+def get_mirror_stats(mirror_dir=DEFAULT_MIRROR_DIR):
+    """Return query counters plus per-table row counts and sync times"""
+    with _metrics_lock:
+        stats = dict(MIRROR_METRICS)
+    total = stats["local"] + stats["warehouse"]
+    stats["local_rate"] = stats["local"] / total if total else 0.0
+    stats["tables"] = read_mirror_meta(mirror_dir)["tables"]
+    return stats
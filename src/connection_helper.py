@@ -9,12 +9,30 @@ This module provides a unified connection interface that works in both:
 Based on the pattern from Reference/nation_app.py
 """
 
-import snowflake.connector
-import tomli
 import streamlit as st
-from snowflake.snowpark.context import get_active_session
-import pandas as pd
 import os
+import re
+import sys
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# snowflake.connector, snowflake.snowpark, tomli and pandas are imported where
+# they are used so the app can start rendering before they are loaded
+
+LOCAL_CONFIG_PATH = '/Users/sweingartner/.snowflake/config.toml'
+
+def _snowpark_session_likely():
+    """
+    Whether to try an active Snowpark session before the local config
+    True inside Streamlit in Snowflake (no local config), when Snowpark is already
+    loaded, or when SNOWFLAKE_USE_SNOWPARK is set
+    """
+    forced = os.environ.get("SNOWFLAKE_USE_SNOWPARK")
+    if forced is not None:
+        return forced.lower() == "true"
+    return 'snowflake.snowpark' in sys.modules or not os.path.exists(LOCAL_CONFIG_PATH)
 
 @st.cache_resource(show_spinner="Connecting to Snowflake...")
 def get_snowflake_connection():
@@ -23,19 +41,25 @@ def get_snowflake_connection():
     Based on Reference/nation_app.py pattern with enhancements for demo
     """
     # First try to get active session (for Streamlit in Snowflake)
-    try:
-        session = get_active_session()
-        if session:
-            # Verify the session is working by testing a simple query
-            session.sql("SELECT 1").collect()
-            return session
-    except Exception:
-        # If get_active_session fails, continue to local connection
-        pass
+    # Snowpark is slow to import, so it is only loaded when a session is likely
+    if _snowpark_session_likely():
+        try:
+            from snowflake.snowpark.context import get_active_session
+            session = get_active_session()
+            if session:
+                # Verify the session is working by testing a simple query
+                session.sql("SELECT 1").collect()
+                return session
+        except Exception:
+            # If get_active_session fails, continue to local connection
+            pass
             
     # Try local connection using config file
     try:
-        config_path = '/Users/sweingartner/.snowflake/config.toml'
+        import snowflake.connector
+        import tomli
+        
+        config_path = LOCAL_CONFIG_PATH
         
         # Check if config file exists
         if not os.path.exists(config_path):
@@ -55,7 +79,8 @@ def get_snowflake_connection():
             raise ValueError(f"Connection '{default_conn}' not found in config.toml")
         
         # Create a connection with error handling
-        conn = snowflake.connector.connect(**conn_params)
+        # qmark binds are sent to the server, so statement text stays identical across values
+        conn = snowflake.connector.connect(**dict(conn_params, paramstyle='qmark'))
         
         # Test the connection
         cursor = conn.cursor()
@@ -72,9 +97,173 @@ def get_snowflake_connection():
         st.error(f"Failed to connect to Snowflake: {str(e)}")
         return None
 
-def execute_query(query, conn=None):
+# Single-flight state: concurrent identical queries share one execution
+_inflight_lock = threading.Lock()
+_inflight = {}
+COALESCE_STATS = {"executed": 0, "coalesced": 0}
+
+# Quoted string literals are left untouched when normalizing whitespace
+_LITERAL_PATTERN = re.compile(r"('(?:[^']|'')*')")
+# Only read-only statements are coalesced; a duplicate write is never dropped
+_READ_ONLY_PATTERN = re.compile(r"^\s*\(*\s*(SELECT|WITH|SHOW|DESC|DESCRIBE)\b", re.IGNORECASE)
+
+class _Flight:
+    """One in-flight query execution that other callers can wait on"""
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+def normalize_query(query):
+    """Collapse whitespace outside string literals so formatting differences share a flight"""
+    parts = _LITERAL_PATTERN.split(query.strip().rstrip(';'))
+    return "".join(part if i % 2 else re.sub(r"\s+", " ", part) for i, part in enumerate(parts)).strip()
+
+def _run_query(query, conn, params=None, timeout=None):
+    import pandas as pd
+    if hasattr(conn, 'sql'):  # Snowpark session
+        statement_params = {"STATEMENT_TIMEOUT_IN_SECONDS": timeout} if timeout else None
+        return conn.sql(query, params=params).to_pandas(statement_params=statement_params)
+    # Regular connection
+    if not timeout:
+        return pd.read_sql(query, conn, params=params)
+    # pd.read_sql cannot pass a timeout; the connector cancels the statement server-side
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, params, timeout=timeout)
+        columns = [column[0] for column in cursor.description]
+        return pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+    finally:
+        cursor.close()
+
+def is_read_only(query):
+    """Whether a statement only reads (SELECT, WITH, SHOW, DESCRIBE)"""
+    return _READ_ONLY_PATTERN.match(query) is not None
+
+def _single_flight(key, fn):
+    """
+    Run fn once per key at a time
+    The first caller executes; concurrent callers with the same key wait for it
+    and get a copy of its result (or its exception)
+    """
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _Flight()
+            _inflight[key] = flight
+            COALESCE_STATS["executed"] += 1
+        else:
+            flight.followers += 1
+            COALESCE_STATS["coalesced"] += 1
+    
+    if leader:
+        try:
+            flight.result = fn()
+        except Exception as e:
+            flight.error = e
+        finally:
+            with _inflight_lock:
+                _inflight.pop(key, None)
+            flight.done.set()
+    else:
+        flight.done.wait()
+    
+    if flight.error is not None:
+        raise flight.error
+    # Callers often rename or mutate columns, so the shared frame is never handed
+    # out once a follower has joined: every caller, leader included, gets a copy.
+    # No follower can join after the flight is removed, so the count is final here.
+    if leader and flight.followers == 0:
+        return flight.result
+    return flight.result.copy()
+
+def get_coalesce_stats():
+    """
+    Return single-flight counters
+    executed: queries actually sent to Snowflake; coalesced: callers that shared one
+    """
+    with _inflight_lock:
+        stats = dict(COALESCE_STATS, in_flight=len(_inflight))
+    total = stats["executed"] + stats["coalesced"]
+    stats["coalesced_rate"] = stats["coalesced"] / total if total else 0.0
+    return stats
+
+# Frame dtypes, driven by the demo table definitions in sql/01_create_database_objects.sql:
+# low-cardinality VARCHAR columns become categoricals, DECIMAL values arriving as Decimal
+# objects become float64 and int64 columns become int32 when their values fit. Nothing
+# goes narrower: row access (df.iloc[0]) hands page code numpy scalars, and int8/int16
+# arithmetic silently wraps (60 * 3 -> -76). Floats are not narrowed to float32 either:
+# pages compare scores against thresholds such as 0.3, which it cannot hold exactly.
+CATEGORICAL_COLUMNS = {
+    "CHURN_RISK_SCORE", "SENTIMENT_LABEL", "PRIMARY_INTENT", "INVESTMENT_OPTION", "CONTACT_PREFERENCE"
+}
+INT32_MIN, INT32_MAX = -2**31, 2**31 - 1
+# Other text columns become categoricals only in larger frames where values repeat
+CATEGORY_MIN_ROWS = 100
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+_memory_lock = threading.Lock()
+FRAME_MEMORY_STATS = {"frames": 0, "raw_bytes": 0, "optimized_bytes": 0}
+
+def _is_decimal_column(series):
+    from decimal import Decimal
+    first = series.first_valid_index()
+    return first is not None and isinstance(series[first], Decimal)
+
+def optimize_dtypes(df):
+    """
+    Convert a query result to compact dtypes in place and return it
+    Per-frame memory before and after is stored in df.attrs["memory_bytes"]
+    and added to the process-wide totals from get_frame_memory_stats()
+    """
+    import pandas as pd
+    raw_bytes = int(df.memory_usage(deep=True).sum())
+    for position, column in enumerate(df.columns):
+        series = df.iloc[:, position]
+        converted = series
+        if converted.dtype == object and _is_decimal_column(converted):
+            # NUMBER columns with a scale arrive as Decimal objects through pd.read_sql
+            converted = pd.to_numeric(converted)
+        # pandas < 3 holds text as object, later versions as the str dtype
+        is_text = pd.api.types.is_string_dtype(converted)
+        if str(column).upper() in CATEGORICAL_COLUMNS and is_text:
+            converted = converted.astype("category")
+        elif converted.dtype == "int64" and len(converted):
+            if INT32_MIN <= converted.min() and converted.max() <= INT32_MAX:
+                converted = converted.astype("int32")
+        elif is_text and len(converted) >= CATEGORY_MIN_ROWS:
+            if converted.nunique(dropna=True) <= len(converted) * CATEGORY_MAX_UNIQUE_RATIO:
+                converted = converted.astype("category")
+        if converted is not series:
+            df.isetitem(position, converted)
+
+    optimized_bytes = int(df.memory_usage(deep=True).sum())
+    df.attrs["memory_bytes"] = {"raw": raw_bytes, "optimized": optimized_bytes}
+    with _memory_lock:
+        FRAME_MEMORY_STATS["frames"] += 1
+        FRAME_MEMORY_STATS["raw_bytes"] += raw_bytes
+        FRAME_MEMORY_STATS["optimized_bytes"] += optimized_bytes
+    return df
+
+def get_frame_memory_stats():
+    """Return frame memory totals (raw vs optimized bytes) with the reduction ratio"""
+    with _memory_lock:
+        stats = dict(FRAME_MEMORY_STATS)
+    stats["reduction"] = stats["raw_bytes"] / stats["optimized_bytes"] if stats["optimized_bytes"] else None
+    return stats
+
+def run_query(query, conn=None, params=None, coalesce=True, optimize=True, timeout=None):
     """
     Execute a query using either Snowpark session or regular connection
+    Values go in params and are referenced with ? placeholders (server-side binds),
+    so the statement text - and the result cache - is shared across values.
+    Identical concurrent read-only queries on the same connection are coalesced
+    into one execution; pass coalesce=False when a duplicate is intended (e.g. hedging)
+    Results get compact dtypes (see optimize_dtypes) unless optimize=False
+    timeout (whole seconds) cancels the statement when it runs longer
+    Makes no Streamlit calls, so it is safe from worker threads; errors propagate
     Returns pandas DataFrame
     """
     if conn is None:
@@ -83,24 +272,59 @@ def execute_query(query, conn=None):
     if conn is None:
         raise Exception("No valid Snowflake connection available")
     
+    if params is not None:
+        params = list(params)
+    def run():
+        result = _run_query(query, conn, params, timeout)
+        return optimize_dtypes(result) if optimize else result
+    
+    if not coalesce or not is_read_only(query):
+        return run()
+    key = (id(conn), normalize_query(query), tuple(params or ()), optimize)
+    return _single_flight(key, run)
+
+def execute_query(query, conn=None, params=None, coalesce=True, optimize=True):
+    """
+    Execute a query from page code (see run_query), reporting failures on the page
+    Returns pandas DataFrame
+    """
     try:
-        if hasattr(conn, 'sql'):  # Snowpark session
-            result = conn.sql(query).to_pandas()
-        else:  # Regular connection
-            result = pd.read_sql(query, conn)
-        return result
+        return run_query(query, conn, params=params, coalesce=coalesce, optimize=optimize)
     except Exception as e:
         st.error(f"Query execution failed: {str(e)}")
         raise
 
-def safe_execute_query(query, conn=None, fallback_data=None):
+# Opt-in local mirror for dashboard aggregates; analytics_mirror (pyarrow, duckdb) is only loaded when enabled
+ANALYTICS_MIRROR_ENABLED = os.environ.get("ANALYTICS_MIRROR", "false").lower() == "true"
+
+def execute_analytics_query(query, conn=None, params=None):
+    """
+    Execute a dashboard aggregate, on the local analytics mirror when enabled
+    Queries the mirror cannot serve (unmirrored tables or columns, not yet
+    synced) go through execute_query, so results never depend on the mirror
+    being complete. Returns pandas DataFrame
+    """
+    if ANALYTICS_MIRROR_ENABLED:
+        from analytics_mirror import can_serve, query_mirror, record_query
+        if can_serve(query):
+            try:
+                result = optimize_dtypes(query_mirror(query, params))
+                record_query("local")
+                return result
+            except Exception:
+                record_query("fallbacks")
+        record_query("warehouse")
+    return execute_query(query, conn, params)
+
+def safe_execute_query(query, conn=None, fallback_data=None, params=None):
     """
     Safely execute a query with fallback data if query fails
     Useful for demo scenarios where we want graceful degradation
     """
     try:
-        return execute_query(query, conn)
+        return execute_query(query, conn, params=params)
     except Exception as e:
+        import pandas as pd
         st.warning(f"Query failed, using fallback data: {str(e)}")
         if fallback_data is not None:
             return fallback_data
@@ -108,9 +332,121 @@ def safe_execute_query(query, conn=None, fallback_data=None):
             # Return empty dataframe with standard structure
             return pd.DataFrame()
 
-def test_ai_functions(conn=None):
+# Cortex capability probes: function -> (probe query, check on the first value)
+AI_PROBES = {
+    "sentiment": (
+        "SELECT SNOWFLAKE.CORTEX.SENTIMENT('This is a test message') as sentiment_test",
+        lambda value: True
+    ),
+    "summarize": (
+        "SELECT SNOWFLAKE.CORTEX.SUMMARIZE('This is a test message for summarization testing. It contains multiple sentences to verify the summarization function works correctly.') as summarize_test",
+        lambda value: True
+    ),
+    "complete": (
+        """
+        SELECT SNOWFLAKE.CORTEX.COMPLETE(
+            'claude-3-5-sonnet', 
+            'Respond with just the word: WORKING'
+        ) as complete_test
+        """,
+        lambda value: 'WORKING' in str(value).upper()
+    ),
+    "classify": (
+        """
+        SELECT SNOWFLAKE.CORTEX.CLASSIFY_TEXT(
+            'This is a positive message', 
+            ['positive', 'negative', 'neutral']
+        ) as classify_test
+        """,
+        lambda value: True
+    )
+}
+
+# Probe results are persisted per account/region so restarts skip the LLM calls
+AI_PROBE_CACHE_PATH = os.environ.get(
+    "CORTEX_PROBE_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".superannuation_demo", "cortex_probes.json")
+)
+AI_PROBE_TTL_SECONDS = float(os.environ.get("CORTEX_PROBE_TTL_HOURS", "24")) * 3600
+AI_PROBE_LAZY = os.environ.get("CORTEX_PROBE_LAZY", "false").lower() == "true"
+
+# Errors that mean the function is really missing for this account, as opposed to
+# throttling, a warehouse resume or a network blip; only these are persisted
+_PROBE_UNAVAILABLE_PATTERN = re.compile(
+    r"unknown (user-defined )?function|does not exist|not (enabled|available|supported)|unsupported",
+    re.IGNORECASE
+)
+
+_probe_lock = threading.Lock()
+_account_keys = {}
+
+def _account_key(conn):
+    """Account/region identity used to key persisted probe results"""
+    key = _account_keys.get(id(conn))
+    if key is None:
+        result = run_query("SELECT CURRENT_ACCOUNT() as account, CURRENT_REGION() as region", conn)
+        key = f"{result.iloc[0]['ACCOUNT']}@{result.iloc[0]['REGION']}"
+        _account_keys[id(conn)] = key
+    return key
+
+def _read_probe_cache():
+    try:
+        with open(AI_PROBE_CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_probe_results(account_key, results):
+    """Merge definitive probe results into the on-disk cache (atomic replace); None is skipped"""
+    results = {name: available for name, available in results.items() if available is not None}
+    if not results:
+        return
+    with _probe_lock:
+        cache = _read_probe_cache()
+        entries = cache.setdefault(account_key, {})
+        for name, available in results.items():
+            entries[name] = {"available": available, "checked_at": time.time()}
+        try:
+            os.makedirs(os.path.dirname(AI_PROBE_CACHE_PATH), exist_ok=True)
+            temp_path = f"{AI_PROBE_CACHE_PATH}.{os.getpid()}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(cache, f, indent=2)
+            os.replace(temp_path, AI_PROBE_CACHE_PATH)
+        except OSError:
+            # Read-only filesystems (e.g. Streamlit in Snowflake) just re-probe next time
+            pass
+
+def _cached_probe_results(account_key):
+    """Unexpired persisted results for an account: function -> bool"""
+    now = time.time()
+    entries = _read_probe_cache().get(account_key, {})
+    return {
+        name: entry["available"]
+        for name, entry in entries.items()
+        if name in AI_PROBES and now - entry.get("checked_at", 0) < AI_PROBE_TTL_SECONDS
+    }
+
+def _run_probe(name, conn):
+    """
+    Probe one function: True/False when the answer is definitive (a result row, or
+    an error saying the function is missing or not enabled), None for other errors
+    """
+    query, check = AI_PROBES[name]
+    try:
+        result = run_query(query, conn)
+        return not result.empty and check(result.iloc[0, 0])
+    except Exception as e:
+        if _PROBE_UNAVAILABLE_PATTERN.search(str(e)):
+            return False
+        return None
+
+def test_ai_functions(conn=None, lazy=None, refresh=False):
     """
     Test if Snowflake Cortex AI functions are available and working
+    Persisted results younger than the TTL are reused; missing ones are probed
+    concurrently. With lazy=True nothing is probed up front and unknown
+    functions are reported as None until is_ai_function_available() checks them;
+    a probe that fails transiently also reports None and is not persisted.
     Returns dict with function availability status
     """
     if conn is None:
@@ -119,65 +455,81 @@ def test_ai_functions(conn=None):
     if conn is None:
         return {"error": "No connection available"}
     
-    ai_functions = {
-        "sentiment": False,
-        "summarize": False,
-        "complete": False,
-        "classify": False
-    }
+    if lazy is None:
+        lazy = AI_PROBE_LAZY
     
     try:
-        # Test sentiment analysis
-        test_query = "SELECT SNOWFLAKE.CORTEX.SENTIMENT('This is a test message') as sentiment_test"
-        result = execute_query(test_query, conn)
-        if not result.empty:
-            ai_functions["sentiment"] = True
-    except:
-        pass
+        account_key = _account_key(conn)
+    except Exception as e:
+        return {"error": str(e)}
     
-    try:
-        # Test summarization
-        test_query = "SELECT SNOWFLAKE.CORTEX.SUMMARIZE('This is a test message for summarization testing. It contains multiple sentences to verify the summarization function works correctly.') as summarize_test"
-        result = execute_query(test_query, conn)
-        if not result.empty:
-            ai_functions["summarize"] = True
-    except:
-        pass
+    ai_functions = {name: None for name in AI_PROBES}
+    if not refresh:
+        ai_functions.update(_cached_probe_results(account_key))
     
-    try:
-        # Test completion (claude)
-        test_query = """
-        SELECT SNOWFLAKE.CORTEX.COMPLETE(
-            'claude-3-5-sonnet', 
-            'Respond with just the word: WORKING'
-        ) as complete_test
-        """
-        result = execute_query(test_query, conn)
-        if not result.empty and 'WORKING' in str(result.iloc[0, 0]).upper():
-            ai_functions["complete"] = True
-    except:
-        pass
+    pending = [name for name, available in ai_functions.items() if available is None]
+    if pending and not lazy:
+        with ThreadPoolExecutor(max_workers=len(pending)) as pool:
+            probed = dict(zip(pending, pool.map(lambda name: _run_probe(name, conn), pending)))
+        _write_probe_results(account_key, probed)
+        ai_functions.update(probed)
+    
+    return ai_functions
+
+def is_ai_function_available(name, conn=None):
+    """
+    Lazily check one Cortex function, probing it only if no fresh result is cached
+    Returns True/False, or None when it could not be determined (callers just try the call)
+    """
+    if conn is None:
+        conn = get_snowflake_connection()
+    if conn is None:
+        return False
     
     try:
-        # Test classification
-        test_query = """
-        SELECT SNOWFLAKE.CORTEX.CLASSIFY_TEXT(
-            'This is a positive message', 
-            ['positive', 'negative', 'neutral']
-        ) as classify_test
-        """
-        result = execute_query(test_query, conn)
-        if not result.empty:
-            ai_functions["classify"] = True
-    except:
-        pass
+        account_key = _account_key(conn)
+    except Exception:
+        return None
+    cached = _cached_probe_results(account_key)
+    if name in cached:
+        return cached[name]
     
-    return ai_functions
+    available = _run_probe(name, conn)
+    _write_probe_results(account_key, {name: available})
+    return available
+
+# Demo tables tracked by the data status check: status key -> table name
+DEMO_TABLES = {
+    "customers": "CUSTOMER",
+    "transcripts": "RAW_CALL_TRANSCRIPTS",
+    "enriched_transcripts": "ENRICHED_TRANSCRIPTS_ALL",
+    "customer_analytics": "CUSTOMER_ANALYTICS"
+}
+
+# Tables are loaded by separate scripts, so a process-local invalidation hook would
+# never fire; the metadata query is cheap and only briefly cached instead
+TABLE_METADATA_TTL_SECONDS = 60
+
+@st.cache_data(ttl=TABLE_METADATA_TTL_SECONDS, show_spinner=False)
+def _load_table_metadata(_conn):
+    """
+    Read ROW_COUNT, BYTES and LAST_ALTERED for the demo tables in one metadata query
+    Served from INFORMATION_SCHEMA, so the cost does not depend on table size
+    """
+    table_names = list(DEMO_TABLES.values())
+    query = f"""
+    SELECT TABLE_NAME, ROW_COUNT, BYTES, LAST_ALTERED
+    FROM SUPERANNUATION.INFORMATION_SCHEMA.TABLES
+    WHERE TABLE_SCHEMA = 'TRANSCRIPTS'
+      AND TABLE_NAME IN ({', '.join('?' for _ in table_names)})
+    """
+    return execute_query(query, _conn, params=table_names)
 
 def get_demo_data_status(conn=None):
     """
     Check if demo data is loaded and available
-    Returns dict with data availability status
+    Returns a health dict: overall status, per-table row count, bytes and
+    last-altered time, plus the original boolean availability keys
     """
     if conn is None:
         conn = get_snowflake_connection()
@@ -185,29 +537,29 @@ def get_demo_data_status(conn=None):
     if conn is None:
         return {"error": "No connection available"}
     
-    data_status = {
-        "customers": False,
-        "transcripts": False,
-        "enriched_transcripts": False,
-        "customer_analytics": False
-    }
+    try:
+        metadata = _load_table_metadata(conn)
+    except Exception as e:
+        return {"error": str(e), "status": "error"}
     
-    tables_to_check = [
-        ("customers", "SUPERANNUATION.TRANSCRIPTS.CUSTOMER"),
-        ("transcripts", "SUPERANNUATION.TRANSCRIPTS.RAW_CALL_TRANSCRIPTS"),
-        ("enriched_transcripts", "SUPERANNUATION.TRANSCRIPTS.ENRICHED_TRANSCRIPTS_ALL"),
-        ("customer_analytics", "SUPERANNUATION.TRANSCRIPTS.CUSTOMER_ANALYTICS")
-    ]
+    import pandas as pd
+    rows = {row['TABLE_NAME']: row for _, row in metadata.iterrows()}
+    data_status = {"tables": {}}
     
-    for key, table_name in tables_to_check:
-        try:
-            query = f"SELECT COUNT(*) as row_count FROM {table_name} LIMIT 1"
-            result = execute_query(query, conn)
-            if not result.empty and result.iloc[0, 0] > 0:
-                data_status[key] = True
-        except:
-            pass
+    for key, table_name in DEMO_TABLES.items():
+        row = rows.get(table_name)
+        row_count = int(row['ROW_COUNT']) if row is not None and pd.notna(row['ROW_COUNT']) else 0
+        data_status["tables"][key] = {
+            "table": f"SUPERANNUATION.TRANSCRIPTS.{table_name}",
+            "exists": row is not None,
+            "row_count": row_count,
+            "bytes": int(row['BYTES']) if row is not None and pd.notna(row['BYTES']) else 0,
+            "last_altered": str(row['LAST_ALTERED']) if row is not None else None
+        }
+        data_status[key] = row_count > 0
     
+    ready = [data_status[key] for key in DEMO_TABLES]
+    data_status["status"] = "healthy" if all(ready) else ("degraded" if any(ready) else "empty")
     return data_status
 
 @st.cache_data(ttl=600)
@@ -262,8 +614,9 @@ def initialize_demo_environment():
     if status["connection"]["status"] == "connected":
         try:
             conn = get_snowflake_connection()
-            status["ai_functions"] = test_ai_functions(conn)
+            # Metadata-only status first; it does not wait on AI probing
             status["data_status"] = get_demo_data_status(conn)
+            status["ai_functions"] = test_ai_functions(conn)
         except Exception as e:
             status["ai_functions"] = {"error": str(e)}
             status["data_status"] = {"error": str(e)}
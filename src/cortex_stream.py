@@ -0,0 +1,211 @@
+"""
+Cortex Streaming Module for Superannuation Transcripts Demo
+===========================================================
+
+Streams COMPLETE output token by token so the UI can render partial text
+while generation is still running. Three transports are supported:
+
+1. Cortex REST streaming (server-sent events from /api/v2/cortex/inference:complete)
+2. Chunked polling fallback: the SQL COMPLETE call runs in a background thread and
+   the response is surfaced in pieces once it lands. This only replays the full
+   response, so it has no meaningful time to first text
+3. A local stub that streams canned text, for testing the UI without Snowflake
+
+Set CORTEX_STREAM_MODE to "rest", "polling" or "stub" to force a transport.
+stream_complete() records the transport actually used on the returned stream.
+"""
+
+import html
+import json
+import os
+import threading
+import time
+
+STREAM_ENDPOINT = "/api/v2/cortex/inference:complete"
+STREAM_TIMEOUT_SECONDS = 120
+POLL_INTERVAL_SECONDS = 0.1
+STUB_DELAY_SECONDS = 0.03
+
+
+def get_stream_mode():
+    """Return the forced streaming transport, or 'auto'"""
+    return os.environ.get("CORTEX_STREAM_MODE", "auto").lower()
+
+
+def _rest_credentials(conn):
+    """
+    Get the account host and session token needed for the REST API
+    Only available on a regular connector connection
+    """
+    if conn is None or hasattr(conn, 'sql'):
+        return None
+    rest = getattr(conn, 'rest', None)
+    token = getattr(rest, 'token', None) if rest is not None else None
+    host = getattr(conn, 'host', None)
+    if not token or not host:
+        return None
+    return host, token
+
+
+def stream_complete_rest(conn, model, prompt):
+    """Stream COMPLETE output through the Cortex REST interface (server-sent events)"""
+    credentials = _rest_credentials(conn)
+    if credentials is None:
+        raise RuntimeError("Cortex REST streaming needs a connector session token")
+
+    import requests
+
+    host, token = credentials
+    response = requests.post(
+        f"https://{host}{STREAM_ENDPOINT}",
+        headers={
+            "Authorization": f'Snowflake Token="{token}"',
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream"
+        },
+        json={
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": True
+        },
+        stream=True,
+        timeout=STREAM_TIMEOUT_SECONDS
+    )
+    response.raise_for_status()
+
+    try:
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            payload = line[len("data:"):].strip()
+            if payload == "[DONE]":
+                break
+            try:
+                event = json.loads(payload)
+            except ValueError:
+                continue
+            for choice in event.get("choices", []):
+                text = choice.get("delta", {}).get("content") or choice.get("delta", {}).get("text")
+                if text:
+                    yield text
+    finally:
+        response.close()
+
+
+def stream_complete_polling(complete_fn, prompt, piece_words=4):
+    """
+    Chunked polling fallback for sessions without REST access
+    complete_fn(prompt) runs the blocking SQL COMPLETE call in a background thread;
+    the caller is polled until it lands and the text is then yielded in small pieces.
+    """
+    outcome = {}
+
+    def worker():
+        try:
+            outcome["text"] = complete_fn(prompt)
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    while thread.is_alive():
+        thread.join(POLL_INTERVAL_SECONDS)
+
+    if "error" in outcome:
+        raise outcome["error"]
+
+    words = (outcome.get("text") or "").split(" ")
+    for i in range(0, len(words), piece_words):
+        yield " ".join(words[i:i + piece_words]) + (" " if i + piece_words < len(words) else "")
+
+
+def stream_complete_stub(prompt, response_text=None, delay=STUB_DELAY_SECONDS):
+    """Local stub that streams canned text word by word for testing"""
+    if response_text is None:
+        response_text = (
+            "Stub response: schedule a proactive advisor call to review the member's "
+            "concerns, confirm next steps in writing and follow up within 48 hours."
+        )
+    for word in response_text.split(" "):
+        time.sleep(delay)
+        yield word + " "
+
+
+# Transports that surface text while generation is still running
+INCREMENTAL_TRANSPORTS = ("rest", "stub")
+
+
+class CompletionStream:
+    """
+    Iterable of COMPLETE output chunks from the best available transport
+    transport is set to "rest", "polling" or "stub" once iteration has chosen one
+    """
+
+    def __init__(self, conn, model, prompt, complete_fn=None):
+        self.conn = conn
+        self.model = model
+        self.prompt = prompt
+        self.complete_fn = complete_fn
+        self.transport = None
+
+    @property
+    def incremental(self):
+        """Whether chunks arrived while the model was generating (time to first text is meaningful)"""
+        return self.transport in INCREMENTAL_TRANSPORTS
+
+    def __iter__(self):
+        mode = get_stream_mode()
+
+        if mode == "stub":
+            self.transport = "stub"
+            yield from stream_complete_stub(self.prompt)
+            return
+
+        if mode in ("auto", "rest") and _rest_credentials(self.conn) is not None:
+            # Deferred so pages that never stream do not pay for the import
+            import requests
+
+            streamed = False
+            self.transport = "rest"
+            try:
+                for chunk in stream_complete_rest(self.conn, self.model, self.prompt):
+                    streamed = True
+                    yield chunk
+                return
+            except requests.RequestException:
+                # Only fall back if nothing has been shown yet, otherwise text would repeat
+                if mode == "rest" or streamed:
+                    raise
+
+        if self.complete_fn is None:
+            raise RuntimeError("No streaming transport available and no blocking fallback supplied")
+        self.transport = "polling"
+        yield from stream_complete_polling(self.complete_fn, self.prompt)
+
+
+def stream_complete(conn, model, prompt, complete_fn=None):
+    """
+    Stream COMPLETE output using the best available transport
+    Falls back from REST streaming to chunked polling when REST is unavailable;
+    complete_fn is the blocking SQL implementation used by the polling fallback.
+    Returns a CompletionStream; check its transport after iterating.
+    """
+    return CompletionStream(conn, model, prompt, complete_fn)
+
+
+def render_stream(placeholder, chunks, css_class="ai-result"):
+    """
+    Render streamed chunks into a Streamlit placeholder as they arrive
+    Model text is HTML-escaped before it is rendered inside the styled block.
+    Returns the full text and the time to first chunk in seconds
+    """
+    started = time.time()
+    first_chunk_seconds = None
+    text = ""
+    for chunk in chunks:
+        if first_chunk_seconds is None:
+            first_chunk_seconds = time.time() - started
+        text += chunk
+        placeholder.markdown(f'<div class="{css_class}">{html.escape(text)}▌</div>', unsafe_allow_html=True)
+    placeholder.markdown(f'<div class="{css_class}">{html.escape(text)}</div>', unsafe_allow_html=True)
+    return text.strip(), first_chunk_seconds
@@ -0,0 +1,107 @@
+"""
+Import Profile Module for Superannuation Transcripts Demo
+========================================================
+
+Measures module import time with Python's -X importtime so cold-start costs
+can be tracked. Each target is imported in a fresh interpreter, so results
+are not skewed by modules an earlier target already loaded.
+
+Usage:
+    python src/import_profile.py [module ...] [--top N] [--json]
+    streamlit run src/streamlit_main.py -- --profile-imports
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+DEFAULT_TARGETS = [
+    "streamlit",
+    "pandas",
+    "plotly.express",
+    "snowflake.connector",
+    "snowflake.snowpark",
+    "connection_helper",
+    "ai_pipeline"
+]
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def profile_import(module):
+    """
+    Import a module in a fresh interpreter under -X importtime
+    Returns dict with total seconds and per-package cumulative seconds, or an error
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SRC_DIR, os.environ.get("PYTHONPATH")])))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, cwd=SRC_DIR
+    )
+    if completed.returncode != 0:
+        last_line = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "import failed"
+        return {"module": module, "error": last_line}
+
+    packages = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            cumulative_us = int(fields[1])
+        except ValueError:
+            continue  # header row
+        name = fields[2].strip()
+        packages[name] = max(packages.get(name, 0), cumulative_us / 1e6)
+
+    return {
+        "module": module,
+        "total_seconds": packages.get(module, max(packages.values(), default=0.0)),
+        "packages": packages
+    }
+
+
+def build_report(targets, top=10):
+    """Profile every target and keep the slowest packages for each"""
+    report = []
+    for module in targets:
+        result = profile_import(module)
+        if "packages" in result:
+            slowest = sorted(result.pop("packages").items(), key=lambda item: -item[1])[:top]
+            result["slowest"] = [{"package": name, "seconds": round(seconds, 4)} for name, seconds in slowest]
+            result["total_seconds"] = round(result["total_seconds"], 4)
+        report.append(result)
+    return report
+
+
+def print_report(report):
+    """Print the import profile as a readable table"""
+    for result in report:
+        if "error" in result:
+            print(f"{result['module']:<28} not importable ({result['error']})")
+            continue
+        print(f"{result['module']:<28} {result['total_seconds']:>8.3f}s")
+        for entry in result["slowest"][1:]:
+            print(f"    {entry['package']:<40} {entry['seconds']:>8.3f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile import time of the app's modules")
+    parser.add_argument("modules", nargs="*", help="Modules to profile (default: the app's heavy dependencies)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest packages to list per module")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--profile-imports", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    report = build_report(args.modules or DEFAULT_TARGETS, top=args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
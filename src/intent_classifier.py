@@ -0,0 +1,225 @@
+"""
+Intent Classifier Module for Superannuation Transcripts Demo
+============================================================
+
+Tiered intent classification so the large model is only used when cheaper
+tiers are unsure:
+
+1. A local keyword model scores every intent and returns a confidence
+2. SNOWFLAKE.CORTEX.CLASSIFY_TEXT, cross-checked against the keyword ranking
+3. A claude COMPLETE call, only when both tiers fall below the threshold
+
+Escalation metrics are kept per process so the demo can show how many calls
+actually reached the large model.
+"""
+
+import math
+import os
+import re
+import threading
+
+INTENT_OPTIONS = [
+    "Technical Support",
+    "Investment Inquiry",
+    "Complaint",
+    "Churn Risk",
+    "Fee Question",
+    "Retirement Planning"
+]
+
+# Keyword weights per intent for the local tier
+# Keywords match whole words; a trailing * marks a stem that matches any word ending
+INTENT_KEYWORDS = {
+    "Technical Support": {
+        "log in": 2, "login": 2, "password": 2, "website": 1.5, "app": 1, "online": 1,
+        "error": 1.5, "access": 1, "reset": 1.5, "locked": 2, "portal": 1.5
+    },
+    "Investment Inquiry": {
+        "investment": 2, "invest": 1.5, "portfolio": 2, "esg": 2.5, "sustainable": 2,
+        "growth": 1, "balanced": 1, "returns": 1.5, "performance": 1.5, "switch option": 2,
+        "diversif*": 2
+    },
+    "Complaint": {
+        "complaint": 3, "frustrated": 2, "unacceptable": 2.5, "disappointed": 2,
+        "not happy": 2, "never received": 2, "still haven't": 2, "again": 1, "poor service": 2.5
+    },
+    "Churn Risk": {
+        "considering leaving": 3, "leaving": 2, "switching": 2.5, "elsewhere": 2,
+        "another fund": 3, "roll over": 2, "rollover": 2, "close my account": 3, "transfer out": 2.5
+    },
+    "Fee Question": {
+        "fee": 2.5, "fees": 2.5, "charge": 2, "charged": 2, "deduction": 2, "admin fee": 3,
+        "cost": 1.5, "premium": 1
+    },
+    "Retirement Planning": {
+        "retire": 2.5, "retirement": 2.5, "pension": 2.5, "preservation age": 3,
+        "withdraw": 1.5, "drawdown": 2.5, "transition to retirement": 3, "annuity": 2.5
+    }
+}
+
+DEFAULT_CONFIDENCE_THRESHOLD = float(os.environ.get("INTENT_CONFIDENCE_THRESHOLD", "0.6"))
+
+# Softmax temperature for keyword confidence: a single keyword hit (~0.4) stays
+# below the default threshold, while a few agreeing hits clear it
+KEYWORD_TEMPERATURE = float(os.environ.get("INTENT_KEYWORD_TEMPERATURE", "2.0"))
+
+# Confidence assigned to a CLASSIFY_TEXT label by its agreement with the keyword ranking
+# Agreement only counts when the keyword tier found evidence and the compared rank is not tied
+CLASSIFY_AGREES_TOP = 0.9
+CLASSIFY_AGREES_RUNNER_UP = 0.7
+CLASSIFY_UNCORROBORATED = 0.5
+CLASSIFY_DISAGREES = 0.4
+
+_metrics_lock = threading.Lock()
+CASCADE_METRICS = {
+    "total": 0,
+    "resolved_keyword": 0,
+    "resolved_classify": 0,
+    "escalated_llm": 0,
+    "llm_unparsed": 0
+}
+
+
+def _keyword_pattern(keywords):
+    """
+    One regex per intent, one capturing group per keyword
+    Longer keywords are tried first and matches do not overlap, so the words
+    inside a phrase ("considering leaving") are not scored again on their own
+    """
+    ordered = sorted(keywords, key=lambda keyword: -len(keyword.rstrip("*")))
+    alternatives = [
+        f"({re.escape(keyword[:-1])}\\w*)" if keyword.endswith("*") else f"({re.escape(keyword)})"
+        for keyword in ordered
+    ]
+    return re.compile(r"\b(?:" + "|".join(alternatives) + r")\b"), [keywords[keyword] for keyword in ordered]
+
+
+_KEYWORD_PATTERNS = {intent: _keyword_pattern(keywords) for intent, keywords in INTENT_KEYWORDS.items()}
+
+
+def keyword_scores(transcript_text):
+    """Score every intent by weighted whole-word keyword hits in the transcript"""
+    lowered = (transcript_text or "").lower()
+    return {
+        intent: sum(weights[match.lastindex - 1] for match in pattern.finditer(lowered))
+        for intent, (pattern, weights) in _KEYWORD_PATTERNS.items()
+    }
+
+
+def classify_keywords(transcript_text):
+    """
+    Local keyword tier
+    Returns (label, confidence, ranking), with confidence from a softmax over
+    intent scores at KEYWORD_TEMPERATURE
+    """
+    return _rank_keyword_scores(keyword_scores(transcript_text))
+
+
+def _rank_keyword_scores(scores):
+    """(label, confidence, ranking) for precomputed keyword scores (see classify_keywords)"""
+    ranking = sorted(scores, key=lambda intent: -scores[intent])
+    if scores[ranking[0]] == 0:
+        return ranking[0], 0.0, ranking
+
+    exps = {intent: math.exp(score / KEYWORD_TEMPERATURE) for intent, score in scores.items()}
+    total = sum(exps.values())
+    return ranking[0], exps[ranking[0]] / total, ranking
+
+
+def normalize_label(value):
+    """Map a free-text label onto the allowed intents, or None"""
+    if not value:
+        return None
+    cleaned = str(value).strip().strip('."\'').lower()
+    for option in INTENT_OPTIONS:
+        if option.lower() in cleaned:
+            return option
+    return None
+
+
+def classify_text_confidence(classified, scores):
+    """
+    Confidence for a CLASSIFY_TEXT label, from how the keyword scores corroborate it
+    With no keyword evidence, or a tie at the label's rank, the ranking is
+    arbitrary (dict order), so the label gets CLASSIFY_UNCORROBORATED
+    """
+    levels = sorted(set(scores.values()), reverse=True)
+    if levels[0] == 0:
+        return CLASSIFY_UNCORROBORATED
+    score = scores[classified]
+    tied = sum(1 for value in scores.values() if value == score) > 1
+    if score == levels[0]:
+        return CLASSIFY_UNCORROBORATED if tied else CLASSIFY_AGREES_TOP
+    if score > 0 and score == levels[1]:
+        return CLASSIFY_UNCORROBORATED if tied else CLASSIFY_AGREES_RUNNER_UP
+    return CLASSIFY_DISAGREES
+
+
+def _record(tier, unparsed=False):
+    """Increment cascade counters"""
+    with _metrics_lock:
+        CASCADE_METRICS["total"] += 1
+        CASCADE_METRICS[tier] += 1
+        if unparsed:
+            CASCADE_METRICS["llm_unparsed"] += 1
+
+
+def classify_intent(transcript_text, classify_fn=None, llm_fn=None, threshold=None):
+    """
+    Classify a transcript's primary intent with the cheapest confident tier
+    classify_fn(text, labels) should wrap CLASSIFY_TEXT and llm_fn(text) the
+    COMPLETE call; either may be None to skip that tier.
+    Returns dict with label, confidence and the tier that decided it.
+    """
+    if threshold is None:
+        threshold = DEFAULT_CONFIDENCE_THRESHOLD
+
+    scores = keyword_scores(transcript_text)
+    label, confidence, _ = _rank_keyword_scores(scores)
+    if confidence >= threshold:
+        _record("resolved_keyword")
+        return {"label": label, "confidence": confidence, "tier": "keyword"}
+
+    if classify_fn is not None:
+        try:
+            classified = normalize_label(classify_fn(transcript_text, INTENT_OPTIONS))
+        except Exception:
+            classified = None
+        if classified is not None:
+            classify_confidence = classify_text_confidence(classified, scores)
+            if classify_confidence >= threshold:
+                _record("resolved_classify")
+                return {"label": classified, "confidence": classify_confidence, "tier": "classify_text"}
+
+    if llm_fn is not None:
+        llm_label = normalize_label(llm_fn(transcript_text))
+        if llm_label is not None:
+            _record("escalated_llm")
+            return {"label": llm_label, "confidence": 1.0, "tier": "llm"}
+        # The COMPLETE call was still paid for, so it counts as an escalation
+        _record("escalated_llm", unparsed=True)
+        return {"label": label, "confidence": confidence, "tier": "keyword"}
+
+    # Nothing confident available: keep the best cheap guess
+    _record("resolved_keyword")
+    return {"label": label, "confidence": confidence, "tier": "keyword"}
+
+
+def classify_intents(transcripts, classify_fn=None, llm_fn=None, threshold=None):
+    """Classify a batch of transcripts, e.g. for bulk enrichment"""
+    return [classify_intent(text, classify_fn, llm_fn, threshold) for text in transcripts]
+
+
+def get_cascade_metrics():
+    """Return a snapshot of cascade counters with the escalation rate"""
+    with _metrics_lock:
+        metrics = dict(CASCADE_METRICS)
+    metrics["escalation_rate"] = metrics["escalated_llm"] / metrics["total"] if metrics["total"] else 0.0
+    return metrics
+
+
+def reset_cascade_metrics():
+    """Zero the cascade counters"""
+    with _metrics_lock:
+        for key in CASCADE_METRICS:
+            CASCADE_METRICS[key] = 0
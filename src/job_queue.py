@@ -0,0 +1,284 @@
+"""
+Job Queue Module for Superannuation Transcripts Demo
+====================================================
+
+Background job queue so long AI processing runs outside the Streamlit script
+thread. Jobs are stored in a local SQLite table, so a job ID stays valid across
+reruns, reconnects and page refreshes:
+
+- submit() records the job and returns its ID straight away
+- A dispatcher thread hands queued jobs to a small worker pool
+- Handlers report progress and partial results, which pages poll with get()
+- Dispatch is fair across owners (advisors): the owner with the fewest running
+  jobs goes first and no owner may hold more than a fixed share of workers
+
+Running jobs carry the ID of the process that holds them and a heartbeat it
+refreshes; jobs whose holder stopped heartbeating (e.g. a restarted process)
+are re-queued.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+DEFAULT_DB_PATH = os.environ.get(
+    "AI_JOB_DB_PATH",
+    os.path.join(os.path.expanduser("~"), ".superannuation_demo", "ai_jobs.db")
+)
+DEFAULT_WORKERS = int(os.environ.get("AI_JOB_WORKERS", "4"))
+DEFAULT_MAX_PER_OWNER = int(os.environ.get("AI_JOB_MAX_PER_OWNER", "2"))
+DISPATCH_INTERVAL_SECONDS = 0.5
+HEARTBEAT_INTERVAL_SECONDS = 5
+# A running job whose holder has not heartbeated for this long is re-queued
+HEARTBEAT_TIMEOUT_SECONDS = float(os.environ.get("AI_JOB_HEARTBEAT_TIMEOUT", "60"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED_STATES = (SUCCEEDED, FAILED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    progress TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    worker TEXT,
+    heartbeat_at REAL
+)
+"""
+
+
+class JobQueue:
+    """SQLite-backed job table with a fair, bounded worker pool"""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, workers=DEFAULT_WORKERS, max_per_owner=DEFAULT_MAX_PER_OWNER):
+        self.db_path = db_path
+        self.workers = workers
+        self.max_per_owner = max_per_owner
+        self._handlers = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._running = {}  # job_id -> owner, for jobs held by this process
+        self._worker_id = uuid.uuid4().hex
+        self._last_heartbeat = 0.0
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai-job")
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._transaction() as db:
+            db.execute(SCHEMA)
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            columns = {row["name"] for row in db.execute("PRAGMA table_info(jobs)")}
+            for column, column_type in (("worker", "TEXT"), ("heartbeat_at", "REAL")):
+                if column not in columns:
+                    db.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+        self._reclaim_expired()
+
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="ai-job-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=30)
+        db.row_factory = sqlite3.Row
+        return db
+
+    @contextmanager
+    def _transaction(self):
+        """Connection that commits (or rolls back) and is closed when the block ends"""
+        db = self._connect()
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def _reclaim_expired(self):
+        """Re-queue running jobs whose holding process stopped heartbeating"""
+        cutoff = time.time() - HEARTBEAT_TIMEOUT_SECONDS
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL, worker = NULL, heartbeat_at = NULL "
+                "WHERE status = ? AND COALESCE(heartbeat_at, started_at, 0) < ?",
+                (QUEUED, RUNNING, cutoff)
+            )
+
+    def _heartbeat(self):
+        """Refresh the heartbeat of jobs held by this process and reclaim expired ones"""
+        now = time.time()
+        if now - self._last_heartbeat < HEARTBEAT_INTERVAL_SECONDS:
+            return
+        self._last_heartbeat = now
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE worker = ? AND status = ?",
+                (now, self._worker_id, RUNNING)
+            )
+        self._reclaim_expired()
+
+    def register_handler(self, kind, fn):
+        """
+        Register the handler for a job kind
+        fn(payload, report) returns a JSON-serialisable result; report(progress) may
+        be called with a JSON-serialisable progress dict while the job runs.
+        """
+        self._handlers[kind] = fn
+        self._wakeup.set()
+
+    def submit(self, kind, payload, owner="default"):
+        """Queue a job and return its ID"""
+        job_id = uuid.uuid4().hex
+        with self._transaction() as db:
+            db.execute(
+                "INSERT INTO jobs (job_id, owner, kind, status, payload, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, owner, kind, QUEUED, json.dumps(payload), time.time())
+            )
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id):
+        """Return a job as a dict (payload, progress and result decoded), or None"""
+        with self._transaction() as db:
+            row = db.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._decode(row) if row is not None else None
+
+    def list_jobs(self, owner=None, limit=20):
+        """Return the most recent jobs, optionally for one owner"""
+        query = "SELECT * FROM jobs"
+        params = ()
+        if owner is not None:
+            query += " WHERE owner = ?"
+            params = (owner,)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        with self._transaction() as db:
+            rows = db.execute(query, params + (limit,)).fetchall()
+        return [self._decode(row) for row in rows]
+
+    def queue_position(self, job_id):
+        """Number of queued jobs ahead of this one, or None if it is not queued"""
+        with self._transaction() as db:
+            row = db.execute("SELECT status, created_at FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None or row["status"] != QUEUED:
+                return None
+            return db.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ? AND created_at < ?",
+                (QUEUED, row["created_at"])
+            ).fetchone()[0]
+
+    @staticmethod
+    def _decode(row):
+        job = dict(row)
+        for field in ("payload", "progress", "result"):
+            if job[field] is not None:
+                job[field] = json.loads(job[field])
+        return job
+
+    def _next_job(self):
+        """
+        Pick the next queued job fairly
+        Owners with fewer running jobs go first; within an owner, oldest first
+        """
+        running_by_owner = {}
+        for owner in self._running.values():
+            running_by_owner[owner] = running_by_owner.get(owner, 0) + 1
+
+        with self._transaction() as db:
+            rows = db.execute(
+                "SELECT job_id, owner, kind FROM jobs WHERE status = ? ORDER BY created_at",
+                (QUEUED,)
+            ).fetchall()
+
+        best = None
+        for row in rows:
+            if row["kind"] not in self._handlers:
+                continue
+            load = running_by_owner.get(row["owner"], 0)
+            if load >= self.max_per_owner:
+                continue
+            if best is None or load < running_by_owner.get(best["owner"], 0):
+                best = row
+        return best
+
+    def _dispatch_loop(self):
+        while True:
+            self._wakeup.wait(DISPATCH_INTERVAL_SECONDS)
+            self._wakeup.clear()
+            try:
+                self._heartbeat()
+                self._dispatch()
+            except sqlite3.Error:
+                # Locked or briefly unavailable database; retry on the next tick
+                continue
+
+    def _dispatch(self):
+        with self._lock:
+            while len(self._running) < self.workers:
+                row = self._next_job()
+                if row is None:
+                    return
+                now = time.time()
+                with self._transaction() as db:
+                    claimed = db.execute(
+                        "UPDATE jobs SET status = ?, started_at = ?, worker = ?, heartbeat_at = ? "
+                        "WHERE job_id = ? AND status = ?",
+                        (RUNNING, now, self._worker_id, now, row["job_id"], QUEUED)
+                    ).rowcount
+                if not claimed:
+                    continue
+                self._running[row["job_id"]] = row["owner"]
+                self._pool.submit(self._run, row["job_id"], row["kind"])
+
+    def _run(self, job_id, kind):
+        def report(progress):
+            with self._transaction() as db:
+                db.execute(
+                    "UPDATE jobs SET progress = ? WHERE job_id = ? AND worker = ?",
+                    (json.dumps(progress), job_id, self._worker_id)
+                )
+
+        try:
+            job = self.get(job_id)
+            result = self._handlers[kind](job["payload"], report)
+            # Only while still held: a reclaimed job belongs to whoever picked it up again
+            with self._transaction() as db:
+                db.execute(
+                    "UPDATE jobs SET status = ?, result = ?, finished_at = ? WHERE job_id = ? AND worker = ?",
+                    (SUCCEEDED, json.dumps(result), time.time(), job_id, self._worker_id)
+                )
+        except Exception as e:
+            with self._transaction() as db:
+                db.execute(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE job_id = ? AND worker = ?",
+                    (FAILED, str(e), time.time(), job_id, self._worker_id)
+                )
+        finally:
+            with self._lock:
+                self._running.pop(job_id, None)
+            self._wakeup.set()
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Return the process-wide job queue, creating it on first use"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
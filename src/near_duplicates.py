@@ -0,0 +1,361 @@
+"""
+Near-duplicate Module for Superannuation Transcripts Demo
+=========================================================
+
+MinHash/LSH index over transcript shingles, so AI results can be reused for
+near-identical calls (scripted IVR prefaces, repeated balance inquiries)
+instead of paying for SENTIMENT, SUMMARIZE and COMPLETE again:
+
+- Each transcript is reduced to word shingles and a MinHash signature
+- Signatures are split into LSH bands; only transcripts sharing a band bucket
+  are compared, and a candidate matches when its estimated Jaccard similarity
+  reaches the threshold
+- Signatures and reusable results live in a local SQLite file keyed by
+  transcript content, so the loader can add transcripts as they arrive and the
+  page and background jobs share what has already been processed
+- Results are stored with the fingerprint of the settings that produced them
+  (model, prompt version, pipeline options) and only reused on an exact match
+
+Reuse metrics are kept per process so the demo can show the reuse rate
+alongside the threshold.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+import numpy as np
+
+DEFAULT_DB_PATH = os.environ.get(
+    "NEAR_DUP_DB_PATH",
+    os.path.join(os.path.expanduser("~"), ".superannuation_demo", "near_duplicates.db")
+)
+DEFAULT_SIMILARITY_THRESHOLD = float(os.environ.get("NEAR_DUP_THRESHOLD", "0.8"))
+# Lowest threshold a lookup may ask for; the LSH bands are sized for it so
+# candidates are still found when the per-call threshold is lowered
+MIN_SIMILARITY_THRESHOLD = min(float(os.environ.get("NEAR_DUP_MIN_THRESHOLD", "0.5")), DEFAULT_SIMILARITY_THRESHOLD)
+
+NUM_PERM = 128
+SHINGLE_WORDS = 3
+# Bands are chosen so a pair exactly at the threshold becomes a candidate at least this often
+MIN_CANDIDATE_PROBABILITY = 0.95
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+WRITE_BATCH = 1000
+
+# Fixed seed: signatures must be comparable across processes and runs
+_rng = np.random.RandomState(20240601)
+_PERM_A = _rng.randint(1, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 31, size=NUM_PERM, dtype=np.uint64)
+
+_WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signatures (
+    doc_key TEXT PRIMARY KEY,
+    call_id TEXT,
+    signature BLOB NOT NULL,
+    results TEXT,
+    results_fingerprint TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL
+);
+CREATE TABLE IF NOT EXISTS buckets (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    doc_key TEXT NOT NULL,
+    PRIMARY KEY (band, bucket, doc_key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def transcript_words(text):
+    """Lower-cased word tokens; punctuation and spacing differences are ignored"""
+    return _WORD_PATTERN.findall((text or "").lower())
+
+
+def document_key(text):
+    """Content key for a transcript (identical after normalisation -> identical key)"""
+    return hashlib.sha1(" ".join(transcript_words(text)).encode("utf-8")).hexdigest()
+
+
+def shingles(text, size=SHINGLE_WORDS):
+    """Set of overlapping word n-grams; a short call is a single shingle"""
+    words = transcript_words(text)
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash_signature(text):
+    """NUM_PERM-value MinHash signature (uint32 array), or None for an empty transcript"""
+    values = shingles(text)
+    if not values:
+        return None
+    hashes = np.fromiter((zlib.crc32(value.encode("utf-8")) for value in values), dtype=np.uint64, count=len(values))
+    # (a * h + b) mod p cannot overflow: a, b < 2^31 and h < 2^32
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % MERSENNE_PRIME & MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def estimated_similarity(signature, other):
+    """Estimated Jaccard similarity: the share of MinHash values two signatures agree on"""
+    return float(np.count_nonzero(signature == other)) / len(signature)
+
+
+def lsh_parameters(threshold, num_perm=NUM_PERM):
+    """
+    Return (bands, rows) for the threshold
+    The most rows per band (fewest false candidates) for which a pair at the
+    threshold still shares a bucket with MIN_CANDIDATE_PROBABILITY.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if 1 - (1 - threshold ** rows) ** bands >= MIN_CANDIDATE_PROBABILITY:
+            best = (bands, rows)
+    return best
+
+
+def signature_rows(transcripts):
+    """
+    (doc_key, call_id, signature bytes) for each (call_id, text) pair
+    Empty transcripts are skipped. Kept separate from the index so signatures can
+    be computed in loader worker processes.
+    """
+    rows = []
+    for call_id, text in transcripts:
+        signature = minhash_signature(text)
+        if signature is not None:
+            rows.append((document_key(text), call_id, signature.tobytes()))
+    return rows
+
+
+class NearDuplicateIndex:
+    """
+    Persisted MinHash signatures with LSH buckets and the AI results recorded for them
+    Bands are sized for min_threshold, so any lookup threshold at or above it keeps
+    MIN_CANDIDATE_PROBABILITY; candidates are then filtered by the lookup threshold.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, threshold=DEFAULT_SIMILARITY_THRESHOLD,
+                 min_threshold=MIN_SIMILARITY_THRESHOLD):
+        self.db_path = db_path
+        self.threshold = threshold
+        self.min_threshold = min(min_threshold, threshold)
+        self.bands, self.rows = lsh_parameters(self.min_threshold)
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(signatures)")}
+        if "results_fingerprint" not in columns:
+            # Results recorded before fingerprints existed are never reused
+            self.db.execute("ALTER TABLE signatures ADD COLUMN results_fingerprint TEXT")
+        self._check_bands()
+
+    def _check_bands(self):
+        """Re-bucket the stored signatures when the band layout changed with the minimum threshold"""
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'lsh'").fetchone()
+        layout = f"{self.bands}x{self.rows}"
+        if row is not None and row[0] == layout:
+            return
+        with self.db:
+            self.db.execute("DELETE FROM buckets")
+            cursor = self.db.execute("SELECT doc_key, signature FROM signatures")
+            while True:
+                batch = cursor.fetchmany(WRITE_BATCH)
+                if not batch:
+                    break
+                self.db.executemany(
+                    "INSERT OR IGNORE INTO buckets (band, bucket, doc_key) VALUES (?, ?, ?)",
+                    [entry for doc_key, signature in batch for entry in self._bucket_rows(doc_key, signature)]
+                )
+            self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('lsh', ?)", (layout,))
+
+    def _band_buckets(self, signature):
+        """One 64-bit bucket hash per band"""
+        signature = np.frombuffer(signature, dtype=np.uint32) if isinstance(signature, bytes) else signature
+        buckets = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            buckets.append(int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), "little", signed=True))
+        return buckets
+
+    def _bucket_rows(self, doc_key, signature):
+        return [(band, bucket, doc_key) for band, bucket in enumerate(self._band_buckets(signature))]
+
+    def __len__(self):
+        with self._lock:
+            return self.db.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+
+    def add_signatures(self, rows):
+        """Index (doc_key, call_id, signature bytes) rows; returns how many were new"""
+        added = 0
+        now = time.time()
+        rows = list(rows)
+        with self._lock, self.db:
+            for i in range(0, len(rows), WRITE_BATCH):
+                batch = rows[i:i + WRITE_BATCH]
+                before = self.db.total_changes
+                self.db.executemany(
+                    "INSERT OR IGNORE INTO signatures (doc_key, call_id, signature, created_at) VALUES (?, ?, ?, ?)",
+                    [(doc_key, call_id, signature, now) for doc_key, call_id, signature in batch]
+                )
+                added += self.db.total_changes - before
+                self.db.executemany(
+                    "INSERT OR IGNORE INTO buckets (band, bucket, doc_key) VALUES (?, ?, ?)",
+                    [entry for doc_key, _, signature in batch for entry in self._bucket_rows(doc_key, signature)]
+                )
+        return added
+
+    def add(self, transcripts):
+        """Index (call_id, text) pairs as they are loaded; returns how many were new"""
+        return self.add_signatures(signature_rows(transcripts))
+
+    def find(self, text, threshold=None, with_results=True, fingerprint=None):
+        """
+        Return the most similar indexed transcript at or above the threshold, or None
+        With with_results, only transcripts whose AI results were recorded count,
+        and with a fingerprint only results recorded under that same fingerprint.
+        Thresholds below min_threshold may miss candidates. The match is a dict with doc_key, call_id, similarity and results.
+        """
+        threshold = self.threshold if threshold is None else threshold
+        signature = minhash_signature(text)
+        if signature is None:
+            return None
+        doc_key = document_key(text)
+        buckets = self._band_buckets(signature)
+        results_filter = "AND s.results IS NOT NULL" if with_results else ""
+        filter_params = []
+        if with_results and fingerprint is not None:
+            results_filter += " AND s.results_fingerprint = ?"
+            filter_params.append(fingerprint)
+
+        with self._lock:
+            candidates = self.db.execute(
+                f"""
+                SELECT DISTINCT s.doc_key, s.call_id, s.signature, s.results
+                FROM buckets b JOIN signatures s ON s.doc_key = b.doc_key
+                WHERE ({' OR '.join('(b.band = ? AND b.bucket = ?)' for _ in buckets)}) {results_filter}
+                """,
+                [value for band, bucket in enumerate(buckets) for value in (band, bucket)] + filter_params
+            ).fetchall()
+
+        best = None
+        for candidate_key, call_id, candidate_signature, results in candidates:
+            if candidate_key == doc_key:
+                similarity = 1.0
+            else:
+                similarity = estimated_similarity(signature, np.frombuffer(candidate_signature, dtype=np.uint32))
+            if similarity >= threshold and (best is None or similarity > best["similarity"]):
+                best = {
+                    "doc_key": candidate_key,
+                    "call_id": call_id,
+                    "similarity": similarity,
+                    "results": json.loads(results) if results is not None else None
+                }
+        return best
+
+    def record_results(self, text, results, call_id=None, fingerprint=None):
+        """
+        Store AI results for a transcript (indexing it first if needed)
+        fingerprint identifies the settings that produced them (see find)
+        """
+        rows = signature_rows([(call_id, text)])
+        if not rows:
+            return
+        self.add_signatures(rows)
+        with self._lock, self.db:
+            self.db.execute(
+                "UPDATE signatures SET results = ?, results_fingerprint = ?, updated_at = ?, "
+                "call_id = COALESCE(call_id, ?) WHERE doc_key = ?",
+                (json.dumps(results), fingerprint, time.time(), call_id, rows[0][0])
+            )
+
+    def stats(self):
+        """Indexed transcripts, how many have reusable results, and the LSH layout"""
+        with self._lock:
+            indexed, with_results = self.db.execute(
+                "SELECT COUNT(*), COUNT(results) FROM signatures"
+            ).fetchone()
+        return {
+            "indexed": indexed,
+            "with_results": with_results,
+            "threshold": self.threshold,
+            "min_threshold": self.min_threshold,
+            "bands": self.bands,
+            "rows_per_band": self.rows
+        }
+
+    def close(self):
+        with self._lock:
+            self.db.close()
+
+
+_metrics_lock = threading.Lock()
+REUSE_METRICS = {
+    "lookups": 0,
+    "reused": 0,
+    "similarity_total": 0.0
+}
+
+
+def reuse_results(index, text, threshold=None, fingerprint=None):
+    """
+    Results recorded for a near-duplicate of text under the same fingerprint, or None
+    Reused results are marked with the source call and similarity; every
+    lookup is counted towards the reuse rate.
+    """
+    match = index.find(text, threshold, fingerprint=fingerprint)
+    with _metrics_lock:
+        REUSE_METRICS["lookups"] += 1
+        if match is not None:
+            REUSE_METRICS["reused"] += 1
+            REUSE_METRICS["similarity_total"] += match["similarity"]
+    if match is None:
+        return None
+    return dict(
+        match["results"],
+        reused_from=match["call_id"] or match["doc_key"][:12],
+        reuse_similarity=round(match["similarity"], 3)
+    )
+
+
+def get_reuse_metrics():
+    """Return a snapshot of reuse counters with the reuse rate and threshold"""
+    with _metrics_lock:
+        metrics = dict(REUSE_METRICS)
+    similarity_total = metrics.pop("similarity_total")
+    metrics["reuse_rate"] = metrics["reused"] / metrics["lookups"] if metrics["lookups"] else 0.0
+    metrics["average_similarity"] = similarity_total / metrics["reused"] if metrics["reused"] else None
+    metrics["threshold"] = _index.threshold if _index is not None else DEFAULT_SIMILARITY_THRESHOLD
+    return metrics
+
+
+def reset_reuse_metrics():
+    """Zero the reuse counters"""
+    with _metrics_lock:
+        REUSE_METRICS.update(lookups=0, reused=0, similarity_total=0.0)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_near_duplicate_index():
+    """Return the process-wide near-duplicate index, opening it on first use"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = NearDuplicateIndex()
+        return _index
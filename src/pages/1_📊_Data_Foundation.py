@@ -8,7 +8,8 @@ from datetime import datetime, timedelta
 # Add the src directory to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from connection_helper import get_snowflake_connection, execute_query, safe_execute_query
+from connection_helper import get_snowflake_connection, execute_query, execute_analytics_query, safe_execute_query
+from transcript_corpus import get_transcript_corpus
 
 # Set page config
 st.set_page_config(
@@ -113,7 +114,7 @@ def load_data_metrics_v2():
         FROM SUPERANNUATION.TRANSCRIPTS.RAW_CALL_TRANSCRIPTS
         """
         
-        customer_metrics = execute_query(customer_query, conn)
+        customer_metrics = execute_analytics_query(customer_query, conn)
         transcript_metrics = execute_query(transcript_query, conn)
         
         # Convert column names to lowercase (Snowflake returns uppercase)
@@ -214,7 +215,7 @@ def load_customer_data():
         ORDER BY ACCOUNT_BALANCE DESC
         LIMIT 20
         """
-        return execute_query(query, conn)
+        return execute_analytics_query(query, conn)
     except Exception as e:
         # Fallback data
         return pd.DataFrame({
@@ -280,8 +281,26 @@ st.header("📞 Call Transcript Data")
 
 @st.cache_data(ttl=300) 
 def load_transcript_samples():
-    """Load sample call transcripts"""
+    """Load sample call transcripts (text previews come from the local corpus when it is synced)"""
     try:
+        corpus = get_transcript_corpus()
+        if corpus is not None and len(corpus):
+            samples = execute_query("""
+            SELECT 
+                CALL_ID,
+                CUSTOMER_ID,
+                CALL_TIMESTAMP,
+                CALL_DURATION_SECONDS
+            FROM SUPERANNUATION.TRANSCRIPTS.RAW_CALL_TRANSCRIPTS
+            ORDER BY CALL_TIMESTAMP DESC
+            LIMIT 10
+            """, conn)
+            texts = corpus.get_many(samples['CALL_ID'])
+            if len(texts) == len(samples):
+                samples['TRANSCRIPT_PREVIEW'] = samples['CALL_ID'].map(lambda call_id: texts[call_id][:200])
+                samples['TRANSCRIPT_LENGTH'] = samples['CALL_ID'].map(lambda call_id: len(texts[call_id]))
+                return samples
+        
         query = """
         SELECT 
             CALL_ID,
@@ -4,12 +4,22 @@ import os
 import pandas as pd
 import time
 import json
+import uuid
 from datetime import datetime
 
 # Add the src directory to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from connection_helper import get_snowflake_connection, execute_query, safe_execute_query
+from cortex_stream import stream_complete, render_stream
+from ai_executor import get_limiter, get_breaker, get_hedge_stats, CircuitOpen
+from ai_pipeline import run_pipeline, fallback_results, CortexUnavailable, COMPLETE_MODEL
+from intent_classifier import get_cascade_metrics, DEFAULT_CONFIDENCE_THRESHOLD
+from job_queue import get_job_queue, FINISHED_STATES
+from near_duplicates import (
+    get_reuse_metrics, get_near_duplicate_index, DEFAULT_SIMILARITY_THRESHOLD, MIN_SIMILARITY_THRESHOLD
+)
+from transcript_corpus import get_transcript_corpus
 
 # Set page config
 st.set_page_config(
@@ -99,206 +109,231 @@ if 'current_transcript' not in st.session_state:
 
 if 'processing_stage' not in st.session_state:
     st.session_state.processing_stage = 0
+if 'stream_first_text' not in st.session_state:
+    st.session_state.stream_first_text = {}
+if 'stream_transports' not in st.session_state:
+    st.session_state.stream_transports = {}
+if 'ai_result_cache' not in st.session_state:
+    st.session_state.ai_result_cache = {}
+
+# Streaming mode surfaces COMPLETE output as it is generated
+st.sidebar.toggle(
+    "Stream AI responses",
+    key="stream_ai_output",
+    help="Show insights, NBA and reasoning text as it is generated instead of waiting for each full response"
+)
+st.sidebar.toggle(
+    "Consolidated AI call",
+    key="consolidated_ai_call",
+    help="Request intent, insights, NBA and reasoning as one JSON object from a single COMPLETE call"
+)
+st.sidebar.slider(
+    "Intent escalation threshold",
+    min_value=0.0,
+    max_value=1.0,
+    value=DEFAULT_CONFIDENCE_THRESHOLD,
+    step=0.05,
+    key="intent_threshold",
+    help="Keyword and CLASSIFY_TEXT results below this confidence are escalated to claude"
+)
+st.sidebar.toggle(
+    "Hedge slow AI calls",
+    key="hedge_ai_calls",
+    help="Issue a duplicate request when a Cortex call runs past the observed p95 latency; the first response wins"
+)
+st.sidebar.toggle(
+    "Reuse near-duplicate results",
+    value=True,
+    key="reuse_near_duplicates",
+    help="Skip the AI calls when a transcript is a near-duplicate (MinHash/LSH) of one already processed"
+)
+st.sidebar.slider(
+    "Near-duplicate similarity threshold",
+    min_value=MIN_SIMILARITY_THRESHOLD,
+    max_value=1.0,
+    value=DEFAULT_SIMILARITY_THRESHOLD,
+    step=0.01,
+    key="similarity_threshold",
+    help="Estimated Jaccard similarity of word shingles required to reuse another call's results"
+)
+
+# Shared AI executor state (concurrency budget is shared with batch jobs in this process)
+with st.sidebar.expander("AI diagnostics"):
+    limiter_state = get_limiter().snapshot()
+    st.markdown(f"**Concurrency limit:** {limiter_state['limit']} ({limiter_state['in_flight']} in flight, {limiter_state['queued']} queued)")
+    st.markdown(f"**Completed:** {limiter_state['completed']} | **Errors:** {limiter_state['errors']} | **Retries:** {limiter_state['retries']}")
+    st.markdown(f"**Throttled:** {limiter_state['throttled']} | **Slow:** {limiter_state['slow']} | **Deadline exceeded:** {limiter_state['deadline_exceeded']}")
+    breaker_state = get_breaker().snapshot()
+    breaker_icon = {"closed": "🟢", "half_open": "🟡", "open": "🔴"}[breaker_state['state']]
+    p95_text = f"{breaker_state['p95_latency']:.1f}s" if breaker_state['p95_latency'] is not None else "n/a"
+    st.markdown(f"**Circuit breaker:** {breaker_icon} {breaker_state['state']} (error rate {breaker_state['error_rate']:.0%}, p95 {p95_text})")
+    st.markdown(f"**Breaker trips:** {breaker_state['open_count']} | **Calls short-circuited:** {breaker_state['rejected']}")
+    hedge_stats = get_hedge_stats()
+    st.markdown(f"**Hedged calls:** {hedge_stats['hedged']} | **Hedge wins:** {hedge_stats['hedge_wins']}")
+    reuse = get_reuse_metrics()
+    index_stats = get_near_duplicate_index().stats()
+    st.markdown(f"**Near-duplicate reuse:** {reuse['reuse_rate']:.0%} of {reuse['lookups']} lookups (threshold {st.session_state.similarity_threshold:.2f})")
+    st.markdown(f"**Indexed transcripts:** {index_stats['indexed']:,} ({index_stats['with_results']:,} with reusable results)")
 
 # Default transcript for demo
 DEFAULT_TRANSCRIPT = ""
 
+# Background jobs poll for progress at this interval
+JOB_POLL_SECONDS = 2
+
+def pipeline_options(interactive=True):
+    """Collect pipeline options from the sidebar controls"""
+    return {
+        "consolidated": bool(st.session_state.get('consolidated_ai_call')),
+        "hedge": bool(st.session_state.get('hedge_ai_calls')),
+        "intent_threshold": st.session_state.get('intent_threshold', DEFAULT_CONFIDENCE_THRESHOLD),
+        "reuse_near_duplicates": bool(st.session_state.get('reuse_near_duplicates', True)),
+        "similarity_threshold": st.session_state.get('similarity_threshold', DEFAULT_SIMILARITY_THRESHOLD),
+        "interactive": interactive
+    }
+
+def run_complete_stage(prompt, title, complete_fn):
+    """
+    Run a COMPLETE-backed stage, streaming partial output to the page when enabled
+    The transport is recorded per stage, and time to first text only for transports
+    that really stream (polling replays the finished response)
+    """
+    if not st.session_state.get('stream_ai_output'):
+        return complete_fn(prompt)
+    
+    st.markdown(f"**{title}**")
+    placeholder = st.empty()
+    stream = stream_complete(conn, COMPLETE_MODEL, prompt, complete_fn=complete_fn)
+    text, first_chunk_seconds = render_stream(placeholder, stream)
+    st.session_state.stream_transports[title] = stream.transport
+    if first_chunk_seconds is not None and stream.incremental:
+        st.session_state.stream_first_text[title] = first_chunk_seconds
+    return text
+
+def render_pipeline_progress(stages, active_index):
+    """Render the pipeline steps with everything before active_index marked complete"""
+    for i, (icon, label) in enumerate(stages):
+        if i < active_index:
+            st.markdown(f'<div class="pipeline-step completed">{i + 1}. ✅ {label} - Complete</div>', unsafe_allow_html=True)
+        elif i == active_index:
+            st.markdown(f'<div class="pipeline-step active">{i + 1}. {icon} {label} - Processing...</div>', unsafe_allow_html=True)
+
+def cached_or_fallback_results(transcript_text):
+    """Last good AI results for this transcript if cached, otherwise the keyword fallback"""
+    cached = st.session_state.ai_result_cache.get(hash(transcript_text))
+    if cached is not None:
+        return dict(cached, served_from='cache')
+    return dict(fallback_results(transcript_text), served_from='fallback')
+
+# Background processing: the pipeline runs on the shared job queue at batch priority
+def process_transcript_job(payload, report):
+    """Job handler: run the pipeline headless, reporting each stage as it starts"""
+    def on_progress(active_index, stages, partial_results):
+        report({'active_index': active_index, 'stages': stages, 'partial_results': dict(partial_results)})
+    
+    try:
+        return run_pipeline(conn, payload['transcript'], payload['options'], on_progress=on_progress)
+    except (CircuitOpen, CortexUnavailable):
+        return dict(fallback_results(payload['transcript']), served_from='fallback')
+
+def background_job_queue():
+    """
+    Shared job queue with the pipeline handler registered
+    Created on first use only, so the page needs no local job database unless
+    background processing is switched on
+    """
+    job_queue = get_job_queue()
+    job_queue.register_handler("ai_processing", process_transcript_job)
+    return job_queue
+
+# Advisor identity for fair scheduling; kept in the URL so it survives reconnects
+if 'job_owner' not in st.session_state:
+    st.session_state.job_owner = st.query_params.get("owner") or uuid.uuid4().hex[:12]
+st.query_params["owner"] = st.session_state.job_owner
+if 'active_job_id' not in st.session_state:
+    st.session_state.active_job_id = st.query_params.get("job")
+
 # Predefined AI processing functions
 def process_transcript_with_ai(transcript_text, customer_id):
     """Process transcript with Snowflake Cortex AI functions"""
     try:
-        # Create progress placeholder
         progress_placeholder = st.empty()
-        results_placeholder = st.empty()
-        
-        results = {}
-        
-        # Step 1: Sentiment Analysis
-        with progress_placeholder.container():
-            st.markdown('<div class="pipeline-step active">1. 🤖 AI Sentiment Analysis - Processing...</div>', unsafe_allow_html=True)
-        
-        sentiment_query = f"""
-        SELECT 
-            SNOWFLAKE.CORTEX.SENTIMENT('{transcript_text.replace("'", "''")}') as sentiment_score,
-            CASE 
-                WHEN SNOWFLAKE.CORTEX.SENTIMENT('{transcript_text.replace("'", "''")}') >= 0.3 THEN 'Positive'
-                WHEN SNOWFLAKE.CORTEX.SENTIMENT('{transcript_text.replace("'", "''")}') <= -0.3 THEN 'Negative'
-                ELSE 'Neutral'
-            END as sentiment_label
-        """
-        
-        sentiment_result = execute_query(sentiment_query, conn)
-        if not sentiment_result.empty:
-            results['sentiment_score'] = sentiment_result.iloc[0]['SENTIMENT_SCORE']
-            results['sentiment_label'] = sentiment_result.iloc[0]['SENTIMENT_LABEL']
-        
-        with progress_placeholder.container():
-            st.markdown('<div class="pipeline-step completed">1. ✅ AI Sentiment Analysis - Complete</div>', unsafe_allow_html=True)
-            st.markdown('<div class="pipeline-step active">2. 🎯 AI Intent Detection - Processing...</div>', unsafe_allow_html=True)
-        
-        time.sleep(0.5)  # Brief pause for demo effect
-        
-        # Step 2: Intent Detection using AI_COMPLETE
-        intent_query = f"""
-        SELECT 
-            SNOWFLAKE.CORTEX.COMPLETE(
-                'claude-3-5-sonnet',
-                'Analyze this customer service call transcript and classify the primary intent. Choose from: Technical Support, Investment Inquiry, Complaint, Churn Risk, Fee Question, Retirement Planning. Return only the classification: {transcript_text.replace("'", "''")}'
-            ) as primary_intent
-        """
-        
-        intent_result = execute_query(intent_query, conn)
-        if not intent_result.empty:
-            results['primary_intent'] = intent_result.iloc[0]['PRIMARY_INTENT'].strip()
-        
-        with progress_placeholder.container():
-            st.markdown('<div class="pipeline-step completed">1. ✅ AI Sentiment Analysis - Complete</div>', unsafe_allow_html=True)
-            st.markdown('<div class="pipeline-step completed">2. ✅ AI Intent Detection - Complete</div>', unsafe_allow_html=True)
-            st.markdown('<div class="pipeline-step active">3. 📝 AI Call Summarization - Processing...</div>', unsafe_allow_html=True)
-        
-        time.sleep(0.5)
-        
-        # Step 3: Call Summarization using SNOWFLAKE.CORTEX.SUMMARIZE()
-        summary_query = f"""
-        SELECT 
-            SNOWFLAKE.CORTEX.SUMMARIZE('{transcript_text.replace("'", "''")}') as call_summary
-        """
-        
-        summary_result = execute_query(summary_query, conn)
-        if not summary_result.empty:
-            results['call_summary'] = summary_result.iloc[0]['CALL_SUMMARY'].strip()
-        
-        with progress_placeholder.container():
-            st.markdown('<div class="pipeline-step completed">1. ✅ AI Sentiment Analysis - Complete</div>', unsafe_allow_html=True)
-            st.markdown('<div class="pipeline-step completed">2. ✅ AI Intent Detection - Complete</div>', unsafe_allow_html=True)
-            st.markdown('<div class="pipeline-step completed">3. ✅ AI Call Summarization - Complete</div>', unsafe_allow_html=True)
-            st.markdown('<div class="pipeline-step active">4. 📈 ML Churn Prediction - Processing...</div>', unsafe_allow_html=True)
-        
-        time.sleep(0.5)
-        
-        # Step 4: ML Churn Prediction (simplified demo version)
-        churn_features = {
-            'sentiment_score': results.get('sentiment_score', 0),
-            'has_complaint': 1 if 'complaint' in results.get('primary_intent', '').lower() or 'churn' in results.get('primary_intent', '').lower() else 0,
-            'negative_language': 1 if any(word in transcript_text.lower() for word in ['frustrated', 'unacceptable', 'considering leaving', 'switching', 'elsewhere']) else 0
-        }
-        
-        # Demo churn prediction logic
-        churn_probability = 0.15  # Base probability
-        if churn_features['sentiment_score'] < -0.3:
-            churn_probability += 0.3
-        if churn_features['has_complaint']:
-            churn_probability += 0.2
-        if churn_features['negative_language']:
-            churn_probability += 0.25
-        
-        churn_probability = min(churn_probability, 0.95)  # Cap at 95%
-        
-        results['churn_probability'] = churn_probability
-        results['churn_risk_score'] = 'High' if churn_probability >= 0.6 else ('Medium' if churn_probability >= 0.3 else 'Low')
-        results['model_confidence'] = 85.0 + (churn_probability * 10)  # Simulated confidence
-        
-        with progress_placeholder.container():
-            st.markdown('<div class="pipeline-step completed">1. ✅ AI Sentiment Analysis - Complete</div>', unsafe_allow_html=True)
-            st.markdown('<div class="pipeline-step completed">2. ✅ AI Intent Detection - Complete</div>', unsafe_allow_html=True)
-            st.markdown('<div class="pipeline-step completed">3. ✅ AI Call Summarization - Complete</div>', unsafe_allow_html=True)
-            st.markdown('<div class="pipeline-step completed">4. ✅ ML Churn Prediction - Complete</div>', unsafe_allow_html=True)
-            st.markdown('<div class="pipeline-step active">5. 🔍 AI Cross-transcript Insights - Processing...</div>', unsafe_allow_html=True)
-        
-        time.sleep(0.5)
-        
-        # Step 5: Cross-transcript Customer Insights using AI_COMPLETE for multi-transcript analysis
-        insights_query = f"""
-        SELECT 
-            SNOWFLAKE.CORTEX.COMPLETE(
-                'claude-3-5-sonnet',
-                'Based on this call and historical customer interactions, analyze patterns and provide insights.
-                
-                Current call transcript: {transcript_text.replace("'", "''")}
-                Current sentiment: {results["sentiment_label"]} ({results["sentiment_score"]:.2f})
-                Current intent: {results["primary_intent"]}
-                
-                Provide insights in this format:
-                - Behavioral patterns observed
-                - Relationship trajectory (improving/declining)
-                - Key concerns or interests
-                - Risk factors or opportunities
-                
-                Keep response under 150 words.'
-            ) as customer_insights
-        """
-        
-        insights_result = execute_query(insights_query, conn)
-        if not insights_result.empty:
-            results['customer_insights'] = insights_result.iloc[0]['CUSTOMER_INSIGHTS'].strip()
-        
-        with progress_placeholder.container():
-            st.markdown('<div class="pipeline-step completed">1. ✅ AI Sentiment Analysis - Complete</div>', unsafe_allow_html=True)
-            st.markdown('<div class="pipeline-step completed">2. ✅ AI Intent Detection - Complete</div>', unsafe_allow_html=True)
-            st.markdown('<div class="pipeline-step completed">3. ✅ AI Call Summarization - Complete</div>', unsafe_allow_html=True)
-            st.markdown('<div class="pipeline-step completed">4. ✅ ML Churn Prediction - Complete</div>', unsafe_allow_html=True)
-            st.markdown('<div class="pipeline-step completed">5. ✅ AI Cross-transcript Insights - Complete</div>', unsafe_allow_html=True)
-            st.markdown('<div class="pipeline-step active">6. 💡 AI NBA Generation - Processing...</div>', unsafe_allow_html=True)
-        
-        time.sleep(0.5)
-        
-        # Step 6: AI-powered Next Best Action
-        nba_query = f"""
-        SELECT 
-            SNOWFLAKE.CORTEX.COMPLETE(
-                'claude-3-5-sonnet',
-                'Based on this customer call transcript and analysis, generate a specific Next Best Action recommendation for a superannuation advisor. 
-                Customer transcript: {transcript_text.replace("'", "''")}
-                Sentiment: {results["sentiment_label"]} ({results["sentiment_score"]:.2f})
-                Intent: {results["primary_intent"]}
-                Churn Risk: {results["churn_risk_score"]} ({results["churn_probability"]:.0%})
-                
-                Provide a specific, actionable recommendation (max 100 words) that addresses the customer needs and churn risk.'
-            ) as next_best_action
-        """
-        
-        nba_result = execute_query(nba_query, conn)
-        if not nba_result.empty:
-            results['next_best_action'] = nba_result.iloc[0]['NEXT_BEST_ACTION'].strip()
-        
-        # Generate reasoning
-        reasoning_query = f"""
-        SELECT 
-            SNOWFLAKE.CORTEX.COMPLETE(
-                'claude-3-5-sonnet',
-                'Explain in 2-3 sentences why this NBA recommendation is appropriate given the customer sentiment of {results["sentiment_label"]} ({results["sentiment_score"]:.2f}) and churn risk of {results["churn_risk_score"]} ({results["churn_probability"]:.0%}).'
-            ) as nba_reasoning
-        """
-        
-        reasoning_result = execute_query(reasoning_query, conn)
-        if not reasoning_result.empty:
-            results['nba_reasoning'] = reasoning_result.iloc[0]['NBA_REASONING'].strip()
-        
-        with progress_placeholder.container():
-            st.markdown('<div class="pipeline-step completed">1. ✅ AI Sentiment Analysis - Complete</div>', unsafe_allow_html=True)
-            st.markdown('<div class="pipeline-step completed">2. ✅ AI Intent Detection - Complete</div>', unsafe_allow_html=True)
-            st.markdown('<div class="pipeline-step completed">3. ✅ AI Call Summarization - Complete</div>', unsafe_allow_html=True)
-            st.markdown('<div class="pipeline-step completed">4. ✅ ML Churn Prediction - Complete</div>', unsafe_allow_html=True)
-            st.markdown('<div class="pipeline-step completed">5. ✅ AI Cross-transcript Insights - Complete</div>', unsafe_allow_html=True)
-            st.markdown('<div class="pipeline-step completed">6. ✅ AI NBA Generation - Complete</div>', unsafe_allow_html=True)
-        
+        st.session_state.stream_first_text = {}
+        st.session_state.stream_transports = {}
+        
+        def on_progress(active_index, stages, partial_results):
+            if 0 < active_index < len(stages):
+                time.sleep(0.5)  # Brief pause for demo effect
+            with progress_placeholder.container():
+                render_pipeline_progress(stages, active_index)
+        
+        results = run_pipeline(
+            conn, transcript_text, pipeline_options(),
+            on_progress=on_progress, complete_stage_fn=run_complete_stage
+        )
+        st.session_state.ai_result_cache[hash(transcript_text)] = results
         return results
         
+    except CircuitOpen:
+        st.warning("AI service is degraded - showing cached or fallback results while the circuit breaker is open")
+        return cached_or_fallback_results(transcript_text)
+    except CortexUnavailable as e:
+        st.warning(f"{str(e)} - showing cached or fallback results")
+        return cached_or_fallback_results(transcript_text)
     except Exception as e:
         st.error(f"AI Processing failed: {str(e)}")
         # Return fallback results for demo continuity
-        return {
-            'sentiment_score': -0.6 if 'frustrated' in transcript_text.lower() else 0.2,
-            'sentiment_label': 'Negative' if 'frustrated' in transcript_text.lower() else 'Positive',
-            'primary_intent': 'Churn Risk' if any(word in transcript_text.lower() for word in ['leaving', 'switching', 'elsewhere']) else 'Technical Support',
-            'call_summary': 'Customer expressed frustration with technical issues and requested immediate assistance.' if 'frustrated' in transcript_text.lower() else 'Customer inquired about account services and investment options.',
-            'customer_insights': 'High churn risk customer showing escalating frustration with technical issues. Immediate intervention required.' if 'frustrated' in transcript_text.lower() else 'Positive customer engagement with interest in additional services.',
-            'churn_probability': 0.75 if 'frustrated' in transcript_text.lower() else 0.20,
-            'churn_risk_score': 'High' if 'frustrated' in transcript_text.lower() else 'Low',
-            'model_confidence': 87.5,
-            'next_best_action': 'URGENT: Schedule immediate senior advisor call to address concerns and prevent churn.',
-            'nba_reasoning': 'High churn risk requires immediate intervention to retain customer.'
-        }
+        return cached_or_fallback_results(transcript_text)
+
+def submit_transcript_job(transcript_text):
+    """Queue the transcript for background processing and remember the job in the URL"""
+    job_id = background_job_queue().submit(
+        "ai_processing",
+        {'transcript': transcript_text, 'options': pipeline_options(interactive=False)},
+        owner=st.session_state.job_owner
+    )
+    st.session_state.active_job_id = job_id
+    st.query_params["job"] = job_id
+
+def show_job_status():
+    """
+    Show progress for the active background job
+    Finished results are moved into processing_results and the page reruns
+    """
+    job_queue = background_job_queue()
+    job = job_queue.get(st.session_state.active_job_id)
+    if job is None:
+        st.session_state.active_job_id = None
+        st.query_params.pop("job", None)
+        return
+    
+    if job['status'] in FINISHED_STATES:
+        transcript_text = job['payload']['transcript']
+        if job['status'] == 'succeeded':
+            results = job['result']
+            if not results.get('served_from'):
+                st.session_state.ai_result_cache[hash(transcript_text)] = results
+        else:
+            st.error(f"AI Processing failed: {job['error']}")
+            results = cached_or_fallback_results(transcript_text)
+        st.session_state.processing_results = results
+        st.session_state.processing_stage = 1
+        st.session_state.active_job_id = None
+        st.query_params.pop("job", None)
+        # Inside a fragment only the fragment would rerun; the results section needs the whole page
+        if hasattr(st, 'fragment'):
+            st.rerun(scope="app")
+        else:
+            st.rerun()
+    
+    if job['status'] == 'queued':
+        ahead = job_queue.queue_position(job['job_id'])
+        st.info(f"⏳ Job {job['job_id'][:8]} queued ({ahead} ahead)")
+    else:
+        st.info(f"⚙️ Job {job['job_id'][:8]} running in the background - you can keep using the page")
+        if job['progress']:
+            render_pipeline_progress(job['progress']['stages'], job['progress']['active_index'])
+
 
 # Main demo interface
 st.header("🎯 Step 1: Select Base Scenario")
@@ -371,17 +406,23 @@ with col1:
 with col2:
     if st.button("🔄 Load Call Transcript"):
         if selected_customer_id != "CUSTOM":
-            # Load existing transcript for specific call
+            # Load existing transcript for specific call, from the local corpus when it has it
             try:
-                query = f"""
-                SELECT TRANSCRIPT_TEXT 
-                FROM SUPERANNUATION.TRANSCRIPTS.RAW_CALL_TRANSCRIPTS 
-                WHERE CALL_ID = '{selected_call_id}' 
-                """
-                result = execute_query(query, conn)
-                if not result.empty:
-                    st.session_state.current_transcript = result.iloc[0]['TRANSCRIPT_TEXT']
-                    st.success(f"Loaded transcript for {selected_customer_name} ({selected_call_id})")
+                corpus = get_transcript_corpus()
+                transcript_text = corpus.get(selected_call_id) if corpus is not None else None
+                source = " from the local corpus"
+                if transcript_text is None:
+                    query = """
+                    SELECT TRANSCRIPT_TEXT 
+                    FROM SUPERANNUATION.TRANSCRIPTS.RAW_CALL_TRANSCRIPTS 
+                    WHERE CALL_ID = ? 
+                    """
+                    result = execute_query(query, conn, params=[selected_call_id])
+                    transcript_text = result.iloc[0]['TRANSCRIPT_TEXT'] if not result.empty else None
+                    source = ""
+                if transcript_text is not None:
+                    st.session_state.current_transcript = transcript_text
+                    st.success(f"Loaded transcript for {selected_customer_name} ({selected_call_id}){source}")
                 else:
                     st.warning("No transcript found, using sample data")
                     st.session_state.current_transcript = DEFAULT_TRANSCRIPT
@@ -417,14 +458,26 @@ st.header("🚀 Step 3: Process with AI/ML")
 
 col1, col2, col3 = st.columns([1, 2, 1])
 
+with col1:
+    st.toggle(
+        "Run in background",
+        key="background_ai_job",
+        help="Queue the pipeline as a background job; it keeps running through reruns and reconnects"
+    )
+
 with col2:
     if st.button(
         "🎯 PROCESS TRANSCRIPT WITH AI/ML", 
         key="process_button",
         help="Click to run real-time AI and ML analysis on the transcript",
-        type="primary"
+        type="primary",
+        disabled=st.session_state.active_job_id is not None
     ):
-        if st.session_state.current_transcript.strip():
+        if not st.session_state.current_transcript.strip():
+            st.error("Please enter a transcript to process")
+        elif st.session_state.get('background_ai_job'):
+            submit_transcript_job(st.session_state.current_transcript)
+        else:
             with st.spinner("Processing with Snowflake AI + ML..."):
                 results = process_transcript_with_ai(
                     st.session_state.current_transcript, 
@@ -432,8 +485,14 @@ with col2:
                 )
                 st.session_state.processing_results = results
                 st.session_state.processing_stage = 1
-        else:
-            st.error("Please enter a transcript to process")
+
+# Poll the background job; fragments refresh just this block, older Streamlit gets a button
+if st.session_state.active_job_id is not None:
+    if hasattr(st, 'fragment'):
+        st.fragment(run_every=JOB_POLL_SECONDS)(show_job_status)()
+    else:
+        show_job_status()
+        st.button("🔄 Refresh job status")
 
 # Display processing results
 if st.session_state.processing_stage > 0 and st.session_state.processing_results:
@@ -525,6 +584,25 @@ if st.session_state.processing_stage > 0 and st.session_state.processing_results
         st.markdown(f"- Confidence: {results['model_confidence']:.1f}%")
         st.markdown(f"- Sentiment Score: {results['sentiment_score']:.3f}")
         st.markdown(f"- Risk Probability: {results['churn_probability']:.1%}")
+        if results.get('chunk_count'):
+            st.markdown(f"- Transcript Chunks: {results['chunk_count']} (processed in parallel)")
+        if results.get('served_from'):
+            st.markdown(f"- Results Served From: {results['served_from']} (AI service unavailable)")
+        if results.get('reused_from'):
+            st.markdown(f"- Reused From: {results['reused_from']} (similarity {results['reuse_similarity']:.2f}, threshold {st.session_state.similarity_threshold:.2f})")
+        if results.get('intent_tier'):
+            cascade = get_cascade_metrics()
+            st.markdown(f"- Intent Decided By: {results['intent_tier']} (LLM escalation rate {cascade['escalation_rate']:.0%} of {cascade['total']} calls)")
+        if results.get('consolidated_stats'):
+            st.markdown(f"- LLM Round Trips: {results['consolidated_stats']['llm_calls']} (consolidated JSON call)")
+        transports = ", ".join(sorted(set(st.session_state.stream_transports.values())))
+        if st.session_state.stream_first_text:
+            first_text = min(st.session_state.stream_first_text.values())
+            st.markdown(f"- Time to First AI Text: {first_text:.2f}s (transport: {transports})")
+        elif transports:
+            st.markdown(f"- AI Text Transport: {transports} (full response replayed, no time to first text)")
+        if results.get('prompt_stats'):
+            st.markdown(f"- Prompt Tokens Sent: {results['prompt_stats']['tokens_used']:,} (saved {results['prompt_stats']['tokens_saved']:,})")
 
 
 
@@ -182,7 +182,7 @@ def load_customer_360(customer_id):
         customer_query = """
         SELECT *
         FROM SUPERANNUATION.TRANSCRIPTS.CUSTOMER_360_VIEW
-        WHERE CUSTOMER_ID = %s
+        WHERE CUSTOMER_ID = ?
         """
         
         calls_query = """
@@ -199,13 +199,13 @@ def load_customer_360(customer_id):
             LEFT(r.TRANSCRIPT_TEXT, 200) as TRANSCRIPT_PREVIEW
         FROM SUPERANNUATION.TRANSCRIPTS.ENRICHED_TRANSCRIPTS_ALL e
         JOIN SUPERANNUATION.TRANSCRIPTS.RAW_CALL_TRANSCRIPTS r ON e.CALL_ID = r.CALL_ID
-        WHERE e.CUSTOMER_ID = %s
+        WHERE e.CUSTOMER_ID = ?
         ORDER BY e.CALL_TIMESTAMP DESC
         LIMIT 10
         """
         
-        customer_data = execute_query(customer_query.replace('%s', f"'{customer_id}'"), conn)
-        calls_data = execute_query(calls_query.replace('%s', f"'{customer_id}'"), conn)
+        customer_data = execute_query(customer_query, conn, params=[customer_id])
+        calls_data = execute_query(calls_query, conn, params=[customer_id])
         
         return customer_data, calls_data
         
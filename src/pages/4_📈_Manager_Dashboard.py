@@ -11,7 +11,10 @@ import numpy as np
 # Add the src directory to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from connection_helper import get_snowflake_connection, execute_query, safe_execute_query
+from connection_helper import (
+    get_snowflake_connection, execute_query, execute_analytics_query, safe_execute_query,
+    get_coalesce_stats, get_frame_memory_stats, ANALYTICS_MIRROR_ENABLED
+)
 
 # Set page config
 st.set_page_config(
@@ -171,10 +174,10 @@ def load_dashboard_data():
         ORDER BY avg_churn_risk DESC
         """
         
-        summary_df = execute_query(summary_query, conn)
-        sentiment_df = execute_query(sentiment_query, conn)
-        intent_df = execute_query(intent_query, conn)
-        demographics_df = execute_query(demographics_query, conn)
+        summary_df = execute_analytics_query(summary_query, conn)
+        sentiment_df = execute_analytics_query(sentiment_query, conn)
+        intent_df = execute_analytics_query(intent_query, conn)
+        demographics_df = execute_analytics_query(demographics_query, conn)
         
         # Convert column names to lowercase (Snowflake returns uppercase)
         if summary_df is not None and not summary_df.empty:
@@ -228,6 +231,21 @@ def load_dashboard_data():
 
 summary_data, sentiment_data, intent_data, demographics_data = load_dashboard_data()
 
+# Identical loads from concurrent sessions share one warehouse execution
+with st.sidebar.expander("Query load"):
+    coalesce_stats = get_coalesce_stats()
+    st.markdown(f"**Queries executed:** {coalesce_stats['executed']} | **Coalesced:** {coalesce_stats['coalesced']} ({coalesce_stats['coalesced_rate']:.0%})")
+    st.markdown(f"**In flight:** {coalesce_stats['in_flight']}")
+    memory_stats = get_frame_memory_stats()
+    if memory_stats['frames']:
+        st.markdown(f"**Frame memory:** {memory_stats['raw_bytes'] / 1e6:.1f} MB → {memory_stats['optimized_bytes'] / 1e6:.1f} MB ({memory_stats['frames']} frames, {memory_stats['reduction']:.1f}x smaller)")
+    if ANALYTICS_MIRROR_ENABLED:
+        from analytics_mirror import get_mirror_stats
+        mirror_stats = get_mirror_stats()
+        st.markdown(f"**Served from local mirror:** {mirror_stats['local']} ({mirror_stats['local_rate']:.0%}) | **Fallbacks:** {mirror_stats['fallbacks']}")
+        synced = [entry['synced_at'] for entry in mirror_stats['tables'].values()]
+        st.markdown(f"**Mirror synced:** {min(synced) if synced else 'never'}")
+
 if summary_data.empty:
     st.error("Unable to load dashboard data")
     st.stop()
@@ -0,0 +1,203 @@
+"""
+Prompt Builder Module for Superannuation Transcripts Demo
+=========================================================
+
+Assembles the COMPLETE prompts used by the AI processing pipeline under a
+per-stage token budget. Instead of re-embedding the full transcript in every
+downstream prompt, the builder reuses the SUMMARIZE output plus a handful of
+extracted key turns, and reports how many tokens that saved.
+"""
+
+import re
+
+# Rough characters-per-token ratio for English text with claude-family tokenizers
+CHARS_PER_TOKEN = 4
+
+# Token budget for the context section of each downstream stage
+STAGE_TOKEN_BUDGETS = {
+    "intent": 400,
+    "consolidated": 800,
+    "insights": 600,
+    "nba": 500,
+    "reasoning": 300
+}
+
+# Phrases that mark a customer turn as worth carrying into downstream prompts
+KEY_TURN_PHRASES = [
+    'frustrated', 'unacceptable', 'considering leaving', 'switching', 'elsewhere',
+    'complaint', 'cancel', 'close my account', 'fees', 'retire', 'retirement',
+    'pension', 'withdraw', 'consolidat', 'insurance', 'invest', 'esg', 'not happy',
+    'disappointed', 'again'
+]
+
+TURN_PATTERN = re.compile(r'^\s*(Customer|Agent)\s*:\s*', re.IGNORECASE | re.MULTILINE)
+
+
+def estimate_tokens(text):
+    """
+    Estimate the token count of a piece of text
+    Uses a character ratio so no tokenizer round trip is needed
+    """
+    if not text:
+        return 0
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Trim text to fit within a token budget, cutting on a word boundary"""
+    if not text or estimate_tokens(text) <= max_tokens:
+        return text or ""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    trimmed = text[:max_chars].rsplit(' ', 1)[0]
+    return trimmed.rstrip() + "..."
+
+
+def split_turns(transcript_text):
+    """
+    Split a transcript into (speaker, text) turns on Customer:/Agent: markers
+    Text before the first marker is returned as a single untagged turn
+    """
+    turns = []
+    if not transcript_text:
+        return turns
+
+    matches = list(TURN_PATTERN.finditer(transcript_text))
+    if not matches:
+        return [("", transcript_text.strip())]
+
+    preamble = transcript_text[:matches[0].start()].strip()
+    if preamble:
+        turns.append(("", preamble))
+
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(transcript_text)
+        text = transcript_text[match.end():end].strip()
+        if text:
+            turns.append((match.group(1).capitalize(), text))
+
+    return turns
+
+
+def extract_key_turns(transcript_text, max_turns=4):
+    """
+    Pick the customer turns most likely to matter for downstream reasoning
+    Turns are scored by key phrase hits and returned in call order
+    """
+    scored = []
+    for position, (speaker, text) in enumerate(split_turns(transcript_text)):
+        if speaker == "Agent":
+            continue
+        lowered = text.lower()
+        score = sum(1 for phrase in KEY_TURN_PHRASES if phrase in lowered)
+        if score > 0:
+            scored.append((score, position, f"{speaker or 'Customer'}: {text}"))
+
+    # Fall back to the opening customer turn so there is always some voice-of-customer context
+    if not scored:
+        for position, (speaker, text) in enumerate(split_turns(transcript_text)):
+            if speaker != "Agent":
+                return [f"{speaker or 'Customer'}: {text}"]
+        return []
+
+    top = sorted(scored, key=lambda item: (-item[0], item[1]))[:max_turns]
+    return [turn for _, _, turn in sorted(top, key=lambda item: item[1])]
+
+
+def build_context(transcript_text, summary, stage, budget=None):
+    """
+    Build the transcript context block for a downstream stage
+    Returns (context_text, stats) where stats records tokens used and saved
+    """
+    if budget is None:
+        budget = STAGE_TOKEN_BUDGETS.get(stage, 500)
+
+    full_tokens = estimate_tokens(transcript_text)
+
+    # Short calls are cheaper to send verbatim than to paraphrase
+    if full_tokens <= budget or not summary:
+        context = truncate_to_tokens(transcript_text, budget)
+        mode = "transcript"
+    else:
+        summary_block = truncate_to_tokens(summary, budget // 2)
+        remaining = budget - estimate_tokens(summary_block)
+        turn_lines = []
+        for turn in extract_key_turns(transcript_text):
+            turn_tokens = estimate_tokens(turn) + 1
+            if turn_tokens > remaining:
+                break
+            turn_lines.append(turn)
+            remaining -= turn_tokens
+        context = f"Call summary: {summary_block}"
+        if turn_lines:
+            context += "\nKey customer statements:\n" + "\n".join(turn_lines)
+        mode = "summary"
+
+    used_tokens = estimate_tokens(context)
+    stats = {
+        "stage": stage,
+        "mode": mode,
+        "budget": budget,
+        "full_tokens": full_tokens,
+        "used_tokens": used_tokens,
+        "tokens_saved": max(full_tokens - used_tokens, 0)
+    }
+    return context, stats
+
+
+def build_insights_prompt(transcript_text, summary, signals, budget=None):
+    """Build the cross-transcript insights prompt for the given call signals"""
+    context, stats = build_context(transcript_text, summary, "insights", budget)
+    prompt = f"""Based on this call and historical customer interactions, analyze patterns and provide insights.
+
+Current call context: {context}
+Current sentiment: {signals["sentiment_label"]} ({signals["sentiment_score"]:.2f})
+Current intent: {signals["primary_intent"]}
+
+Provide insights in this format:
+- Behavioral patterns observed
+- Relationship trajectory (improving/declining)
+- Key concerns or interests
+- Risk factors or opportunities
+
+Keep response under 150 words."""
+    return prompt, stats
+
+
+def build_nba_prompt(transcript_text, summary, signals, budget=None):
+    """Build the Next Best Action prompt for the given call signals"""
+    context, stats = build_context(transcript_text, summary, "nba", budget)
+    prompt = f"""Based on this customer call and analysis, generate a specific Next Best Action recommendation for a superannuation advisor.
+Customer call context: {context}
+Sentiment: {signals["sentiment_label"]} ({signals["sentiment_score"]:.2f})
+Intent: {signals["primary_intent"]}
+Churn Risk: {signals["churn_risk_score"]} ({signals["churn_probability"]:.0%})
+
+Provide a specific, actionable recommendation (max 100 words) that addresses the customer needs and churn risk."""
+    return prompt, stats
+
+
+def build_reasoning_prompt(next_best_action, signals, budget=None):
+    """Build the NBA reasoning prompt, grounded on the generated recommendation"""
+    if budget is None:
+        budget = STAGE_TOKEN_BUDGETS["reasoning"]
+    nba_text = truncate_to_tokens(next_best_action or "", budget)
+    prompt = f"""Explain in 2-3 sentences why this NBA recommendation is appropriate given the customer sentiment of {signals["sentiment_label"]} ({signals["sentiment_score"]:.2f}) and churn risk of {signals["churn_risk_score"]} ({signals["churn_probability"]:.0%}).
+Recommendation: {nba_text}"""
+    stats = {
+        "stage": "reasoning",
+        "mode": "nba",
+        "budget": budget,
+        "full_tokens": estimate_tokens(nba_text),
+        "used_tokens": estimate_tokens(nba_text),
+        "tokens_saved": 0
+    }
+    return prompt, stats
+
+
+def summarize_prompt_stats(stage_stats):
+    """Roll per-stage stats up into a single report for display"""
+    return {
+        "stages": {s["stage"]: s for s in stage_stats},
+        "tokens_used": sum(s["used_tokens"] for s in stage_stats),
+        "tokens_saved": sum(s["tokens_saved"] for s in stage_stats)
+    }
@@ -5,9 +5,13 @@ import os
 # Add the src directory to Python path to import our modules
 sys.path.append(os.path.join(os.path.dirname(__file__)))
 
+# `streamlit run src/streamlit_main.py -- --profile-imports` prints an import-time report instead of the app
+if "--profile-imports" in sys.argv:
+    from import_profile import main as profile_imports
+    profile_imports(sys.argv[1:])
+    st.stop()
+
 from connection_helper import get_snowflake_connection
-import pandas as pd
-from datetime import datetime
 
 # Set page config
 st.set_page_config(
@@ -142,6 +146,8 @@ st.header("👥 Demo Customer Scenarios")
 @st.cache_data(ttl=300)
 def load_demo_customers():
     """Load demo customer data"""
+    # Imported here so the landing page renders before pandas has loaded
+    import pandas as pd
     try:
         conn = get_snowflake_connection()
         if hasattr(conn, 'sql'):  # Snowpark session
@@ -248,6 +254,7 @@ if "✅" in st.session_state.connection_status:
     @st.cache_data(ttl=300)
     def load_quick_stats():
         """Load quick statistics for the demo"""
+        import pandas as pd
         try:
             conn = get_snowflake_connection()
             if hasattr(conn, 'sql'):  # Snowpark session
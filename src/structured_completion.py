@@ -0,0 +1,133 @@
+"""
+Structured Completion Module for Superannuation Transcripts Demo
+================================================================
+
+Consolidated mode for the AI processing pipeline: intent, customer insights,
+Next Best Action and NBA reasoning are requested from a single COMPLETE call
+as one JSON object. The response is validated against a small schema and only
+the fields that are missing or invalid are re-requested.
+"""
+
+import json
+import re
+
+INTENT_OPTIONS = [
+    "Technical Support",
+    "Investment Inquiry",
+    "Complaint",
+    "Churn Risk",
+    "Fee Question",
+    "Retirement Planning"
+]
+
+# Field name -> (description for the prompt, max words)
+CONSOLIDATED_FIELDS = {
+    "primary_intent": (f"one of: {', '.join(INTENT_OPTIONS)}", 3),
+    "customer_insights": ("behavioral patterns, relationship trajectory (improving/declining), key concerns or interests, risk factors or opportunities", 150),
+    "next_best_action": ("a specific, actionable recommendation for a superannuation advisor that addresses the customer needs and churn risk", 100),
+    "nba_reasoning": ("2-3 sentences explaining why the next best action is appropriate given the sentiment and churn risk", 80)
+}
+
+JSON_OBJECT_PATTERN = re.compile(r'\{.*\}', re.DOTALL)
+
+
+def build_consolidated_prompt(context, signals, fields=None):
+    """Build a prompt asking for the requested fields as a single JSON object"""
+    if fields is None:
+        fields = list(CONSOLIDATED_FIELDS)
+
+    field_lines = "\n".join(
+        f'- "{name}": {CONSOLIDATED_FIELDS[name][0]} (max {CONSOLIDATED_FIELDS[name][1]} words)'
+        for name in fields
+    )
+    return f"""Analyze this superannuation customer service call.
+
+Call context: {context}
+Sentiment: {signals["sentiment_label"]} ({signals["sentiment_score"]:.2f})
+Churn language detected: {"yes" if signals.get("negative_language") else "no"}
+
+Respond with ONLY a JSON object, no markdown and no commentary, with exactly these keys:
+{field_lines}"""
+
+
+def parse_json_response(text):
+    """
+    Extract a JSON object from a model response
+    Tolerates code fences and leading/trailing prose; returns {} if nothing parses
+    """
+    if not text:
+        return {}
+    match = JSON_OBJECT_PATTERN.search(text)
+    if not match:
+        return {}
+    try:
+        payload = json.loads(match.group(0))
+    except ValueError:
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def normalize_intent(value):
+    """Map a model-supplied intent onto the allowed options, or None"""
+    if not isinstance(value, str):
+        return None
+    cleaned = value.strip().strip('."\'').lower()
+    for option in INTENT_OPTIONS:
+        if cleaned == option.lower():
+            return option
+    for option in INTENT_OPTIONS:
+        if option.lower() in cleaned:
+            return option
+    return None
+
+
+def validate_payload(payload, fields=None):
+    """
+    Validate a parsed payload against the consolidated schema
+    Returns (valid_fields, missing_fields)
+    """
+    if fields is None:
+        fields = list(CONSOLIDATED_FIELDS)
+
+    valid = {}
+    missing = []
+    for name in fields:
+        value = payload.get(name)
+        if name == "primary_intent":
+            value = normalize_intent(value)
+        elif isinstance(value, str):
+            value = value.strip() or None
+        else:
+            value = None
+
+        if value is None:
+            missing.append(name)
+        else:
+            valid[name] = value
+    return valid, missing
+
+
+def run_consolidated_completion(complete_fn, context, signals, max_retries=1):
+    """
+    Run the consolidated COMPLETE call with targeted retries
+    complete_fn(prompt) returns the raw model text. Returns (fields, stats) where
+    fields holds every field that validated and stats records calls and retries.
+    """
+    fields = {}
+    pending = list(CONSOLIDATED_FIELDS)
+    stats = {"llm_calls": 0, "retried_fields": []}
+
+    for attempt in range(max_retries + 1):
+        prompt = build_consolidated_prompt(context, signals, pending)
+        response = complete_fn(prompt)
+        stats["llm_calls"] += 1
+
+        valid, pending = validate_payload(parse_json_response(response), pending)
+        fields.update(valid)
+        if not pending:
+            break
+        if attempt < max_retries:
+            stats["retried_fields"].extend(pending)
+
+    stats["missing_fields"] = pending
+    return fields, stats
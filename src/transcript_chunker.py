@@ -0,0 +1,128 @@
+"""
+Transcript Chunker Module for Superannuation Transcripts Demo
+=============================================================
+
+Map-reduce processing for long call transcripts. Transcripts are split on
+Customer:/Agent: turn boundaries into token-bounded chunks, per-chunk
+SENTIMENT and SUMMARIZE calls run in parallel, and the results are reduced
+into a duration-weighted sentiment score and a summary-of-summaries. The
+sentiment_fn and summarize_fn callables run on worker threads, so they must
+not make Streamlit calls (use connection_helper.run_query, not execute_query).
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from prompt_builder import estimate_tokens, split_turns
+
+# Default chunk sizing, in estimated tokens and overlapping turns
+DEFAULT_CHUNK_TOKENS = 1500
+DEFAULT_OVERLAP_TURNS = 1
+DEFAULT_MAX_WORKERS = 4
+
+
+def needs_chunking(transcript_text, chunk_tokens=DEFAULT_CHUNK_TOKENS):
+    """Check whether a transcript is long enough to be worth chunking"""
+    return estimate_tokens(transcript_text) > chunk_tokens
+
+
+def chunk_transcript(transcript_text, chunk_tokens=DEFAULT_CHUNK_TOKENS, overlap_turns=DEFAULT_OVERLAP_TURNS):
+    """
+    Split a transcript into chunks of whole turns
+    Each chunk stays under chunk_tokens where possible and repeats the last
+    overlap_turns turns of the previous chunk so context is not lost at the cut
+    """
+    return ["\n".join(turns) for turns, _ in _chunk_turns(transcript_text, chunk_tokens, overlap_turns)]
+
+
+def _chunk_turns(transcript_text, chunk_tokens, overlap_turns):
+    """
+    Chunks as (turns, repeated) pairs, where the first `repeated` turns are the
+    overlap carried over from the previous chunk (see chunk_transcript)
+    """
+    turns = [f"{speaker}: {text}" if speaker else text for speaker, text in split_turns(transcript_text)]
+    # Untagged text (e.g. a set of partial summaries) is split on lines instead
+    if len(turns) == 1 and not turns[0].startswith(("Customer:", "Agent:")):
+        turns = [line for line in transcript_text.splitlines() if line.strip()]
+    if not turns:
+        return []
+
+    chunks = []
+    current = []
+    current_tokens = 0
+    new_turns = 0
+
+    for turn in turns:
+        turn_tokens = estimate_tokens(turn)
+        if current and new_turns and current_tokens + turn_tokens > chunk_tokens:
+            chunks.append((current, len(current) - new_turns))
+            current = current[-overlap_turns:] if overlap_turns > 0 else []
+            current_tokens = sum(estimate_tokens(t) for t in current)
+            new_turns = 0
+        current.append(turn)
+        current_tokens += turn_tokens
+        new_turns += 1
+
+    if new_turns:
+        chunks.append((current, len(current) - new_turns))
+
+    return chunks
+
+
+def weighted_sentiment(chunk_scores):
+    """
+    Reduce per-chunk sentiment into a single score
+    Each chunk is weighted by the length of the turns it adds (overlap excluded),
+    which tracks how long that part of the call ran
+    """
+    total_weight = sum(weight for _, weight in chunk_scores)
+    if total_weight == 0:
+        return 0.0
+    return sum(score * weight for score, weight in chunk_scores) / total_weight
+
+
+def map_reduce_transcript(transcript_text, sentiment_fn, summarize_fn,
+                          chunk_tokens=DEFAULT_CHUNK_TOKENS, overlap_turns=DEFAULT_OVERLAP_TURNS,
+                          max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Run sentiment and summarization over a long transcript in parallel chunks
+    sentiment_fn(text) must return a float and summarize_fn(text) a string.
+    Returns a dict with the reduced sentiment score, the summary-of-summaries
+    and per-chunk details.
+    """
+    chunk_turns = _chunk_turns(transcript_text, chunk_tokens, overlap_turns)
+    chunks = ["\n".join(turns) for turns, _ in chunk_turns]
+    if not chunks:
+        return {"sentiment_score": 0.0, "call_summary": "", "chunk_count": 0, "chunks": []}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        sentiment_futures = [pool.submit(sentiment_fn, chunk) for chunk in chunks]
+        summary_futures = [pool.submit(summarize_fn, chunk) for chunk in chunks]
+        chunk_sentiments = [float(f.result()) for f in sentiment_futures]
+        chunk_summaries = [(f.result() or "").strip() for f in summary_futures]
+
+    # Overlapping turns are scored in both chunks but only count once
+    sentiment_score = weighted_sentiment([
+        (score, len("\n".join(turns[repeated:])))
+        for score, (turns, repeated) in zip(chunk_sentiments, chunk_turns)
+    ])
+
+    # Reduce the partial summaries, recursing if they are still too long for one call
+    combined = "\n".join(s for s in chunk_summaries if s)
+    if len(chunks) == 1:
+        call_summary = combined
+    elif needs_chunking(combined, chunk_tokens):
+        call_summary = map_reduce_transcript(
+            combined, lambda text: 0.0, summarize_fn, chunk_tokens, 0, max_workers
+        )["call_summary"]
+    else:
+        call_summary = (summarize_fn(combined) or "").strip()
+
+    return {
+        "sentiment_score": sentiment_score,
+        "call_summary": call_summary,
+        "chunk_count": len(chunks),
+        "chunks": [
+            {"tokens": estimate_tokens(chunk), "sentiment_score": score, "summary": summary}
+            for chunk, score, summary in zip(chunks, chunk_sentiments, chunk_summaries)
+        ]
+    }
@@ -0,0 +1,355 @@
+"""
+Transcript Corpus Module for Superannuation Transcripts Demo
+============================================================
+
+Local, memory-mapped copy of RAW_CALL_TRANSCRIPTS.TRANSCRIPT_TEXT so local
+analysis (Data Foundation previews, keyword features, index builds) reads
+transcripts at disk speed instead of pulling them from the warehouse again:
+
+- transcripts.blob holds every transcript back to back, each optionally
+  zlib-compressed on its own so random access stays a single slice
+- transcripts.idx is a sorted array of fixed-width (CALL_ID, offset, length)
+  entries; lookups are a binary search over the memory-mapped index
+- corpus.json records the compression, sizes and the CREATED_AT watermark, so
+  sync_corpus() only pulls calls created since the last sync
+- A re-fetched call whose text changed (CALL_IDs reused by a full reload) is
+  rewritten: the new text is appended and its index entry repointed
+
+The blob is append-only and the index and metadata are replaced atomically,
+so readers with the corpus open are never affected by a sync. Replaced text
+stays in the blob as dead bytes until the corpus is rebuilt.
+"""
+
+import json
+import mmap
+import os
+import threading
+import time
+import zlib
+
+import numpy as np
+
+DEFAULT_CORPUS_DIR = os.environ.get(
+    "TRANSCRIPT_CORPUS_DIR",
+    os.path.join(os.path.expanduser("~"), ".superannuation_demo", "corpus")
+)
+BLOB_FILE = "transcripts.blob"
+INDEX_FILE = "transcripts.idx"
+META_FILE = "corpus.json"
+FORMAT_VERSION = 1
+COMPRESSION_LEVEL = 6
+FETCH_BATCH = 5000
+
+# CALL_ID is VARCHAR(20) in sql/01_create_database_objects.sql
+INDEX_DTYPE = np.dtype([
+    ("call_id", "S20"),
+    ("offset", "<u8"),
+    ("length", "<u4"),
+    ("text_bytes", "<u4")
+])
+
+SYNC_QUERY = """
+SELECT CALL_ID, TRANSCRIPT_TEXT, CREATED_AT
+FROM RAW_CALL_TRANSCRIPTS
+WHERE TRANSCRIPT_TEXT IS NOT NULL
+  AND (? IS NULL OR CREATED_AT >= ?)
+ORDER BY CREATED_AT
+"""
+
+
+def _encode_call_id(call_id):
+    encoded = str(call_id).encode("utf-8")
+    if len(encoded) > INDEX_DTYPE["call_id"].itemsize:
+        raise ValueError(f"CALL_ID longer than {INDEX_DTYPE['call_id'].itemsize} bytes: {call_id!r}")
+    return encoded
+
+
+def read_meta(corpus_dir=DEFAULT_CORPUS_DIR):
+    """Return the corpus metadata, or None if no corpus has been written"""
+    try:
+        with open(os.path.join(corpus_dir, META_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _replace_file(path, write):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+class TranscriptCorpus:
+    """Read-only, memory-mapped view of a corpus directory"""
+
+    def __init__(self, corpus_dir=DEFAULT_CORPUS_DIR):
+        self.corpus_dir = corpus_dir
+        self.meta = read_meta(corpus_dir)
+        if self.meta is None:
+            raise FileNotFoundError(f"No transcript corpus in {corpus_dir}")
+        if self.meta["version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported corpus version {self.meta['version']} - re-sync with --rebuild")
+        self.compressed = self.meta["compression"] == "zlib"
+
+        # Empty files cannot be mapped; an empty corpus just has nothing to look up
+        self._blob_file = open(os.path.join(corpus_dir, BLOB_FILE), "rb")
+        blob_bytes = self.meta["blob_bytes"]
+        self._blob = mmap.mmap(self._blob_file.fileno(), blob_bytes, access=mmap.ACCESS_READ) if blob_bytes else b""
+        if self.meta["count"]:
+            self.index = np.memmap(os.path.join(corpus_dir, INDEX_FILE), dtype=INDEX_DTYPE, mode="r", shape=(self.meta["count"],))
+        else:
+            self.index = np.zeros(0, dtype=INDEX_DTYPE)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.index)
+
+    def _position(self, call_id):
+        key = _encode_call_id(call_id)
+        call_ids = self.index["call_id"]
+        position = int(np.searchsorted(call_ids, key))
+        if position < len(call_ids) and call_ids[position] == key:
+            return position
+        return None
+
+    def __contains__(self, call_id):
+        return self._position(call_id) is not None
+
+    def _decode(self, entry):
+        start = int(entry["offset"])
+        data = self._blob[start:start + int(entry["length"])]
+        if self.compressed:
+            data = zlib.decompress(data)
+        return data.decode("utf-8")
+
+    def get_bytes(self, call_id):
+        """
+        Stored bytes for a call as a zero-copy memoryview of the blob, or None
+        These are zlib-compressed when the corpus is compressed. Release the view
+        before close(), which cannot unmap a blob with views still exported.
+        """
+        position = self._position(call_id)
+        if position is None:
+            return None
+        entry = self.index[position]
+        return memoryview(self._blob)[int(entry["offset"]):int(entry["offset"]) + int(entry["length"])]
+
+    def get(self, call_id, default=None):
+        """Transcript text for a call, or default"""
+        position = self._position(call_id)
+        return default if position is None else self._decode(self.index[position])
+
+    def get_many(self, call_ids):
+        """{call_id: text} for the calls present in the corpus"""
+        found = {}
+        for call_id in call_ids:
+            text = self.get(call_id)
+            if text is not None:
+                found[call_id] = text
+        return found
+
+    def call_ids(self):
+        """All CALL_IDs in sorted order"""
+        return [call_id.decode("utf-8") for call_id in self.index["call_id"]]
+
+    def text_length(self, call_id):
+        """UTF-8 size of a transcript without reading it, or None"""
+        position = self._position(call_id)
+        return None if position is None else int(self.index[position]["text_bytes"])
+
+    def iter_transcripts(self):
+        """Yield (call_id, text) in blob order, i.e. a sequential scan of the file"""
+        ordered = self.index[np.argsort(self.index["offset"], kind="stable")]
+        blob = self._blob
+        # Plain lists: per-entry numpy scalar access would dominate the scan
+        for call_id, start, length in zip(ordered["call_id"].tolist(), ordered["offset"].tolist(), ordered["length"].tolist()):
+            data = blob[start:start + length]
+            if self.compressed:
+                data = zlib.decompress(data)
+            yield call_id.decode("utf-8"), data.decode("utf-8")
+
+    __iter__ = iter_transcripts
+
+    def stats(self):
+        """Transcript count, stored and text sizes, compression and sync watermark"""
+        text_bytes = int(self.index["text_bytes"].sum()) if len(self.index) else 0
+        return {
+            "transcripts": len(self.index),
+            "blob_bytes": self.meta["blob_bytes"],
+            "text_bytes": text_bytes,
+            "compression": self.meta["compression"],
+            "compression_ratio": text_bytes / self.meta["blob_bytes"] if self.meta["blob_bytes"] else None,
+            "watermark": self.meta.get("watermark"),
+            "synced_at": self.meta.get("synced_at")
+        }
+
+    def close(self):
+        if isinstance(self._blob, mmap.mmap):
+            self._blob.close()
+        self._blob_file.close()
+        self.index = np.zeros(0, dtype=INDEX_DTYPE)
+
+
+def open_corpus(corpus_dir=DEFAULT_CORPUS_DIR):
+    """Open the corpus, or return None if it has not been synced yet"""
+    try:
+        return TranscriptCorpus(corpus_dir)
+    except (OSError, ValueError):
+        return None
+
+
+_corpus = None
+_corpus_lock = threading.Lock()
+
+
+def get_transcript_corpus(corpus_dir=DEFAULT_CORPUS_DIR):
+    """
+    Return the process-wide corpus, or None if it has not been synced yet
+    It is reopened when a sync has changed the metadata since it was opened;
+    the previous mapping is left to readers still holding it.
+    """
+    global _corpus
+    meta = read_meta(corpus_dir)
+    with _corpus_lock:
+        if meta is None:
+            _corpus = None
+        elif _corpus is None or _corpus.corpus_dir != corpus_dir or _corpus.meta != meta:
+            _corpus = open_corpus(corpus_dir)
+        return _corpus
+
+
+def append_transcripts(rows, corpus_dir=DEFAULT_CORPUS_DIR, compress=None, watermark=None):
+    """
+    Append (call_id, text) rows
+    Calls already in the corpus are skipped when their text is unchanged and
+    replaced when it differs. compress only applies when the corpus is created
+    (None means uncompressed). The index and metadata are rewritten once, after
+    the blob is flushed. Returns dict with added, updated and skipped counts.
+    """
+    os.makedirs(corpus_dir, exist_ok=True)
+    meta = read_meta(corpus_dir) or {
+        "version": FORMAT_VERSION,
+        "compression": "zlib" if compress else "none",
+        "count": 0,
+        "blob_bytes": 0,
+        "watermark": None
+    }
+    index_path = os.path.join(corpus_dir, INDEX_FILE)
+    existing = np.fromfile(index_path, dtype=INDEX_DTYPE, count=meta["count"]) if meta["count"] else np.zeros(0, dtype=INDEX_DTYPE)
+    compressed = meta["compression"] == "zlib"
+
+    rows = list(rows)
+    keys = np.array([_encode_call_id(call_id) for call_id, _ in rows], dtype=INDEX_DTYPE["call_id"])
+    positions = np.minimum(np.searchsorted(existing["call_id"], keys), max(len(existing) - 1, 0))
+    present = existing["call_id"][positions] == keys if len(existing) else np.zeros(len(keys), dtype=bool)
+
+    blob_path = os.path.join(corpus_dir, BLOB_FILE)
+    entries = []
+    replaced = {}  # position in existing -> new entry
+    seen = set()
+    with open(blob_path, "ab") as blob, open(blob_path, "rb") as reader:
+        # Drop any tail left by an interrupted sync; only meta["blob_bytes"] is indexed
+        blob.truncate(meta["blob_bytes"])
+        blob.seek(meta["blob_bytes"])
+        offset = meta["blob_bytes"]
+        for (_, text), key, known, position in zip(rows, keys, present, positions.tolist()):
+            if key in seen:
+                continue
+            seen.add(key)
+            data = text.encode("utf-8")
+            if known:
+                entry = existing[position]
+                reader.seek(int(entry["offset"]))
+                current = reader.read(int(entry["length"]))
+                if (zlib.decompress(current) if compressed else current) == data:
+                    continue
+            stored = zlib.compress(data, COMPRESSION_LEVEL) if compressed else data
+            blob.write(stored)
+            if known:
+                replaced[position] = (key, offset, len(stored), len(data))
+            else:
+                entries.append((key, offset, len(stored), len(data)))
+            offset += len(stored)
+        blob.flush()
+        os.fsync(blob.fileno())
+
+    if entries or replaced:
+        merged = existing.copy()
+        for position, entry in replaced.items():
+            merged[position] = entry
+        if entries:
+            merged = np.concatenate([merged, np.array(entries, dtype=INDEX_DTYPE)])
+            merged = merged[np.argsort(merged["call_id"], kind="stable")]
+        _replace_file(index_path, lambda f: f.write(merged.tobytes()))
+        meta["count"] = len(merged)
+        meta["blob_bytes"] = offset
+    if watermark is not None:
+        meta["watermark"] = watermark
+    meta["synced_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    _replace_file(os.path.join(corpus_dir, META_FILE), lambda f: f.write(json.dumps(meta, indent=2).encode("utf-8")))
+    return {"added": len(entries), "updated": len(replaced), "skipped": len(rows) - len(entries) - len(replaced)}
+
+
+def remove_corpus(corpus_dir=DEFAULT_CORPUS_DIR):
+    """Delete the corpus files (open readers keep their mapped copy)"""
+    for name in (META_FILE, INDEX_FILE, BLOB_FILE):
+        try:
+            os.remove(os.path.join(corpus_dir, name))
+        except FileNotFoundError:
+            pass
+
+
+def sync_corpus(conn, corpus_dir=DEFAULT_CORPUS_DIR, compress=False, rebuild=False):
+    """
+    Pull calls created since the last sync from RAW_CALL_TRANSCRIPTS
+    conn is a DB-API connection already in the SUPERANNUATION.TRANSCRIPTS
+    context. Rows at the watermark itself are fetched again and skipped by
+    CALL_ID, so calls committed in the same instant as the last sync are not
+    missed. Re-fetched calls whose text changed, e.g. CALL_IDs reused by a full
+    reload, are replaced; rebuild=True starts from scratch and drops replaced
+    text from the blob. Returns dict with added, updated, skipped, transcripts,
+    watermark and seconds.
+    """
+    started = time.perf_counter()
+    if rebuild:
+        remove_corpus(corpus_dir)
+    meta = read_meta(corpus_dir) or {}
+    watermark = meta.get("watermark")
+    added = 0
+    updated = 0
+    skipped = 0
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(SYNC_QUERY, [watermark, watermark])
+        while True:
+            batch = cursor.fetchmany(FETCH_BATCH)
+            if not batch:
+                break
+            # Rows arrive in CREATED_AT order, so the last one is the new watermark
+            if batch[-1][2] is not None:
+                watermark = str(batch[-1][2])
+            # Each batch is committed on its own, so an interrupted sync resumes where it stopped
+            result = append_transcripts(((row[0], row[1]) for row in batch), corpus_dir, compress, watermark)
+            added += result["added"]
+            updated += result["updated"]
+            skipped += result["skipped"]
+    finally:
+        cursor.close()
+
+    if read_meta(corpus_dir) is None:
+        append_transcripts([], corpus_dir, compress)
+    return {
+        "added": added,
+        "updated": updated,
+        "skipped": skipped,
+        "transcripts": read_meta(corpus_dir)["count"],
+        "watermark": watermark,
+        "seconds": round(time.perf_counter() - started, 3)
+    }
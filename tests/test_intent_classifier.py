@@ -0,0 +1,45 @@
+"""
+Tests for the tiered intent classifier
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'src'))
+
+import pytest
+
+from intent_classifier import (
+    CLASSIFY_AGREES_TOP, CLASSIFY_UNCORROBORATED, INTENT_OPTIONS,
+    classify_intent, classify_text_confidence, keyword_scores
+)
+
+NO_EVIDENCE = "Customer: Hello, I have a question about my account"
+
+
+@pytest.mark.parametrize("label", INTENT_OPTIONS)
+def test_classify_text_without_keyword_evidence_is_uncorroborated(label):
+    assert all(score == 0 for score in keyword_scores(NO_EVIDENCE).values())
+    assert classify_text_confidence(label, keyword_scores(NO_EVIDENCE)) == CLASSIFY_UNCORROBORATED
+
+    llm_calls = []
+    result = classify_intent(
+        NO_EVIDENCE,
+        classify_fn=lambda text, labels: label,
+        llm_fn=lambda text: llm_calls.append(text) or "Complaint"
+    )
+    # Every CLASSIFY_TEXT answer is treated alike, whatever the dict order of intents
+    assert result["tier"] == "llm"
+    assert len(llm_calls) == 1
+
+
+def test_classify_text_agreeing_with_clear_keyword_top_is_accepted():
+    scores = keyword_scores("Customer: What is the admin fee? I was charged twice")
+    assert classify_text_confidence("Fee Question", scores) == CLASSIFY_AGREES_TOP
+
+
+def test_classify_text_tied_with_keyword_top_is_uncorroborated():
+    scores = keyword_scores("Customer: I want to close my account, the app is locked")
+    assert scores["Churn Risk"] == scores["Technical Support"] > 0
+    assert classify_text_confidence("Churn Risk", scores) == CLASSIFY_UNCORROBORATED
+    assert classify_text_confidence("Technical Support", scores) == CLASSIFY_UNCORROBORATED